@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'E-Fatura Entegrasyonu',
-    'version': '1.0.19',
+    'version': '1.0.62',
     'category': 'Accounting/Accounting',
     'summary': 'izibiz E-Fatura/E-Arşiv sistemi entegrasyonu, Logo MSSQL senkronizasyonu ve Detaylı Vergi Raporlaması',
     'description': """
@@ -65,6 +65,49 @@ Güvenlik ve Performans:
 - Tevkifat Kodu/Açıklaması mapping düzeltmesi: sütun 155-156 → 157-158 - v1.0.18
 - List view yeniden yapılandırıldı (21 zorunlu + 85 opsiyonel field) - v1.0.19
 - Tüm 107 model field'ı list view'da erişilebilir - v1.0.19
+- SOAP senkronizasyonunda toplu UUID upsert (tek sorgu + batch create/write) - v1.0.20
+- SOAP yanıtları lxml iterparse ile akış halinde parse ediliyor, chunk'lı kayıt - v1.0.21
+- izibiz zeep client'ları worker başına cache'leniyor (diskte WSDL cache + keep-alive session) - v1.0.22
+- Tek izibiz oturumu: senkronizasyon çalışması başına bir Login/Logout, oturum süresi dolunca yeniden Login - v1.0.23
+- Cron fetch aşaması: IN, OUT ve E-Arşiv listeleri thread havuzunda eşzamanlı çekilir, yazma cron cursor'ında - v1.0.24
+- SOAP liste LIMIT (25.000) aşımında pencere ikiye bölünür, liste başına pencere boyu hacme göre öğrenilir - v1.0.25
+- SOAP header parmak izi (soap_fingerprint): değişmeyen faturalar yeniden senkronizasyonda yazılmaz - v1.0.26
+- Toplu aktarım modu (tracking kapalı, batch başına compute) ve çalışma başına tek özet mesaj (Senkronizasyon Geçmişi) - v1.0.27
+- E-Arşiv iptal kayıtları toplu upsert ile yazılır, asıl fatura eşleştirmesi pencere sonunda tek SQL ile yapılır - v1.0.28
+- E-Fatura header'ları için PostgreSQL INSERT ... ON CONFLICT DO UPDATE toplu upsert - v1.0.29
+- Logo eşleştirme: tarih aralığı başına tek MSSQL sorgusu, FICHENO/DOCODE hash index ile bellekte eşleştirme - v1.0.30
+- Geniş tarih aralığına yayılan Logo senkronizasyonlarında fatura anahtarları #temp tablo ile toplu eşleştirilir - v1.0.31
+- Logo sorguları index dostu (yarı açık tarih aralığı + UNION), Logo index danışmanı - v1.0.32
+- Logo MSSQL bağlantı havuzu (worker başına, sağlık kontrolü, lookup/report profilleri) - v1.0.33
+- Logo fatura anahtarlarının yerel PostgreSQL kopyası (logo.invoice.key) ve artımlı yenileme cron'u - v1.0.34
+- Logo eşleştirme sonuçları UPDATE ... FROM (VALUES ...) ile toplu yazılıyor - v1.0.35
+- Logo kontrol geçmişi (e.invoice.logo.check), notes alanına Logo satırı eklenmiyor - v1.0.36
+- Geniş Logo eşleştirmeleri tarih parçalarına bölünüp paralel okunuyor (logo.max_parallel_workers) - v1.0.37
+- Logo Monthly Sync sadece vadesi gelen faturaları kontrol ediyor (delta politika, geri çekilme) - v1.0.38
+- Logo ters mutabakat: Logo'da olup e-fatura/e-arşiv karşılığı olmayan faturalar - v1.0.39
+- KDV-2 ve Muhtasar rapor satırları fetchmany ile parça parça okunup toplu create ile yazılıyor - v1.0.40
+- KDV-2 ve Muhtasar sorguları MONTH/YEAR yerine tarih aralığı, NOT IN yerine mevcut ACCDISTDETLN JOIN'i kullanıyor; eski/yeni sorgu karşılaştırma butonu - v1.0.41
+- Kapanmış dönem KDV-2 / Muhtasar raporları için kalıcı kopya (logo.report.snapshot), Logo'dan yenile ve otomatik geçersizleştirme - v1.0.42
+- KDV-2 / Muhtasar rapor satırları oturum (session_id) bazlı; global silme yerine saatlik toplu oturum temizliği cron'u - v1.0.43
+- KDV-2 / Muhtasar doğrudan dışa aktarma: satırlar Odoo'ya yazılmadan openpyxl write_only xlsx veya csv dosyasına akıtılıyor - v1.0.44
+- Yerel Logo kopyası: tazelik kontrolü (boş/bayat kopyada MSSQL'e dönüş), ayar açılınca cron etkinleşir, haftalık tam yenileme - v1.0.45
+- SOAP pencereleri tümü bellekte tutulmadan sayfa sayfa akış halinde çekilip yazılıyor - v1.0.46
+- izibiz oturumu cron'larda context manager ile kapatılıyor; yeniden Login sadece oturum hatası ERROR_CODE'unda - v1.0.47
+- Cron fetch/yazma aşamaları tek yardımcıda; her liste kendi thread'inde sayfa sayfa önden çekilip yazıldıktan sonra bırakılıyor - v1.0.48
+- Paralel Logo eşleştirmede seyrek parçalar #temp tablo ile okunuyor; ilk parça çağıranın bağlantısını kullanıyor - v1.0.49
+- E-Fatura SQL upsert mevcut kayıtları UUID ile çözüyor; yeni kayıtlarda default boolean'lar False yazılıyor - v1.0.50
+- Ters mutabakat sonuçları çalışma kimliğiyle ayrılıyor; kullanıcılar için salt okunur erişim - v1.0.51
+- KDV-2/Muhtasar eski sorgu kopyaları ve karşılaştırma düğmesi kaldırıldı; sorgular sihirbaz metotlarında - v1.0.52
+- Index danışmanı ölçümleri ısınma turu ve dönüşümlü sırayla, iki tarafta aynı işle yapılıyor - v1.0.53
+- Rapor kopyası satırları alan türüne göre açıkça serileştiriliyor; bayatlık kontrolü yerel günle - v1.0.54
+- Logo kontrol geçmişi için saklama süresi: son N kontrol ve X günden yeni satırlar tutuluyor - v1.0.55
+- Rapor dışa aktarma sütunları sihirbazlarda açıkça tanımlı; dışa aktarma rapor kopyası yazmıyor - v1.0.56
+- E-Arşiv otomatik Logo kontrolü sadece bu çalışmada yazılan faturalar için - v1.0.57
+- Havuzdan alınan Logo bağlantıları hata yollarında da with / finally ile iade ediliyor - v1.0.58
+- SOAP sonrası otomatik Logo kontrolü bulunamayan faturalarda son bilinen LOGICALREF'i koruyor - v1.0.59
+- Logo Monthly Sync delta modunda üst sınır bugün; bitiş tarihi yalnızca ilk taramayı sınırlıyor - v1.0.60
+- Ters mutabakat sonuçları için saklama süresi (autovacuum) - v1.0.61
+- KDV-2 / Muhtasar eski-yeni sorgu karşılaştırması geri eklendi (ısınma, ABBA sıralama, satır farkı) - v1.0.62
 
 Detaylı Vergi Raporlaması (v1.0.13):
 - 66 sütunlu İzibiz portal Excel formatı desteği
@@ -109,6 +152,10 @@ Teknik Gereksinimler:
         'views/muhtasar_views.xml',
         'views/earsiv_import_views.xml',  # E-Arşiv Excel import
         'views/tax_import_wizard_views.xml',  # Detaylı Vergi Excel Import (v1.0.14)
+        'views/sync_run_views.xml',  # Senkronizasyon geçmişi (v1.0.27)
+        'views/logo_invoice_key_views.xml',  # Yerel Logo anahtar kopyası (v1.0.34)
+        'views/logo_orphan_views.xml',  # Logo ters mutabakat (v1.0.39)
+        'views/logo_report_snapshot_views.xml',  # Kapanmış dönem rapor kopyaları (v1.0.42)
         'views/menu_views.xml',
     ],
     'demo': [
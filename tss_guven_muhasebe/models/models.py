@@ -2,11 +2,26 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from time import monotonic
+import base64
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from lxml import etree
 from zeep import Client, Settings
+from zeep.cache import SqliteCache
 from zeep.transports import Transport
-import xml.etree.ElementTree as ET
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -18,6 +33,1096 @@ except ImportError:
     pymssql = None
 
 
+def _iter_soap_invoices(content, direction=None):
+    """
+    GetInvoice / GetEArchiveInvoiceList yanıtını akış halinde çöz (v1.0.21)
+
+    Tüm XML ağacını ve fatura listesini bellekte tutmak yerine lxml iterparse
+    ile her INVOICE elementini kapandığı anda dict'e çevirir, ardından işlenen
+    elementleri temizler. Bellek kullanımı yanıttaki fatura sayısından bağımsızdır.
+
+    Args:
+        content (bytes): Ham SOAP yanıtı
+        direction (str): Verilirse her faturaya 'direction' olarak eklenir (E-Fatura)
+
+    Yields:
+        dict: {'ID': ..., 'UUID': ..., <diğer attribute'ler>, 'HEADER': {...}}
+    """
+    # Namespace'li veya namespace'siz INVOICE elementleri ({*} her ikisini de yakalar)
+    context = etree.iterparse(io.BytesIO(content), events=('end',), tag='{*}INVOICE',
+                              huge_tree=True, resolve_entities=False)
+    for _event, invoice_elem in context:
+        invoice_data = dict(invoice_elem.attrib)
+        invoice_data['ID'] = invoice_elem.get('ID')
+        invoice_data['UUID'] = invoice_elem.get('UUID')
+
+        header_elem = invoice_elem.find('{*}HEADER')
+        if header_elem is None:
+            header_elem = invoice_elem.find('.//{*}HEADER')
+        if header_elem is not None:
+            header_data = {}
+            for child in header_elem:
+                if not isinstance(child.tag, str):  # Yorum / processing instruction
+                    continue
+                header_data[etree.QName(child).localname] = child.text
+            invoice_data['HEADER'] = header_data
+
+        if direction:
+            invoice_data['direction'] = direction
+
+        # İşlenen elementi ve önceki kardeşlerini bırak - ağaç büyümesin
+        invoice_elem.clear(keep_tail=True)
+        parent = invoice_elem.getparent()
+        if parent is not None:
+            while invoice_elem.getprevious() is not None:
+                del parent[0]
+
+        yield invoice_data
+    del context
+
+
+def _count_soap_invoices(content):
+    """Ham SOAP yanıtındaki INVOICE elementlerini say (dict üretmeden, akış halinde) (v1.0.25)"""
+    count = 0
+    context = etree.iterparse(io.BytesIO(content), events=('end',), tag='{*}INVOICE',
+                              huge_tree=True, resolve_entities=False)
+    for _event, invoice_elem in context:
+        count += 1
+        invoice_elem.clear(keep_tail=True)
+        parent = invoice_elem.getparent()
+        if parent is not None:
+            while invoice_elem.getprevious() is not None:
+                del parent[0]
+    del context
+    return count
+
+
+def _iter_soap_page_invoices(pages, page_stats, **kwargs):
+    """
+    Pencere sayfalarının faturalarını sayfa sayfa ver (v1.0.46)
+
+    Ham yanıt sayfadan çıkarılıp doğrudan parser'a verilir; parser tükenince
+    yanıt bırakılır. pages bir generator ise (fetch_windows) sonraki pencere
+    ancak bundan sonra çekilir. Pencere boyu öğrenimi için her sayfanın
+    (start, end, count) bilgisi page_stats listesine eklenir.
+    """
+    for page in pages:
+        page_stats.append({'start': page['start'], 'end': page['end'], 'count': page['count']})
+        yield _iter_soap_invoices(page.pop('content'), **kwargs)
+
+
+# ==============================================================================
+# izibiz SOAP CLIENT REGISTRY (v1.0.22)
+# ==============================================================================
+# Her Odoo worker process'i WSDL'i bir kez yükler; sonraki senkronizasyonlar
+# aynı zeep.Client'ı, diskteki WSDL/XSD cache'ini ve keep-alive HTTP
+# session'ını kullanır.
+
+SOAP_WSDL_CACHE_TIMEOUT = 24 * 60 * 60  # saniye - WSDL/XSD dosyaları 1 gün cache'te kalır
+
+_soap_registry_lock = threading.Lock()
+_soap_registry = {'pid': None, 'http_session': None, 'clients': {}}
+
+
+def _get_soap_http_session():
+    """Worker içinde paylaşılan keep-alive requests.Session (lock altında çağrılır)"""
+    if _soap_registry['http_session'] is None:
+        session_ws = requests.Session()
+        session_ws.verify = True
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session_ws.mount('https://', adapter)
+        session_ws.mount('http://', adapter)
+        _soap_registry['http_session'] = session_ws
+    return _soap_registry['http_session']
+
+
+def _get_soap_client(wsdl_url):
+    """
+    WSDL URL'ine göre cache'lenmiş zeep.Client döndür (v1.0.22)
+
+    Client ilk çağrıda oluşturulur; WSDL ve import edilen XSD'ler
+    data_dir altındaki SQLite cache'e yazılır, böylece worker yeniden
+    başladığında bile indirme tekrarlanmaz.
+    """
+    with _soap_registry_lock:
+        # Fork sonrası parent'tan gelen client/socket'leri kullanma
+        if _soap_registry['pid'] != os.getpid():
+            _soap_registry.update({'pid': os.getpid(), 'http_session': None, 'clients': {}})
+
+        client = _soap_registry['clients'].get(wsdl_url)
+        if client is None:
+            cache_dir = tools.config.get('data_dir') or os.path.expanduser('~')
+            os.makedirs(cache_dir, exist_ok=True)
+            transport_ws = Transport(
+                session=_get_soap_http_session(),
+                timeout=60,
+                cache=SqliteCache(path=os.path.join(cache_dir, 'izibiz_wsdl_cache.db'),
+                                  timeout=SOAP_WSDL_CACHE_TIMEOUT),
+            )
+            settings_ws = Settings(strict=False, xml_huge_tree=True, forbid_dtd=False, forbid_entities=False)
+            client = Client(wsdl=wsdl_url, transport=transport_ws, settings=settings_ws)
+            _soap_registry['clients'][wsdl_url] = client
+            _logger.info("SOAP client oluşturuldu ve cache'lendi: %s", wsdl_url)
+        return client
+
+
+class IzibizSession(object):
+    """
+    Tek bir senkronizasyon çalışması boyunca paylaşılan izibiz oturumu (v1.0.23)
+
+    - İlk SOAP çağrısında bir kez Login olur
+    - SESSION_ID hem E-Fatura hem E-Arşiv client'ı tarafından kullanılır
+    - Oturum süresi dolduğunda (SOAP fault) bir kez yeniden Login olup çağrıyı tekrarlar
+    - Çalışma sonunda (context manager çıkışı) bir kez Logout olur
+
+    Odoo environment'ına dokunmaz; config değerleri oluşturulurken verilir.
+    Bu sayede farklı thread'lerden güvenle kullanılabilir.
+    """
+
+    # izibiz oturum süresi dolmuş / geçersiz oturum fault kodları (v1.0.47)
+    # efatura.session_fault_codes parametresi ile (virgülle ayrılmış) değiştirilebilir
+    SESSION_FAULT_CODES = ('10002',)
+
+    def __init__(self, username, password, efatura_ws, earsiv_ws, application_name='Odoo SOAP Client',
+                 session_fault_codes=None):
+        self.username = username
+        self.password = password
+        self.efatura_ws = efatura_ws
+        self.earsiv_ws = earsiv_ws
+        self.application_name = application_name
+        self.session_fault_codes = tuple(session_fault_codes or self.SESSION_FAULT_CODES)
+        self.session_id = None
+        self.login_count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.logout()
+        return False
+
+    @property
+    def efatura_client(self):
+        return _get_soap_client(self.efatura_ws)
+
+    @property
+    def earsiv_client(self):
+        return _get_soap_client(self.earsiv_ws)
+
+    def login(self):
+        """Login ol ve SESSION_ID'yi sakla"""
+        if not self.username or not self.password:
+            raise UserError(_("SOAP kimlik bilgileri yapılandırılmamış!"))
+
+        login_response = self.efatura_client.service.Login(
+            REQUEST_HEADER={
+                'SESSION_ID': '-1',
+                'APPLICATION_NAME': self.application_name,
+            },
+            USER_NAME=self.username,
+            PASSWORD=self.password
+        )
+        self.session_id = login_response.SESSION_ID
+        self.login_count += 1
+        _logger.info("SOAP Login başarılı. Session ID: %s", self.session_id)
+        return self.session_id
+
+    def logout(self):
+        """Açık oturum varsa Logout ol"""
+        with self._lock:
+            if not self.session_id:
+                return
+            session_id, self.session_id = self.session_id, None
+        try:
+            self.efatura_client.service.Logout(REQUEST_HEADER={'SESSION_ID': session_id})
+            _logger.info("Logout başarılı")
+        except Exception as e:
+            _logger.warning("SOAP Logout hatası (Session ID: %s): %s", session_id, str(e))
+
+    def get_session_id(self):
+        """Gerekirse Login olarak geçerli SESSION_ID'yi döndür"""
+        with self._lock:
+            if not self.session_id:
+                self.login()
+            return self.session_id
+
+    def _relogin(self, expired_session_id):
+        """Süresi dolan oturumu yenile - başka thread zaten yenilediyse tekrar Login olma"""
+        with self._lock:
+            if self.session_id == expired_session_id:
+                _logger.info("SOAP oturumu geçersiz (Session ID: %s), yeniden Login olunuyor", expired_session_id)
+                self.login()
+            return self.session_id
+
+    def _is_session_fault(self, response):
+        """
+        Raw SOAP yanıtı oturum kaynaklı bir fault mu?
+
+        SOAP fault'ları HTTP 500 ile döner; sadece fault detayındaki ERROR_CODE
+        oturum hatası kodlarından biriyse yeniden Login yapılır (v1.0.47).
+        Diğer fault'lar (yetki, parametre vb.) olduğu gibi çağırana döner.
+        """
+        if response.status_code != 500:
+            return False
+        try:
+            root = etree.fromstring(response.content)
+        except Exception:
+            return False
+        error_codes = root.xpath('//*[local-name()="ERROR_CODE"]/text()')
+        return any(code.strip() in self.session_fault_codes for code in error_codes)
+
+    def call_raw(self, client, operation, **kwargs):
+        """
+        Operasyonu raw_response ile çağır, oturum hatasında bir kez yeniden dene
+
+        Returns:
+            bytes: Ham SOAP yanıtı
+        """
+        session_id = self.get_session_id()
+        for attempt in range(2):
+            with client.settings(raw_response=True):
+                response = getattr(client.service, operation)(
+                    REQUEST_HEADER={'SESSION_ID': session_id}, **kwargs)
+            if attempt == 0 and self._is_session_fault(response):
+                session_id = self._relogin(session_id)
+                continue
+            break
+        return response.content
+
+    def get_invoice_list(self, start_dt, end_dt, direction, limit=25000):
+        """E-Fatura GetInvoice (HEADER_ONLY) ham yanıtı"""
+        return self.call_raw(
+            self.efatura_client, 'GetInvoice',
+            INVOICE_SEARCH_KEY={
+                'LIMIT': str(limit),
+                'START_DATE': start_dt,
+                'END_DATE': end_dt,
+                'READ_INCLUDED': 'true',
+                'DIRECTION': direction,
+            },
+            HEADER_ONLY='Y',
+        )
+
+    def get_earchive_invoice_list(self, start_dt, end_dt, limit=25000):
+        """E-Arşiv GetEArchiveInvoiceList (HEADER_ONLY) ham yanıtı"""
+        return self.call_raw(
+            self.earsiv_client, 'GetEArchiveInvoiceList',
+            LIMIT=limit,
+            START_DATE=start_dt,
+            END_DATE=end_dt,
+            HEADER_ONLY='Y',
+            READ_INCLUDED='true',
+        )
+
+    def _fetch_list(self, list_key, start_date, end_date, limit):
+        """
+        Tek bir tarih penceresi için liste çek
+
+        Pencere günleri kapsayıcıdır: bitiş günü 23:59:59'a kadar sorgulanır,
+        böylece tek günlük pencereler de boş dönmez.
+        """
+        start_dt = datetime.combine(start_date, time.min)
+        end_dt = datetime.combine(end_date, time(23, 59, 59))
+        if list_key == 'EARSIV':
+            return self.get_earchive_invoice_list(start_dt, end_dt, limit=limit)
+        return self.get_invoice_list(start_dt, end_dt, list_key, limit=limit)
+
+    def _iter_window_bisect(self, list_key, start_date, end_date, limit):
+        """
+        Pencereyi çek; sonuç sayısı LIMIT'e ulaştıysa aralığı ikiye bölüp tekrarla (v1.0.25)
+
+        LIMIT'e ulaşan yanıt kesilmiş olabilir, bu yüzden atılır ve iki yarı ayrı çekilir.
+        En küçük birim gündür; tek gün LIMIT'e ulaşırsa uyarı loglanır ve yanıt olduğu gibi kullanılır.
+        Sayfalar üretildikçe verilir; yarılar da tüketici bir öncekini işledikten sonra çekilir (v1.0.46).
+        """
+        content = self._fetch_list(list_key, start_date, end_date, limit)
+        count = _count_soap_invoices(content)
+        if count >= limit:
+            if start_date < end_date:
+                middle = start_date + timedelta(days=(end_date - start_date).days // 2)
+                _logger.info("izibiz %s: %s - %s penceresi LIMIT'e (%s) ulaştı, ikiye bölünüyor",
+                             list_key, start_date, end_date, limit)
+                del content
+                yield from self._iter_window_bisect(list_key, start_date, middle, limit)
+                yield from self._iter_window_bisect(list_key, middle + timedelta(days=1), end_date, limit)
+                return
+            _logger.warning("izibiz %s: %s tarihinde tek gün LIMIT'e (%s) ulaştı, bazı faturalar eksik olabilir!",
+                            list_key, start_date, limit)
+        page = {
+            'start': start_date,
+            'end': end_date,
+            'count': count,
+            'content': content,
+        }
+        # Yanıta bu frame'de referans kalmasın; tüketici sayfadan çıkarınca bırakılır
+        del content
+        yield page
+
+    def fetch_windows(self, list_key, start_date, end_date, window_days, limit=25000):
+        """
+        Tarih aralığını window_days günlük pencerelere bölerek çek (v1.0.25)
+
+        Generator'dır (v1.0.46): bir sonraki pencere ancak tüketici öncekini
+        işleyip yeni sayfa istediğinde çekilir, böylece bellekte aynı anda tek
+        ham yanıt bulunur.
+
+        Args:
+            list_key (str): 'IN', 'OUT' veya 'EARSIV'
+            start_date, end_date (date): Kapsayıcı tarih aralığı
+            window_days (int): Başlangıç pencere boyu (gün)
+
+        Yields:
+            dict: {'start': date, 'end': date, 'count': int, 'content': bytes}
+        """
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + timedelta(days=max(window_days, 1) - 1), end_date)
+            yield from self._iter_window_bisect(list_key, window_start, window_end, limit)
+            window_start = window_end + timedelta(days=1)
+
+    def fetch_all_lists(self, start_date, end_date, window_days, limit=25000):
+        """
+        E-Fatura IN, E-Fatura OUT ve E-Arşiv listelerini eşzamanlı çek (v1.0.24)
+
+        Üç SOAP çağrısı birbirinden bağımsızdır ve sürenin çoğu ağda beklemekle
+        geçer. Thread'ler sadece bu oturum nesnesini kullanır; Odoo env / cursor
+        thread'lere geçirilmez, yazma işlemi çağıranın cursor'ında yapılır.
+
+        Her liste kendi thread'inde en fazla bir sayfa önde çekilir (v1.0.48);
+        sayfalar tüketildikçe bırakılır, üç listenin tüm yanıtları bellekte birikmez.
+
+        Args:
+            window_days (dict): Liste anahtarı başına pencere boyu (v1.0.25)
+
+        Returns:
+            dict: {'IN': SoapPagePrefetcher, 'OUT': SoapPagePrefetcher, 'EARSIV': SoapPagePrefetcher}
+                  (sayfalar fetch_windows formatında)
+        """
+        # Login'i thread'lerden önce yap - üç thread aynı SESSION_ID'yi kullansın
+        self.get_session_id()
+
+        return {
+            key: SoapPagePrefetcher(
+                self.fetch_windows(key, start_date, end_date, window_days[key], limit),
+                name='izibiz_fetch_%s' % key)
+            for key in ('IN', 'OUT', 'EARSIV')
+        }
+
+
+class SoapPagePrefetcher(object):
+    """
+    Bir listenin pencere sayfalarını arka plan thread'inde önceden çek (v1.0.48)
+
+    Kuyruk tek sayfalıktır: thread, tüketici önceki sayfayı alana kadar bekler.
+    Fetch hatası kuyruk üzerinden tüketiciye iletilir ve iterasyonda yükseltilir.
+    close() thread'i durdurur ve kuyrukta bekleyen sayfayı bırakır.
+    """
+
+    _DONE = object()
+
+    def __init__(self, pages, name, queue_size=1):
+        self.name = name
+        self._pages = pages
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        """Kuyruğa ekle; close() çağrıldıysa vazgeç"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for page in self._pages:
+                if not self._put(page):
+                    return
+                del page
+        except Exception as e:
+            _logger.error("izibiz liste çekme hatası (%s): %s", self.name, str(e))
+            self._put(e)
+            return
+        self._put(self._DONE)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        """Thread'i durdur ve bekleyen sayfaları bırak"""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+
+def _parse_soap_date_range(start_date, end_date):
+    """
+    'YYYY-MM-DD' tarihlerini SOAP servisinin beklediği datetime'lara çevir
+
+    Parse edilemezse son 7 gün döner.
+    """
+    try:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        # Eğer parse edemezse bugünden başla
+        end_dt = datetime.now()
+        start_dt = end_dt - timedelta(days=7)
+    return start_dt, end_dt
+
+
+# ==============================================================================
+# LOGO FATURA EŞLEŞTİRİCİ (v1.0.30)
+# ==============================================================================
+# Logo'da fatura yönüne göre geçerli TRCODE değerleri
+LOGO_TRCODES = {
+    'IN': (1, 3, 4, 13),
+    'OUT': (6, 7, 8, 9, 14),
+}
+
+# Logo kontrol sonuç kodları (v1.0.36) - e.invoice.logo.check ve e.invoice'da ortak
+LOGO_CHECK_RESULTS = [
+    ('found', 'Bulundu'),
+    ('not_found', 'Bulunamadı'),
+    ('multiple', 'Birden Fazla Eş'),
+    ('no_date', 'Tarih Yok'),
+    ('invalid', 'Geçersiz Yön'),
+]
+
+# Tekil fatura sorgusu (v1.0.32): sütun CAST ile sarılmaz ve OR yerine iki
+# anahtar sütunu için ayrı seek yapılıp UNION ile birleştirilir. UNION aynı
+# LOGICALREF'i tekilleştirdiğinden sonuç eski OR'lu sorguyla aynıdır.
+# Parametreler: (fatura_no, gün, gün + 1, fatura_no, gün, gün + 1)
+LOGO_LOOKUP_SQL = """
+    SELECT LOGICALREF FROM {table}
+    WHERE FICHENO = %s AND DATE_ >= %s AND DATE_ < %s
+    AND CANCELLED = 0 AND {trcode_condition}
+    UNION
+    SELECT LOGICALREF FROM {table}
+    WHERE DOCODE = %s AND DATE_ >= %s AND DATE_ < %s
+    AND CANCELLED = 0 AND {trcode_condition}
+"""
+
+# v1.0.31 ve öncesindeki sorgu - yalnızca index danışmanında karşılaştırma için
+# Parametreler: (fatura_no, fatura_no, gün)
+LOGO_LOOKUP_SQL_LEGACY = """
+    SELECT LOGICALREF FROM {table}
+    WHERE (FICHENO = %s OR DOCODE = %s)
+    AND CANCELLED = 0
+    AND CAST(DATE_ AS DATE) = %s
+    AND {trcode_condition}
+"""
+
+# Logo fatura tablosu için önerilen kapsayan indexler: (ad, anahtar sütunlar, include sütunlar)
+LOGO_RECOMMENDED_INDEXES = [
+    ('IX_ODOO_FICHENO_DATE', ('FICHENO', 'DATE_'), ('DOCODE', 'TRCODE', 'CANCELLED')),
+    ('IX_ODOO_DOCODE_DATE', ('DOCODE', 'DATE_'), ('FICHENO', 'TRCODE', 'CANCELLED')),
+    ('IX_ODOO_DATE', ('DATE_',), ('FICHENO', 'DOCODE', 'TRCODE', 'CANCELLED')),
+]
+
+
+class LogoInvoiceMatcher(object):
+    """
+    Logo fatura tablosunu tarih aralığı başına tek sorguyla okuyup faturaları
+    bellekte eşleştirir (v1.0.30)
+
+    Fatura başına `SELECT ... WHERE (FICHENO = %s OR DOCODE = %s) AND
+    CAST(DATE_ AS DATE) = %s` yerine aralıktaki tüm (LOGICALREF, FICHENO,
+    DOCODE, DATE_, TRCODE) satırları bir kez çekilir ve (yön, tarih, numara)
+    anahtarlı hash index kurulur.
+
+    Anahtarlar MSSQL karşılaştırmasına benzesin diye sağdan kırpılıp büyük
+    harfe çevrilir (CI collation, '=' sondaki boşlukları yok sayar).
+
+    Çok sayıda tarihe dağılmış faturalar için tarih aralığı yerine fatura
+    anahtarları #temp tabloya yüklenip tek JOIN ile eşleştirilebilir (load_keys).
+    """
+
+    # Tarih aralığı bu kadar günü aşarsa aralık yerine #temp tablo kullanılır (v1.0.31)
+    RANGE_PREFETCH_MAX_DAYS = 62
+    # Paralel parçada faturalı günler aralığın bu oranından azsa #temp tablo kullanılır (v1.0.49)
+    RANGE_MIN_DAY_FILL = 0.25
+    # MSSQL sorgu başına en fazla 2100 parametre alır; satır başına 3 parametre
+    TEMP_INSERT_BATCH_SIZE = 500
+
+    def __init__(self, cursor, table_name):
+        self.cursor = cursor
+        self.table_name = table_name
+        self._index = {}
+        self.row_count = 0
+
+    @staticmethod
+    def _normalize_key(value):
+        if value is None:
+            return None
+        value = str(value).rstrip().upper()
+        return value or None
+
+    @staticmethod
+    def _direction_of(trcode):
+        for direction, trcodes in LOGO_TRCODES.items():
+            if trcode in trcodes:
+                return direction
+        return None
+
+    @staticmethod
+    def _date_of(value):
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def load_range(self, date_from, date_to, directions=('IN', 'OUT')):
+        """
+        Tarih aralığındaki (kapsayıcı) iptal edilmemiş Logo faturalarını yükle
+
+        DATE_ sütunu CAST ile sarılmaz; yarı açık `DATE_ >= başlangıç AND
+        DATE_ < bitiş + 1 gün` aralığı DATE_ indexinde seek yapabilir (v1.0.32)
+        """
+        trcodes = sorted(code for direction in directions for code in LOGO_TRCODES[direction])
+        query = """
+            SELECT LOGICALREF, FICHENO, DOCODE, DATE_, TRCODE
+            FROM {}
+            WHERE DATE_ >= %s AND DATE_ < %s
+            AND CANCELLED = 0
+            AND TRCODE IN ({})
+        """.format(self.table_name, ','.join(str(code) for code in trcodes))
+        self.cursor.execute(query, (self._date_of(date_from),
+                                    self._date_of(date_to) + timedelta(days=1)))
+        for logicalref, ficheno, docode, date_value, trcode in self.cursor:
+            self._add_row(logicalref, ficheno, docode, date_value, trcode)
+        return self
+
+    def load_for(self, keys):
+        """
+        (yön, tarih) çiftlerini kapsayan en dar aralığı yükle
+
+        Args:
+            keys (iterable): (direction, date) çiftleri; tarihi olmayanlar atlanır
+        """
+        directions = set()
+        dates = []
+        for direction, invoice_date in keys:
+            if direction in LOGO_TRCODES and invoice_date:
+                directions.add(direction)
+                dates.append(self._date_of(invoice_date))
+        if dates:
+            self.load_range(min(dates), max(dates), sorted(directions))
+        return self
+
+    def load_keys(self, keys):
+        """
+        Fatura anahtarlarını #temp tabloya toplu yükleyip tek JOIN ile eşleştir (v1.0.31)
+
+        Round trip sayısı fatura sayısından bağımsızdır: CREATE + (N / 500) çok
+        satırlı INSERT + tek SELECT (satırlar akış halinde okunur) + DROP.
+
+        Args:
+            keys (iterable): (invoice_id, date, direction) üçlüleri
+        """
+        rows = set()
+        for invoice_id, invoice_date, direction in keys:
+            if invoice_id and invoice_date and direction in LOGO_TRCODES:
+                rows.add((str(invoice_id).strip(), self._date_of(invoice_date), direction))
+        if not rows:
+            return self
+
+        # tempdb collation'ı veritabanından farklı olabilir - DATABASE_DEFAULT ile eşitle
+        self.cursor.execute("""
+            CREATE TABLE #odoo_logo_keys (
+                INVOICE_NO NVARCHAR(100) COLLATE DATABASE_DEFAULT NOT NULL,
+                INVOICE_DATE DATE NOT NULL,
+                DIRECTION VARCHAR(3) COLLATE DATABASE_DEFAULT NOT NULL
+            )
+        """)
+        try:
+            for batch in _chunked(rows, self.TEMP_INSERT_BATCH_SIZE):
+                self.cursor.execute(
+                    "INSERT INTO #odoo_logo_keys (INVOICE_NO, INVOICE_DATE, DIRECTION) VALUES "
+                    + ', '.join(['(%s, %s, %s)'] * len(batch)),
+                    tuple(itertools.chain.from_iterable(batch)))
+
+            # OR'lu JOIN yerine iki anahtar sütunu için ayrı seek + UNION (v1.0.32)
+            branch = """
+                SELECT L.LOGICALREF, L.FICHENO, L.DOCODE, L.DATE_, L.TRCODE
+                FROM #odoo_logo_keys K
+                INNER JOIN {table} L
+                    ON L.{column} = K.INVOICE_NO
+                    AND L.DATE_ >= K.INVOICE_DATE
+                    AND L.DATE_ < DATEADD(day, 1, K.INVOICE_DATE)
+                WHERE L.CANCELLED = 0
+                AND ((K.DIRECTION = 'IN' AND L.TRCODE IN ({trcodes_in}))
+                     OR (K.DIRECTION = 'OUT' AND L.TRCODE IN ({trcodes_out})))
+            """
+            fmt = {
+                'table': self.table_name,
+                'trcodes_in': ','.join(str(code) for code in LOGO_TRCODES['IN']),
+                'trcodes_out': ','.join(str(code) for code in LOGO_TRCODES['OUT']),
+            }
+            query = branch.format(column='FICHENO', **fmt) + ' UNION ' + branch.format(column='DOCODE', **fmt)
+            self.cursor.execute(query)
+            for logicalref, ficheno, docode, date_value, trcode in self.cursor:
+                self._add_row(logicalref, ficheno, docode, date_value, trcode)
+        finally:
+            self.cursor.execute("DROP TABLE #odoo_logo_keys")
+        return self
+
+    def load_mirror(self, env, keys):
+        """
+        Eşleştirmeyi MSSQL yerine yerel logo.invoice.key tablosundan yükle (v1.0.34)
+
+        Fatura anahtarları unnest ile PostgreSQL'e tek sorguda verilir; FICHENO ve
+        DOCODE için ayrı JOIN'ler UNION ile birleştirilir (MSSQL sorgusuyla aynı şekil).
+
+        Args:
+            env: Odoo environment
+            keys (iterable): (invoice_id, date, direction) üçlüleri
+        """
+        invoice_nos = []
+        invoice_dates = []
+        seen = set()
+        for invoice_id, invoice_date, direction in keys:
+            key = self._normalize_key(invoice_id)
+            if key and invoice_date and direction in LOGO_TRCODES:
+                row = (key, self._date_of(invoice_date))
+                if row not in seen:
+                    seen.add(row)
+                    invoice_nos.append(row[0])
+                    invoice_dates.append(row[1])
+        if not invoice_nos:
+            return self
+
+        env['logo.invoice.key'].flush_model()
+        env.cr.execute("""
+            WITH q AS (
+                SELECT * FROM unnest(%s::varchar[], %s::date[]) AS q(invoice_no, invoice_date)
+            )
+            SELECT k.logicalref, k.ficheno, k.docode, k.invoice_date, k.trcode
+              FROM logo_invoice_key k
+              JOIN q ON k.ficheno = q.invoice_no AND k.invoice_date = q.invoice_date
+             WHERE k.cancelled IS NOT TRUE
+            UNION
+            SELECT k.logicalref, k.ficheno, k.docode, k.invoice_date, k.trcode
+              FROM logo_invoice_key k
+              JOIN q ON k.docode = q.invoice_no AND k.invoice_date = q.invoice_date
+             WHERE k.cancelled IS NOT TRUE
+        """, (invoice_nos, invoice_dates))
+        for logicalref, ficheno, docode, date_value, trcode in env.cr.fetchall():
+            self._add_row(logicalref, ficheno, docode, date_value, trcode)
+        return self
+
+    def merge(self, other):
+        """Başka bir eşleştiricinin satırlarını bu index'e ekle (v1.0.37)"""
+        for key, refs in other._index.items():
+            self._index.setdefault(key, set()).update(refs)
+        self.row_count += other.row_count
+        return self
+
+    def _add_row(self, logicalref, ficheno, docode, date_value, trcode):
+        direction = self._direction_of(trcode)
+        if not direction:
+            return
+        self.row_count += 1
+        row_date = self._date_of(date_value)
+        # FICHENO ve DOCODE aynıysa satır bir kez sayılır (SQL'deki OR gibi)
+        for key in {self._normalize_key(ficheno), self._normalize_key(docode)}:
+            if key:
+                self._index.setdefault((direction, row_date, key), set()).add(logicalref)
+
+    def find(self, invoice_id, direction, invoice_date):
+        """
+        Eşleşen LOGICALREF listesi (küçükten büyüğe)
+
+        Returns:
+            list
+        """
+        key = self._normalize_key(invoice_id)
+        if not key or not invoice_date:
+            return []
+        return sorted(self._index.get((direction, self._date_of(invoice_date), key), ()))
+
+    def check(self, invoice_id, direction, invoice_date):
+        """
+        LogoSyncWizard._check_invoice_in_logo ile aynı sonuç formatı
+        (bulundu / bulunamadı / birden fazla); sonuç kodu ve eş sayısı da döner (v1.0.36)
+
+        Returns:
+            dict: {'exists': bool, 'logo_record_id': int|None, 'note': str,
+                   'code': LOGO_CHECK_RESULTS anahtarı, 'match_count': int}
+        """
+        if direction not in LOGO_TRCODES:
+            return {
+                'exists': False,
+                'logo_record_id': None,
+                'note': _('Geçersiz direction değeri: %s') % direction,
+                'code': 'invalid',
+                'match_count': 0,
+            }
+        if not invoice_date:
+            return {
+                'exists': False,
+                'logo_record_id': None,
+                'note': _('Fatura tarihi bulunamadı'),
+                'code': 'no_date',
+                'match_count': 0,
+            }
+
+        refs = self.find(invoice_id, direction, invoice_date)
+        if len(refs) == 0:
+            return {
+                'exists': False,
+                'logo_record_id': None,
+                'note': _('Logo veri tabanında bu fatura kaydı bulunamadı'),
+                'code': 'not_found',
+                'match_count': 0,
+            }
+        elif len(refs) == 1:
+            return {
+                'exists': True,
+                'logo_record_id': refs[0],
+                'note': _('Logo eşi var'),
+                'code': 'found',
+                'match_count': 1,
+            }
+        return {
+            'exists': False,
+            'logo_record_id': None,
+            'note': _('Logo veri tabanında birden fazla eş kayıt bulundu'),
+            'code': 'multiple',
+            'match_count': len(refs),
+        }
+
+
+# ==============================================================================
+# LOGO MSSQL BAĞLANTI HAVUZU (v1.0.33)
+# ==============================================================================
+# Her Odoo worker process'i Logo bağlantılarını (sunucu, port, veritabanı,
+# kullanıcı, profil) anahtarıyla havuzda tutar. Teslimde SELECT 1 ile sağlık
+# kontrolü yapılır; uzun süre boşta kalan veya ömrünü dolduran bağlantılar
+# kapatılır. Bağlantı parametreleri tek yerden okunur.
+
+LOGO_MSSQL_PROFILES = {
+    # Fatura eşleştirme sorguları (tekil ve toplu)
+    'lookup': {'timeout': 30, 'login_timeout': 30},
+    # KDV-2, Muhtasar gibi uzun süren rapor sorguları
+    'report': {'timeout': 120, 'login_timeout': 60},
+}
+LOGO_MSSQL_POOL_MAX_IDLE = 4      # anahtar başına boşta tutulacak en fazla bağlantı
+LOGO_MSSQL_IDLE_TIMEOUT = 300     # saniye - bundan uzun boşta kalan bağlantı kapatılır
+LOGO_MSSQL_MAX_LIFETIME = 3600    # saniye - bağlantı en fazla bu kadar süre yeniden kullanılır
+
+_logo_pool_lock = threading.Lock()
+_logo_pool = {'pid': None, 'idle': {}}
+
+
+def _close_mssql_quietly(raw_connection):
+    try:
+        raw_connection.close()
+    except Exception:
+        pass
+
+
+def _get_logo_mssql_params(env):
+    """Logo MSSQL bağlantı parametrelerini config'den oku"""
+    config_param = env['ir.config_parameter'].sudo()
+    return {
+        'server': config_param.get_param('logo.mssql_server'),
+        'port': int(config_param.get_param('logo.mssql_port', '1433')),
+        'database': config_param.get_param('logo.mssql_database'),
+        'username': config_param.get_param('logo.mssql_username'),
+        'password': config_param.get_param('logo.mssql_password'),
+        'table_name': config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE'),
+    }
+
+
+def _logo_mssql_missing_params(params):
+    """Eksik zorunlu bağlantı parametrelerinin adları"""
+    labels = [('server', 'Server'), ('database', 'Database'),
+              ('username', 'Username'), ('password', 'Password')]
+    return [label for key, label in labels if not params.get(key)]
+
+
+class PooledMssqlConnection(object):
+    """
+    Havuzdan alınmış Logo bağlantısı (v1.0.33)
+
+    pymssql bağlantısı gibi kullanılır; close() bağlantıyı kapatmak yerine
+    açık transaction'ı geri alıp havuza iade eder. Context manager olarak da
+    kullanılabilir. close() çağrılmadan bırakılırsa bağlantı kapatılır.
+    """
+
+    def __init__(self, key, raw_connection, created_at):
+        self._key = key
+        self._raw = raw_connection
+        self._created_at = created_at
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        if not self.closed:
+            self.closed = True
+            _close_mssql_quietly(self._raw)
+
+    def cursor(self, *args, **kwargs):
+        return self._raw.cursor(*args, **kwargs)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        """Bağlantıyı havuza iade et"""
+        if self.closed:
+            return
+        self.closed = True
+        _release_logo_mssql_connection(self._key, self._raw, self._created_at)
+
+
+def _acquire_logo_mssql_connection(params, profile):
+    """Havuzdan sağlıklı bir bağlantı al, yoksa yenisini aç"""
+    key = (params['server'], params['port'], params['database'], params['username'], profile)
+    expired = []
+    with _logo_pool_lock:
+        # Fork sonrası parent'tan gelen socket'leri kullanma
+        if _logo_pool['pid'] != os.getpid():
+            _logo_pool.update({'pid': os.getpid(), 'idle': {}})
+
+        # Boşta kalma / ömür sınırını aşan bağlantıları tüm anahtarlardan ayıkla
+        now = monotonic()
+        for idle in _logo_pool['idle'].values():
+            alive = []
+            for raw_connection, created_at, released_at in idle:
+                if now - released_at > LOGO_MSSQL_IDLE_TIMEOUT or now - created_at > LOGO_MSSQL_MAX_LIFETIME:
+                    expired.append(raw_connection)
+                else:
+                    alive.append((raw_connection, created_at, released_at))
+            idle[:] = alive
+
+    for raw_connection in expired:
+        _close_mssql_quietly(raw_connection)
+
+    # En son iade edilen (en sıcak) bağlantıdan başlayarak sağlıklı olanı bul
+    while True:
+        with _logo_pool_lock:
+            idle = _logo_pool['idle'].get(key)
+            entry = idle.pop() if idle else None
+        if entry is None:
+            break
+        raw_connection, created_at, _released_at = entry
+        try:
+            cursor = raw_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return PooledMssqlConnection(key, raw_connection, created_at)
+        except Exception as e:
+            _logger.info("Logo MSSQL: havuzdaki bağlantı sağlık kontrolünden geçemedi, kapatılıyor: %s", str(e))
+            _close_mssql_quietly(raw_connection)
+
+    timeouts = LOGO_MSSQL_PROFILES[profile]
+    raw_connection = pymssql.connect(
+        server=params['server'],
+        port=params['port'],
+        user=params['username'],
+        password=params['password'],
+        database=params['database'],
+        timeout=timeouts['timeout'],
+        login_timeout=timeouts['login_timeout'],
+        charset='UTF-8',
+        appname='Odoo E-Fatura'
+    )
+    return PooledMssqlConnection(key, raw_connection, monotonic())
+
+
+def _release_logo_mssql_connection(key, raw_connection, created_at):
+    """Bağlantıyı havuza iade et; sorunlu veya fazla bağlantıları kapat"""
+    try:
+        # Açık transaction / okunmamış sonuç bırakma
+        raw_connection.rollback()
+    except Exception:
+        _close_mssql_quietly(raw_connection)
+        return
+    released_at = monotonic()
+
+    with _logo_pool_lock:
+        idle = _logo_pool['idle'].setdefault(key, [])
+        keep = (_logo_pool['pid'] == os.getpid()
+                and len(idle) < LOGO_MSSQL_POOL_MAX_IDLE
+                and monotonic() - created_at <= LOGO_MSSQL_MAX_LIFETIME)
+        if keep:
+            idle.append((raw_connection, created_at, released_at))
+    if not keep:
+        _close_mssql_quietly(raw_connection)
+
+
+def _get_logo_mssql_connection(env, profile='lookup'):
+    """
+    Logo MSSQL bağlantısı al (v1.0.33)
+
+    Args:
+        env: Odoo environment (config parametreleri için)
+        profile (str): 'lookup' (kısa sorgular) veya 'report' (uzun raporlar)
+
+    Returns:
+        PooledMssqlConnection: close() ile havuza iade edilir
+
+    Raises:
+        UserError: pymssql yoksa, parametreler eksikse veya bağlantı açılamazsa
+    """
+    if not pymssql:
+        raise UserError(_("pymssql kütüphanesi yüklü değil. 'pip install pymssql' komutunu çalıştırın."))
+
+    params = _get_logo_mssql_params(env)
+    missing_params = _logo_mssql_missing_params(params)
+    if missing_params:
+        raise UserError(_("Logo MSSQL bağlantı parametreleri eksik: %s\n\nLütfen E-Fatura → Yapılandırma menüsünden ayarları tamamlayın.") % ', '.join(missing_params))
+
+    try:
+        return _acquire_logo_mssql_connection(params, profile)
+    except Exception as e:
+        raise UserError(_("MSSQL bağlantı hatası: %s\n\nBağlantı ayarlarını kontrol edin: %s:%s@%s/%s") % (
+            str(e), params['username'], params['port'], params['server'], params['database']))
+
+
+# KDV-2 / Muhtasar rapor satırları bu büyüklükte parçalarla okunup yazılır (v1.0.40)
+LOGO_REPORT_BATCH_SIZE = 2000
+
+
+def _split_logo_keys_by_date(keys, chunk_days):
+    """
+    (invoice_id, date, direction) anahtarlarını en fazla chunk_days günlük
+    ardışık tarih parçalarına böl (v1.0.37)
+
+    Returns:
+        list: Her parça için anahtar listesi (tarih sırasıyla)
+    """
+    valid_keys = sorted(
+        ((invoice_id, LogoInvoiceMatcher._date_of(invoice_date), direction)
+         for invoice_id, invoice_date, direction in keys
+         if invoice_id and invoice_date and direction in LOGO_TRCODES),
+        key=lambda key: key[1])
+    chunks = []
+    chunk_start = None
+    for key in valid_keys:
+        if chunk_start is None or (key[1] - chunk_start).days >= chunk_days:
+            chunks.append([])
+            chunk_start = key[1]
+        chunks[-1].append(key)
+    return chunks
+
+
+def _load_logo_matcher_parallel(params, cursor, keys, chunk_days, max_workers):
+    """
+    Logo eşleştiricisini tarih parçaları halinde paralel yükle (v1.0.37)
+
+    İlk parça çağıranın bağlantısında, diğerleri thread'lerde havuzdan alınan
+    bağlantılarla okunur; toplam bağlantı sayısı havuz boyunu aşmaz (v1.0.49).
+    Yoğun parçalar tek aralık sorgusuyla, faturalı günleri seyrek olan parçalar
+    #temp tablo JOIN'i ile (load_keys) okunur. Parçaların index'leri tek
+    eşleştiricide birleştirilir. Odoo environment'ına dokunmaz - yazma işlemi
+    çağıran tarafta tek toplu UPDATE ile yapılır.
+
+    Args:
+        params (dict): _get_logo_mssql_params sonucu
+        cursor: Çağıranın MSSQL cursor'ı
+        keys (iterable): (invoice_id, date, direction) üçlüleri
+        chunk_days (int): Parça başına en fazla gün sayısı
+        max_workers (int): Aynı anda Logo'ya giden en fazla sorgu
+
+    Returns:
+        LogoInvoiceMatcher
+    """
+    chunks = _split_logo_keys_by_date(keys, chunk_days)
+    matcher = LogoInvoiceMatcher(None, params['table_name'])
+    if not chunks:
+        return matcher
+
+    def load_chunk(chunk_cursor, chunk):
+        chunk_matcher = LogoInvoiceMatcher(chunk_cursor, params['table_name'])
+        span_days = (chunk[-1][1] - chunk[0][1]).days + 1
+        filled_days = len({invoice_date for _invoice_id, invoice_date, _direction in chunk})
+        if filled_days < span_days * LogoInvoiceMatcher.RANGE_MIN_DAY_FILL:
+            return chunk_matcher.load_keys(chunk)
+        return chunk_matcher.load_for(
+            (direction, invoice_date) for _invoice_id, invoice_date, direction in chunk)
+
+    def load_pooled_chunk(chunk):
+        conn = _acquire_logo_mssql_connection(params, 'lookup')
+        try:
+            return load_chunk(conn.cursor(), chunk)
+        finally:
+            conn.close()
+
+    first_chunk, other_chunks = chunks[0], chunks[1:]
+    workers = min(max_workers - 1, LOGO_MSSQL_POOL_MAX_IDLE - 1, len(other_chunks))
+    _logger.info("Logo eşleştirme: %s parça, %s paralel bağlantı", len(chunks), workers + 1)
+    if workers < 1:
+        for chunk in chunks:
+            matcher.merge(load_chunk(cursor, chunk))
+        return matcher
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='logo_match') as executor:
+        # Bir parça hata verirse eksik sonuçla devam etmek yerine hata yükselir
+        chunk_matchers = executor.map(load_pooled_chunk, other_chunks)
+        matcher.merge(load_chunk(cursor, first_chunk))
+        for chunk_matcher in chunk_matchers:
+            matcher.merge(chunk_matcher)
+    return matcher
+
+
+def _soap_vals_fingerprint(vals):
+    """
+    SOAP'tan hazırlanan update vals'ının normalize edilmiş özeti (v1.0.26)
+
+    Float'lar 2 haneye yuvarlanır, None/False boş string sayılır; böylece
+    veritabanından okunan ile SOAP'tan gelen aynı değer aynı özeti verir.
+    """
+    parts = []
+    for key in sorted(vals):
+        value = vals[key]
+        if value is None or value is False:
+            value = ''
+        elif value is True:
+            value = '1'
+        elif isinstance(value, float):
+            value = '%.2f' % value
+        elif isinstance(value, datetime):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        parts.append('%s=%s' % (key, value))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _chunked(iterable, size):
+    """Iterable'ı en fazla `size` elemanlı listeler halinde döndür (v1.0.21)"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class e_invoice(models.Model):
     _name = 'e.invoice'
     _description = 'E-Fatura Kayıtları'
@@ -47,6 +1152,42 @@ class e_invoice(models.Model):
         'exists_in_logo', 'logo_record_id', 'gvn_active', 'active',
     ]
 
+    # SOAP header'ından gelen alanlar (v1.0.26) - bunlar elle değiştirilirse
+    # soap_fingerprint sıfırlanır ve sonraki senkronizasyon kaydı yeniden yazar
+    SOAP_FINGERPRINT_FIELDS = [
+        'sender', 'receiver', 'supplier', 'customer',
+        'issue_date', 'create_date_ws', 'payable_amount',
+        'tax_exclusive_total_amount', 'tax_inclusive_total_amount',
+        'line_extension_amount', 'allowance_total_amount',
+        'profile_id', 'invoice_type_code', 'status', 'status_description',
+        'status_code', 'response_code', 'response_description',
+        'gib_status_code', 'gib_status_description',
+        'envelope_identifier', 'direction', 'kaynak',
+        'from_field', 'to_field', 'currency_code', 'reported',
+        'earchive_type', 'sending_type',
+    ]
+
+    # Toplu aktarım modu (v1.0.27) - sync, import ve Logo yolları bu context ile çalışır:
+    # alan bazlı tracking ve create log mesajları üretilmez, özet mesaj
+    # çalışma sonunda e.invoice.sync.run kaydına tek seferde post edilir
+    INGEST_CONTEXT = {
+        'tracking_disable': True,
+        'mail_notrack': True,
+        'mail_create_nolog': True,
+        'mail_create_nosubscribe': True,
+    }
+
+    # SOAP senkronizasyonunda tek create/write çağrısına giren kayıt sayısı (v1.0.20)
+    SOAP_WRITE_BATCH_SIZE = 1000
+
+    # izibiz liste servisleri en fazla bu kadar kayıt döndürür (v1.0.25)
+    SOAP_LIST_LIMIT = 25000
+    # Öğrenilen pencere boyu sınırları (gün) ve hedef doluluk oranı
+    SOAP_WINDOW_DEFAULT_DAYS = 7
+    SOAP_WINDOW_MIN_DAYS = 1
+    SOAP_WINDOW_MAX_DAYS = 31
+    SOAP_WINDOW_TARGET_FILL = 0.5
+
     # Ana Bilgiler
     invoice_id = fields.Char(string='Fatura ID', required=True, index=True)
     uuid = fields.Char(string='UUID', required=True, index=True)
@@ -104,6 +1245,14 @@ class e_invoice(models.Model):
     gvn_active = fields.Boolean(string='Geçerli Faturalar', compute='_compute_active', store=True)
     exists_in_logo = fields.Boolean(string='Logo\'da Var', default=False, help="Logo entegrasyonunda bu fatura var mı?")
     logo_record_id = fields.Integer(string='Logo Kayıt ID', help="Logo entegrasyonunda bu faturanın ID'si")
+    # Son Logo kontrolü (v1.0.36) - tüm kontroller e.invoice.logo.check'te tutulur
+    last_logo_check_date = fields.Datetime(string='Son Logo Kontrolü', readonly=True, copy=False)
+    last_logo_check_result = fields.Selection(LOGO_CHECK_RESULTS, string='Son Logo Kontrol Sonucu',
+                                              readonly=True, copy=False)
+    logo_check_ids = fields.One2many('e.invoice.logo.check', 'invoice_id', string='Logo Kontrol Geçmişi')
+    logo_check_miss_count = fields.Integer(string='Ardışık Bulunamama', readonly=True, copy=False,
+                                           help="Son başarılı eşleşmeden bu yana ardışık bulunamayan kontrol sayısı "
+                                                "(yeniden deneme aralığı buna göre uzar)")
 
     # Kaynak Bilgisi
     kaynak = fields.Selection([
@@ -155,6 +1304,14 @@ class e_invoice(models.Model):
         help="Bu faturayı iptal eden kayıtlar"
     )
 
+    # Senkronizasyon (v1.0.26)
+    soap_fingerprint = fields.Char(
+        string='SOAP Parmak İzi',
+        readonly=True,
+        copy=False,
+        help="Son yazılan SOAP header değerlerinin özeti. Değişmeyen faturalar yeniden yazılmaz."
+    )
+
     # Notlar
     notes = fields.Text(string='Notlar')
 
@@ -557,6 +1714,10 @@ class e_invoice(models.Model):
                 "Lütfen önce kayıtların kilidini kaldırın."
             )
 
+        # SOAP alanları senkronizasyon dışında değişiyorsa parmak izi geçersizdir (v1.0.26)
+        if 'soap_fingerprint' not in vals and not set(vals).isdisjoint(self.SOAP_FINGERPRINT_FIELDS):
+            vals = dict(vals, soap_fingerprint=False)
+
         return super(e_invoice, self).write(vals)
 
     def action_lock(self):
@@ -713,6 +1874,10 @@ class e_invoice(models.Model):
     @api.model
     def create_from_soap_data(self, soap_data):
         """SOAP servisinden gelen veriyi Odoo modeline dönüştür"""
+        return self.create(self._prepare_invoice_create_vals_from_soap(soap_data))
+
+    def _prepare_invoice_create_vals_from_soap(self, soap_data):
+        """SOAP verisini Odoo vals formatına dönüştür (CREATE için)"""
         invoice_vals = {}
 
         if isinstance(soap_data, dict):
@@ -721,196 +1886,635 @@ class e_invoice(models.Model):
             invoice_vals['uuid'] = soap_data.get('UUID')
             invoice_vals['direction'] = soap_data.get('direction', 'IN')
             invoice_vals['kaynak'] = 'e-fatura'  # E-Fatura kaynağı
-            
-            # Header bilgilerini işle
-            header = soap_data.get('HEADER', {})
-            if header:
-                invoice_vals.update({
-                    'sender': header.get('SENDER'),
-                    'receiver': header.get('RECEIVER'),
-                    'supplier': header.get('SUPPLIER'),
-                    'customer': header.get('CUSTOMER'),
-                    'profile_id': header.get('PROFILEID'),
-                    'invoice_type_code': header.get('INVOICE_TYPE_CODE'),
-                    'status': header.get('STATUS'),
-                    'status_description': header.get('STATUS_DESCRIPTION'),
-                    'status_code': header.get('STATUS_CODE'),
-                    'gib_status_code': header.get('GIB_STATUS_CODE'),
-                    'gib_status_description': header.get('GIB_STATUS_DESCRIPTION'),
-                    'response_code': header.get('RESPONSE_CODE'),  # YENİ (v1.0.4)
-                    'response_description': header.get('RESPONSE_DESCRIPTION'),  # YENİ (v1.0.4)
-                    'envelope_identifier': header.get('ENVELOPE_IDENTIFIER'),
-                    'from_field': header.get('FROM'),
-                    'to_field': header.get('TO'),
-                })
-                
-                # Tarihleri dönüştür - Yardımcı metod kullan
-                if header.get('ISSUE_DATE'):
-                    parsed_date = self._parse_date_field(header.get('ISSUE_DATE'), 'ISSUE_DATE')
-                    if parsed_date:
-                        invoice_vals['issue_date'] = parsed_date
-                
-                if header.get('CDATE'):
-                    parsed_date = self._parse_date_field(header.get('CDATE'), 'CDATE')
-                    if parsed_date:
-                        invoice_vals['create_date_ws'] = parsed_date
-                
-                # Finansal tutarları dönüştür - Yardımcı metod kullan
-                financial_field_mapping = {
-                    'PAYABLE_AMOUNT': 'payable_amount',
-                    'TAX_EXCLUSIVE_TOTAL_AMOUNT': 'tax_exclusive_total_amount',
-                    'TAX_INCLUSIVE_TOTAL_AMOUNT': 'tax_inclusive_total_amount',
-                    'ALLOWANCE_TOTAL_AMOUNT': 'allowance_total_amount',
-                    'LINE_EXTENSION_AMOUNT': 'line_extension_amount'
-                }
-                
-                for soap_field, odoo_field in financial_field_mapping.items():
-                    if header.get(soap_field):
-                        parsed_amount = self._parse_financial_field(header.get(soap_field), soap_field)
-                        invoice_vals[odoo_field] = parsed_amount
-        
-        return self.create(invoice_vals)
 
-    @api.model
-    def _get_soap_client_and_login(self):
-        """
-        Ortak SOAP client oluşturma ve login metodu
-        E-Fatura ve E-Arşiv için ortak kullanılabilir
+            # Header bilgilerini işle (UPDATE ile aynı dönüşüm)
+            invoice_vals.update(self._prepare_invoice_vals_from_soap(soap_data))
 
-        Returns:
-            tuple: (efatura_client, session_id, transport, settings)
-        """
-        soap_config = self.env['ir.config_parameter'].sudo()
-        username = soap_config.get_param('efatura.username')
-        password = soap_config.get_param('efatura.password')
-        efatura_ws = soap_config.get_param('efatura.ws_url',
-            'https://efaturaws.izibiz.com.tr/EInvoiceWS?wsdl')
+        return invoice_vals
 
-        if not username or not password:
-            raise UserError(_("SOAP kimlik bilgileri yapılandırılmamış!"))
+    def _bulk_upsert_soap_invoices(self, invoices, prepare_create, prepare_update, extra_domain=None, log_prefix='SOAP Sync'):
+        """
+        SOAP'tan gelen fatura listesini toplu olarak kaydet (v1.0.20)
 
-        # SOAP transport ayarları
-        session_ws = requests.Session()
-        session_ws.verify = True
-        transport_ws = Transport(session=session_ws, timeout=60)
-        settings_ws = Settings(strict=False, xml_huge_tree=True, forbid_dtd=False, forbid_entities=False)
+        - Penceredeki tüm UUID'ler tek sorguyla çözülür (uuid → kayıt haritası)
+        - Yeni kayıtlar SOAP_WRITE_BATCH_SIZE'lık create(vals_list) çağrılarıyla oluşturulur
+        - Aynı değerlere sahip güncellemeler tek write ile gruplanır
+        - Kilitli kayıtlar eskisi gibi atlanır (v1.0.5)
+        - SOAP header özeti (soap_fingerprint) değişmeyen kayıtlara hiç yazılmaz:
+          UPDATE, tracking ve compute maliyeti oluşmaz (v1.0.26)
+        - Toplu aktarım modunda çalışır; compute'lar batch başına bir kez flush edilir (v1.0.27)
 
-        # E-Fatura Client oluştur
-        efatura_client = Client(wsdl=efatura_ws, transport=transport_ws, settings=settings_ws)
+        Bir batch hata verirse kayıtlar savepoint içinde tek tek yeniden denenir,
+        böylece hatalı tek bir fatura tüm pencereyi düşürmez (v1.0.8 davranışı).
 
-        # Login
-        request_header = {
-            'SESSION_ID': '-1',
-            'APPLICATION_NAME': 'Odoo SOAP Client',
-        }
+        Args:
+            invoices (list): SOAP'tan parse edilmiş fatura dict'leri
+            prepare_create (callable): soap_data → create vals
+            prepare_update (callable): soap_data → write vals
+            extra_domain (list): UUID aramasına eklenecek ek domain
+            log_prefix (str): Log mesajları için önek
 
-        login_response = efatura_client.service.Login(
-            REQUEST_HEADER=request_header,
-            USER_NAME=username,
-            PASSWORD=password
-        )
-        session_id = login_response.SESSION_ID
-        _logger.info("SOAP Login başarılı. Session ID: %s", session_id)
+        Returns:
+            dict: {'created': recordset, 'updated': recordset, 'unchanged': int,
+                   'skipped': int, 'errors': int}
+        """
+        self = self._ingest_mode()
+        created = self.browse()
+        updated = self.browse()
+        unchanged_count = 0
+        skipped_count = 0
+        error_count = 0
+
+        def _uuid_of(invoice_data):
+            return invoice_data.get('UUID') or invoice_data.get('HEADER', {}).get('UUID')
+
+        def _log_error(invoice_data, error):
+            _logger.error("%s hatası (Invoice: %s | UUID: %s): %s", log_prefix,
+                          invoice_data.get('ID') or invoice_data.get('HEADER', {}).get('INVOICE_ID', 'UNKNOWN'),
+                          _uuid_of(invoice_data) or 'UNKNOWN', str(error), exc_info=True)
+
+        # 1. Tüm UUID'leri tek sorguda çöz
+        uuids = list({_uuid_of(data) for data in invoices if _uuid_of(data)})
+        existing_by_uuid = {}
+        if uuids:
+            domain = [('uuid', 'in', uuids)] + (extra_domain or [])
+            for record in self.search(domain):
+                # search(limit=1) ile aynı sonuç: _order'a göre ilk kayıt kazanır
+                existing_by_uuid.setdefault(record.uuid, record)
+
+        # 2. Faturaları oluşturulacak / güncellenecek olarak ayır
+        create_vals_by_uuid = {}
+        update_vals_by_id = {}
+        for invoice_data in invoices:
+            try:
+                uuid = _uuid_of(invoice_data)
+                existing_invoice = existing_by_uuid.get(uuid)
+
+                if existing_invoice:
+                    # Kilitli kayıtları güncelleme (v1.0.5)
+                    if existing_invoice.is_locked:
+                        _logger.info(f"{log_prefix}: Kilitli kayıt atlandı - {existing_invoice.invoice_id}")
+                        skipped_count += 1
+                        continue
+                    update_vals = prepare_update(invoice_data)
+                    fingerprint = _soap_vals_fingerprint(update_vals)
+                    # Header değişmediyse yazma (v1.0.26) - soap_fingerprint search ile birlikte okundu
+                    if existing_invoice.soap_fingerprint == fingerprint:
+                        unchanged_count += 1
+                        continue
+                    update_vals['soap_fingerprint'] = fingerprint
+                    update_vals_by_id[existing_invoice.id] = update_vals
+                else:
+                    # Aynı pencerede tekrar eden UUID: son gelen veri kazanır
+                    create_vals = prepare_create(invoice_data)
+                    create_vals['soap_fingerprint'] = _soap_vals_fingerprint(prepare_update(invoice_data))
+                    create_vals_by_uuid[uuid] = create_vals
+            except Exception as e:
+                error_count += 1
+                _log_error(invoice_data, e)
+
+        # 3. Yeni kayıtları batch'ler halinde oluştur
+        vals_list = list(create_vals_by_uuid.values())
+        for i in range(0, len(vals_list), self.SOAP_WRITE_BATCH_SIZE):
+            batch = vals_list[i:i + self.SOAP_WRITE_BATCH_SIZE]
+            try:
+                with self.env.cr.savepoint():
+                    created |= self.create(batch)
+            except Exception as e:
+                _logger.warning("%s: Toplu oluşturma başarısız (%s kayıt), tek tek deneniyor: %s",
+                                log_prefix, len(batch), str(e))
+                for vals in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            created |= self.create(vals)
+                    except Exception as row_error:
+                        error_count += 1
+                        _log_error({'ID': vals.get('invoice_id'), 'UUID': vals.get('uuid')}, row_error)
+
+        # 4. Güncellemeleri aynı vals'a göre grupla ve toplu yaz
+        update_groups = {}
+        for record_id, vals in update_vals_by_id.items():
+            key = tuple(sorted(vals.items()))
+            update_groups.setdefault(key, []).append(record_id)
+
+        for key, record_ids in update_groups.items():
+            vals = dict(key)
+            records = self.browse(record_ids)
+            try:
+                with self.env.cr.savepoint():
+                    records.write(vals)
+                updated |= records
+            except Exception as e:
+                _logger.warning("%s: Toplu güncelleme başarısız (%s kayıt), tek tek deneniyor: %s",
+                                log_prefix, len(records), str(e))
+                for record in records:
+                    try:
+                        with self.env.cr.savepoint():
+                            record.write(vals)
+                        updated |= record
+                    except Exception as row_error:
+                        error_count += 1
+                        _log_error({'ID': record.invoice_id, 'UUID': record.uuid}, row_error)
+
+        if unchanged_count:
+            _logger.info("%s: %s değişmeyen fatura atlandı", log_prefix, unchanged_count)
+
+        return {
+            'created': created,
+            'updated': updated,
+            'unchanged': unchanged_count,
+            'skipped': skipped_count,
+            'errors': error_count,
+        }
+
+    def _ingest_mode(self):
+        """
+        Toplu aktarım modunda recordset döndür (v1.0.27)
+
+        mail.thread tracking (mail.tracking.value / mail.message) kapatılır.
+        Stored compute'lar (_compute_active, _get_status_detail) yazma sırasında
+        sadece işaretlenir ve batch savepoint'inin flush'ında tüm batch için
+        tek seferde hesaplanır.
+        """
+        return self.with_context(**self.INGEST_CONTEXT)
+
+    # SQL upsert'te boş gelirse mevcut değeri koruyan kolonlar (v1.0.29):
+    # _prepare_invoice_vals_from_soap bunları sadece header'da değer varsa ekler,
+    # ORM write'ta olduğu gibi eksik değer mevcut veriyi silmemeli
+    SOAP_UPSERT_KEEP_IF_MISSING = (
+        'issue_date', 'create_date_ws', 'payable_amount',
+        'tax_exclusive_total_amount', 'tax_inclusive_total_amount',
+        'allowance_total_amount', 'line_extension_amount',
+    )
+
+    def _sql_upsert_soap_invoices(self, invoices):
+        """
+        E-Fatura header'larını PostgreSQL'e toplu SQL ile yaz (v1.0.29)
+
+        - Sadece SOAP_MANAGED_FIELDS kolonları (ve soap_fingerprint) yazılır
+        - Mevcut kayıtlar ORM yolu gibi UUID ile tek sorguda çözülür (v1.0.50);
+          header'daki invoice_id değişse de aynı UUID'li kayıt güncellenir
+        - Mevcut kayıtlar tek `UPDATE ... FROM (VALUES ...)` ile güncellenir
+        - Yeni kayıtlar INSERT ... ON CONFLICT ile eklenir; çakışma hedefi
+          unique_invoice_record (invoice_id, kaynak, uuid) constraint'idir, böylece
+          üst üste binen cron'lar arasında search-then-create yarışı olmaz
+        - Kilitli kayıtlar ve parmak izi değişmeyen kayıtlar UPDATE edilmez
+        - Stored compute'lar sadece yazılan id'ler için hesaplanır
+
+        Args:
+            invoices (list): SOAP'tan parse edilmiş e-fatura dict'leri
+
+        Returns:
+            dict: _bulk_upsert_soap_invoices ile aynı format
+        """
+        allowed_columns = set(self.SOAP_MANAGED_FIELDS) | {'soap_fingerprint'}
+
+        # Satırları hazırla - aynı UUID tekrar ederse son gelen kazanır
+        # (ON CONFLICT aynı satırı iki kez güncelleyemez)
+        rows_by_uuid = {}
+        error_count = 0
+        for invoice_data in invoices:
+            try:
+                vals = self._prepare_invoice_create_vals_from_soap(invoice_data)
+                vals['soap_fingerprint'] = _soap_vals_fingerprint(self._prepare_invoice_vals_from_soap(invoice_data))
+                if not vals.get('invoice_id') or not vals.get('uuid'):
+                    raise ValidationError(_("invoice_id / uuid eksik"))
+                rows_by_uuid[vals['uuid']] = vals
+            except Exception as e:
+                error_count += 1
+                _logger.error("E-Fatura SQL upsert hazırlama hatası (Invoice: %s | UUID: %s): %s",
+                              invoice_data.get('ID'), invoice_data.get('UUID'), str(e))
+        if not rows_by_uuid:
+            return {'created': self.browse(), 'updated': self.browse(), 'unchanged': 0,
+                    'skipped': 0, 'errors': error_count}
+
+        # Mevcut kayıtları UUID ile çöz - search(limit=1) ile aynı sonuç: _order'a göre ilk kayıt
+        self.flush_model()
+        existing_by_uuid = {}
+        for record in self.search([('uuid', 'in', list(rows_by_uuid))]):
+            existing_by_uuid.setdefault(record.uuid, record)
+
+        insert_rows = []
+        update_rows = []
+        skipped_count = 0
+        unchanged_count = 0
+        for uuid_value, vals in rows_by_uuid.items():
+            existing_invoice = existing_by_uuid.get(uuid_value)
+            if not existing_invoice:
+                insert_rows.append(vals)
+            elif existing_invoice.is_locked:
+                skipped_count += 1
+            elif existing_invoice.soap_fingerprint == vals['soap_fingerprint']:
+                unchanged_count += 1
+            else:
+                update_rows.append((existing_invoice.id, vals))
+        if skipped_count:
+            _logger.info("E-Fatura SQL upsert: %s kilitli kayıt atlandı", skipped_count)
+
+        columns = sorted({key for vals in rows_by_uuid.values() for key in vals} & allowed_columns)
+        update_columns = [column for column in columns if column not in ('invoice_id', 'kaynak', 'uuid')]
+        now = fields.Datetime.now()
+        uid = self.env.uid
+
+        def _row_values(vals):
+            values = []
+            for column in columns:
+                value = vals.get(column)
+                if isinstance(value, float):
+                    value = round(value, 2)  # digits=(16, 2) - ORM'deki gibi yuvarla
+                values.append(value)
+            return values
+
+        created = self.browse()
+        updated = self.browse()
+
+        if update_rows:
+            set_clauses = []
+            for column in update_columns:
+                value_sql = 'v."{0}"::{1}'.format(column, self._fields[column].column_type[1])
+                if column in self.SOAP_UPSERT_KEEP_IF_MISSING:
+                    set_clauses.append('"{0}" = COALESCE({1}, e_invoice."{0}")'.format(column, value_sql))
+                else:
+                    set_clauses.append('"{0}" = {1}'.format(column, value_sql))
+            set_clauses += ['write_uid = %s', 'write_date = %s']
+
+            # SET'teki write_uid / write_date parametreleri VALUES satırlarından önce gelir
+            params = [uid, now]
+            for record_id, vals in update_rows:
+                params.append(record_id)
+                params.extend(_row_values(vals))
+
+            row_placeholder = '(%s)' % ', '.join(['%s'] * (len(columns) + 1))
+            query = """
+                UPDATE e_invoice
+                   SET {set_clauses}
+                  FROM (VALUES {values}) AS v(id, {columns})
+                 WHERE e_invoice.id = v.id
+                   AND e_invoice.is_locked IS NOT TRUE
+             RETURNING e_invoice.id
+            """.format(
+                set_clauses=', '.join(set_clauses),
+                values=', '.join([row_placeholder] * len(update_rows)),
+                columns=', '.join('"%s"' % column for column in columns),
+            )
+            self.env.cr.execute(query, params)
+            updated = self.browse([row[0] for row in self.env.cr.fetchall()])
+            # Okuma ile UPDATE arasında kilitlenen kayıtlar
+            unchanged_count += len(update_rows) - len(updated)
+
+        if insert_rows:
+            # Default'lu boolean'lar NULL kalmasın - ORM create ile aynı değerler (v1.0.50)
+            insert_defaults = [
+                ('active', True), ('is_cancellation', False), ('is_locked', False),
+                ('exists_in_logo', False), ('reported', False), ('harici_iptal', False),
+                ('excel_imported', False),
+                ('create_uid', uid), ('create_date', now), ('write_uid', uid), ('write_date', now),
+            ]
+            insert_columns = columns + [column for column, _value in insert_defaults]
+            params = []
+            for vals in insert_rows:
+                params.extend(_row_values(vals))
+                params.extend(value for _column, value in insert_defaults)
+
+            set_clauses = []
+            for column in update_columns:
+                if column in self.SOAP_UPSERT_KEEP_IF_MISSING:
+                    set_clauses.append('"{0}" = COALESCE(EXCLUDED."{0}", e_invoice."{0}")'.format(column))
+                else:
+                    set_clauses.append('"{0}" = EXCLUDED."{0}"'.format(column))
+            set_clauses += ['write_uid = EXCLUDED.write_uid', 'write_date = EXCLUDED.write_date']
+
+            row_placeholder = '(%s)' % ', '.join(['%s'] * len(insert_columns))
+            query = """
+                INSERT INTO e_invoice ({columns})
+                VALUES {values}
+                ON CONFLICT ON CONSTRAINT e_invoice_unique_invoice_record DO UPDATE
+                   SET {set_clauses}
+                 WHERE e_invoice.is_locked IS NOT TRUE
+                   AND e_invoice.soap_fingerprint IS DISTINCT FROM EXCLUDED.soap_fingerprint
+             RETURNING id, (xmax = 0) AS inserted
+            """.format(
+                columns=', '.join('"%s"' % column for column in insert_columns),
+                values=', '.join([row_placeholder] * len(insert_rows)),
+                set_clauses=', '.join(set_clauses),
+            )
+            self.env.cr.execute(query, params)
+            returned = self.env.cr.fetchall()
+            created = self.browse([row[0] for row in returned if row[1]])
+            # Arada başka bir cron eklediyse çakışan satır güncellenmiş olur
+            updated |= self.browse([row[0] for row in returned if not row[1]])
+            # Dönmeyen satırlar: eşzamanlı eklenmiş ve kilitli / değişmemiş
+            unchanged_count += len(insert_rows) - len(returned)
+
+        # Cache'i tazele ve stored compute'ları sadece yazılan kayıtlar için hesapla
+        written = created | updated
+        if written:
+            written.invalidate_recordset(update_columns + ['write_uid', 'write_date'])
+            for field_name in ('gvn_active', 'status_detail'):
+                self.env.add_to_compute(self._fields[field_name], written)
+            written.flush_recordset(['gvn_active', 'status_detail'])
+
+        return {
+            'created': created,
+            'updated': updated,
+            'unchanged': unchanged_count,
+            'skipped': skipped_count,
+            'errors': error_count,
+        }
+
+    @api.model
+    def _apply_logo_match_results(self, results, source, keep_ref=False):
+        """
+        Logo eşleştirme sonuçlarını toplu yaz (v1.0.35)
+
+        Fatura başına write() yerine SOAP_WRITE_BATCH_SIZE'lık parçalar halinde tek
+        `UPDATE ... FROM (VALUES ...)` çalıştırılır. Aynı ifade güncellenen her
+        fatura için e.invoice.logo.check geçmiş satırını da ekler; sonuç notes
+        alanına yazılmaz (v1.0.36).
+
+        - Kilitli kayıtlar SQL'de atlanır (write override'ı ile aynı koruma)
+        - exists_in_logo / logo_record_id / son kontrol alanlarına bağlı stored
+          compute ve tracking yoktur; sadece ORM cache'i tazelenir
+
+        Args:
+            results (list): (e.invoice id, exists, logo_record_id, sonuç kodu, eş sayısı)
+                beşlileri. logo_record_id False/None ise alan temizlenir.
+            source (str): e.invoice.logo.check source değeri
+            keep_ref (bool): True ise bulunamayan faturaların son bilinen
+                logo_record_id'si korunur; sadece exists_in_logo False olur.
+                SOAP sonrası otomatik kontrolün eski davranışıdır (v1.0.59)
+
+        Returns:
+            int: Yazılan kayıt sayısı
+        """
+        if not results:
+            return 0
+
+        written_count = 0
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        self.flush_model(['exists_in_logo', 'logo_record_id', 'is_locked'])
+        for chunk in _chunked(results, self.SOAP_WRITE_BATCH_SIZE):
+            params = [now, uid, now]
+            for invoice_id, exists, logo_record_id, result_code, match_count in chunk:
+                params.extend([invoice_id, bool(exists), logo_record_id or None, result_code, match_count or 0])
+            params.extend([source, uid, now, uid, now])
+            self.env.cr.execute("""
+                WITH updated AS (
+                    UPDATE e_invoice AS e
+                       SET exists_in_logo = v.found,
+                           logo_record_id = {ref_sql},
+                           last_logo_check_date = %s::timestamp,
+                           last_logo_check_result = v.result,
+                           logo_check_miss_count = CASE
+                               WHEN v.result = 'found' THEN 0
+                               ELSE COALESCE(e.logo_check_miss_count, 0) + 1
+                           END,
+                           write_uid = %s,
+                           write_date = %s
+                      FROM (VALUES {values}) AS v(id, found, ref, result, match_count)
+                     WHERE e.id = v.id
+                       AND e.is_locked IS NOT TRUE
+                 RETURNING e.id, e.last_logo_check_date, v.result, v.ref, v.match_count
+                )
+                INSERT INTO e_invoice_logo_check
+                       (invoice_id, check_date, result, logicalref, match_count, source,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT id, last_logo_check_date, result, ref, match_count, %s, %s, %s, %s, %s
+                  FROM updated
+            """.format(
+                values=', '.join(['(%s::int, %s::bool, %s::int, %s::varchar, %s::int)'] * len(chunk)),
+                ref_sql='CASE WHEN v.found THEN v.ref ELSE e.logo_record_id END' if keep_ref else 'v.ref',
+            ), params)
+            written_count += self.env.cr.rowcount
+
+        self.invalidate_model(['exists_in_logo', 'logo_record_id', 'last_logo_check_date',
+                               'last_logo_check_result', 'logo_check_miss_count', 'logo_check_ids',
+                               'write_uid', 'write_date'])
+        self.env['e.invoice.logo.check'].invalidate_model()
+        return written_count
+
+    @api.model
+    def _search_logo_recheck_due(self, date_from, date_to, limit=None):
+        """
+        Logo kontrolü vadesi gelmiş faturalar (v1.0.38)
 
-        return efatura_client, session_id, transport_ws, settings_ws
+        Politika (ir.config_parameter ile ayarlanır):
+        - Hiç kontrol edilmemiş faturalar her zaman vadelidir ve önce gelir
+        - Son kontrolden sonra değişen faturalar (write_date > last_logo_check_date) vadelidir
+        - Bulunmuş faturalar logo.recheck_found_days günde bir yeniden doğrulanır (varsayılan 30)
+        - Bulunamayanlar üstel geri çekilmeyle yeniden denenir:
+          logo.recheck_retry_base_hours * 2^(ardışık bulunamama - 1), en fazla
+          logo.recheck_retry_max_days gün (varsayılan 6 saat / 14 gün)
+
+        Böylece sabit durumda Logo trafiği tablo boyuyla değil değişiklik miktarıyla orantılıdır.
+
+        Args:
+            date_from (date): issue_date alt sınırı (dahil)
+            date_to (date): issue_date üst sınırı (dahil)
+            limit (int): En fazla kayıt (öncelik sırasıyla)
+
+        Returns:
+            recordset: e.invoice
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        self.flush_model(['issue_date', 'kaynak', 'is_locked', 'active', 'last_logo_check_date',
+                          'last_logo_check_result', 'logo_check_miss_count'])
+        self.env.cr.execute("""
+            SELECT id
+              FROM e_invoice
+             WHERE issue_date >= %(date_from)s AND issue_date < %(date_to_next)s
+               AND kaynak IN ('e-fatura', 'e-arsiv')
+               AND is_locked IS NOT TRUE
+               AND active IS TRUE
+               AND (last_logo_check_date IS NULL
+                    OR write_date > last_logo_check_date
+                    OR (last_logo_check_result = 'found'
+                        AND last_logo_check_date < %(now)s - make_interval(days => %(found_days)s))
+                    OR (last_logo_check_result IS DISTINCT FROM 'found'
+                        AND last_logo_check_date < %(now)s - LEAST(
+                            make_interval(hours => %(base_hours)s)
+                                * power(2, LEAST(GREATEST(COALESCE(logo_check_miss_count, 1), 1) - 1, 16)),
+                            make_interval(days => %(max_days)s))))
+             ORDER BY last_logo_check_date IS NULL DESC,
+                      write_date > last_logo_check_date DESC,
+                      last_logo_check_date,
+                      id
+             LIMIT %(limit)s
+        """, {
+            'date_from': date_from,
+            'date_to_next': date_to + timedelta(days=1),
+            'now': fields.Datetime.now(),
+            'found_days': int(ICPSudo.get_param('logo.recheck_found_days', '30')),
+            'base_hours': int(ICPSudo.get_param('logo.recheck_retry_base_hours', '6')),
+            'max_days': int(ICPSudo.get_param('logo.recheck_retry_max_days', '14')),
+            'limit': limit,
+        })
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
 
     @api.model
-    def sync_invoices_from_soap(self, start_date, end_date, direction='IN'):
-        """SOAP servisinden faturaları senkronize et - Logo otomatik sync ile"""
+    def _get_soap_window_days(self, list_key):
+        """
+        Liste anahtarı ('IN', 'OUT', 'EARSIV') için öğrenilmiş pencere boyu (v1.0.25)
+
+        Returns:
+            int: Gün sayısı
+        """
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            'efatura.sync_window_days.%s' % list_key)
         try:
-            # Ortak SOAP client ve login
-            efatura_client, session_id, transport_ws, settings_ws = self._get_soap_client_and_login()
+            window_days = int(value)
+        except (TypeError, ValueError):
+            window_days = self.SOAP_WINDOW_DEFAULT_DAYS
+        return max(self.SOAP_WINDOW_MIN_DAYS, min(self.SOAP_WINDOW_MAX_DAYS, window_days))
+
+    @api.model
+    def _learn_soap_window_days(self, list_key, pages):
+        """
+        Son çekilen sayfaların günlük hacmine göre pencere boyunu güncelle (v1.0.25)
+
+        Hedef: bir pencere LIMIT'in ~%50'si kadar kayıt döndürsün. Yoğun aylarda
+        pencere küçülür, sakin aylarda büyür. Ani sıçramaları önlemek için
+        mevcut değerle yeni hedefin ortalaması alınır.
+        """
+        total_days = sum((page['end'] - page['start']).days + 1 for page in pages)
+        if not total_days:
+            return
+        total_count = sum(page['count'] for page in pages)
+        current_days = self._get_soap_window_days(list_key)
+
+        per_day = float(total_count) / total_days
+        if per_day:
+            target_days = int(self.SOAP_LIST_LIMIT * self.SOAP_WINDOW_TARGET_FILL / per_day)
+        else:
+            target_days = self.SOAP_WINDOW_MAX_DAYS
+        new_days = (current_days + target_days + 1) // 2
+        new_days = max(self.SOAP_WINDOW_MIN_DAYS, min(self.SOAP_WINDOW_MAX_DAYS, new_days))
+
+        if new_days != current_days:
+            self.env['ir.config_parameter'].sudo().set_param(
+                'efatura.sync_window_days.%s' % list_key, str(new_days))
+            _logger.info("izibiz %s pencere boyu güncellendi: %s → %s gün (günlük ~%.0f fatura)",
+                         list_key, current_days, new_days, per_day)
+
+    @api.model
+    def _fetch_soap_pages(self, izibiz_session, list_key, start_dt, end_dt):
+        """Tarih aralığını öğrenilmiş pencere boyu ve LIMIT bölme ile çek (v1.0.25)"""
+        return izibiz_session.fetch_windows(
+            list_key, start_dt.date(), end_dt.date(),
+            self._get_soap_window_days(list_key), limit=self.SOAP_LIST_LIMIT)
+
+    @api.model
+    def _get_izibiz_session(self, application_name='Odoo SOAP Client'):
+        """
+        Config parametrelerinden izibiz oturum yöneticisi oluştur (v1.0.23)
+
+        Login ilk SOAP çağrısında yapılır; kimlik bilgisi eksikse hata o anda oluşur.
+
+        Returns:
+            IzibizSession
+        """
+        soap_config = self.env['ir.config_parameter'].sudo()
+        return IzibizSession(
+            soap_config.get_param('efatura.username'),
+            soap_config.get_param('efatura.password'),
+            soap_config.get_param('efatura.ws_url',
+                'https://efaturaws.izibiz.com.tr/EInvoiceWS?wsdl'),
+            soap_config.get_param('efatura.earsiv_ws',
+                'https://earsivws.izibiz.com.tr/EIArchiveWS/EFaturaArchive?wsdl'),
+            application_name=application_name,
+            session_fault_codes=[code.strip() for code in soap_config.get_param(
+                'efatura.session_fault_codes', '').split(',') if code.strip()],
+        )
 
-            # Fatura listesini al
-            request_header = {'SESSION_ID': session_id}
+    @api.model
+    def _get_soap_client_and_login(self):
+        """
+        Ortak SOAP client oluşturma ve login metodu
+        E-Fatura ve E-Arşiv için ortak kullanılabilir
+
+        Returns:
+            tuple: (efatura_client, session_id, transport, settings)
+        """
+        izibiz_session = self._get_izibiz_session()
+        session_id = izibiz_session.login()
+        efatura_client = izibiz_session.efatura_client
+        return efatura_client, session_id, efatura_client.transport, efatura_client.settings
+
+    @api.model
+    def sync_invoices_from_soap(self, start_date, end_date, direction='IN', izibiz_session=None,
+                                prefetched_pages=None):
+        """
+        SOAP servisinden faturaları senkronize et - Logo otomatik sync ile
+
+        izibiz_session verilirse (cron çalışmaları) o oturum kullanılır ve
+        Logout çağırana bırakılır; verilmezse metod kendi oturumunu açıp kapatır.
+
+        prefetched_pages verilirse (v1.0.24) SOAP çağrısı atlanır ve cron'un
+        eşzamanlı fetch aşamasında çekilmiş pencere yanıtları yazılır.
+
+        Liste, öğrenilmiş pencere boyuna göre parçalanarak çekilir; LIMIT'e
+        ulaşan pencereler ikiye bölünür (v1.0.25).
+        """
+        self = self._ingest_mode()  # Toplu aktarım modu (v1.0.27)
+        own_session = izibiz_session is None and prefetched_pages is None
+        try:
+            if own_session:
+                izibiz_session = self._get_izibiz_session()
 
             # Tarihleri datetime objesine çevir (SOAP servisi datetime bekliyor)
-            from datetime import datetime as dt
-            try:
-                start_dt = dt.strptime(start_date, '%Y-%m-%d')
-                end_dt = dt.strptime(end_date, '%Y-%m-%d')
-            except:
-                # Eğer parse edemezse bugünden başla
-                end_dt = dt.now()
-                start_dt = end_dt - timedelta(days=7)
+            start_dt, end_dt = _parse_soap_date_range(start_date, end_date)
 
-            search_key = {
-                'LIMIT': '25000',
-                'START_DATE': start_dt,
-                'END_DATE': end_dt,
-                'READ_INCLUDED': 'true',
-                'DIRECTION': direction,
-            }
-            
-            with efatura_client.settings(raw_response=True):
-                raw_xml_response = efatura_client.service.GetInvoice(
-                    REQUEST_HEADER=request_header,
-                    INVOICE_SEARCH_KEY=search_key,
-                    HEADER_ONLY='Y',
-                )
-                
-                # XML'i parse et
-                root = ET.fromstring(raw_xml_response.content)
-                invoices = []
-
-                for invoice_elem in root.findall('.//INVOICE') or root.findall('.//*[local-name()="INVOICE"]'):
-                    invoice_data = {}
-                    header_elem = invoice_elem.find('HEADER') or invoice_elem.find('.//*[local-name()="HEADER"]')
-
-                    if header_elem is not None:
-                        header_data = {}
-                        for child in header_elem:
-                            tag_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                            header_data[tag_name] = child.text
-                        invoice_data['HEADER'] = header_data
-
-                    invoice_data['ID'] = invoice_elem.get('ID')
-                    invoice_data['UUID'] = invoice_elem.get('UUID')
-                    invoice_data['direction'] = direction
-                    invoices.append(invoice_data)
-            
-            # Logout
-            efatura_client.service.Logout(REQUEST_HEADER=request_header)
-            
-            # Odoo'ya kaydet
+            # Fatura listesini al (paylaşılan oturum - v1.0.23)
+            if prefetched_pages is not None:
+                if isinstance(prefetched_pages, Exception):
+                    raise prefetched_pages
+                pages = prefetched_pages
+            else:
+                # Pencereler yazma döngüsü ilerledikçe çekilir (v1.0.46)
+                pages = self._fetch_soap_pages(izibiz_session, direction, start_dt, end_dt)
+
+            # Odoo'ya kaydet - akış halinde parse + sabit boyutlu chunk'larla toplu upsert (v1.0.21)
+            # Chunk başına tek INSERT ... ON CONFLICT DO UPDATE (v1.0.29)
             created_count = 0
             updated_count = 0
-            
-            for invoice_data in invoices:
-                try:  # Exception handling (v1.0.8)
-                    # UUID unique olduğu için tek başına yeterli (v1.0.6 performans optimizasyonu)
-                    existing_invoice = self.search([
-                        ('uuid', '=', invoice_data.get('UUID'))
-                    ], limit=1)
-
-                    if existing_invoice:
-                        # Kilitli kayıtları güncelleme (v1.0.5)
-                        if existing_invoice.is_locked:
-                            _logger.info(f"SOAP Sync: Kilitli kayıt atlandı - {existing_invoice.invoice_id}")
-                            continue
+            upsert_totals = dict.fromkeys(('unchanged', 'skipped', 'errors'), 0)
+            touched_invoices = self.browse()  # Logo adımı sadece bu kayıtlar için çalışır
+            page_stats = []
+            try:
+                for page_invoices in _iter_soap_page_invoices(pages, page_stats, direction=direction):
+                    for invoice_chunk in _chunked(page_invoices, self.SOAP_WRITE_BATCH_SIZE):
+                        try:
+                            with self.env.cr.savepoint():
+                                upsert_result = self._sql_upsert_soap_invoices(invoice_chunk)
+                        except Exception as e:
+                            # SQL yolu başarısızsa ORM yoluna düş (satır bazlı hata yönetimi ile)
+                            _logger.warning("E-Fatura SQL upsert başarısız (%s kayıt), ORM ile deneniyor: %s",
+                                            len(invoice_chunk), str(e))
+                            upsert_result = self._bulk_upsert_soap_invoices(
+                                invoice_chunk,
+                                self._prepare_invoice_create_vals_from_soap,
+                                self._prepare_invoice_vals_from_soap,
+                                log_prefix='E-Fatura senkronizasyon',
+                            )
+                        created_count += len(upsert_result['created'])
+                        updated_count += len(upsert_result['updated'])
+                        touched_invoices |= upsert_result['created'] | upsert_result['updated']
+                        for key in upsert_totals:
+                            upsert_totals[key] += upsert_result[key]
+            finally:
+                # Logout - sadece oturumu bu metod açtıysa; son pencere çekildikten sonra
+                if own_session:
+                    izibiz_session.logout()
+            self._learn_soap_window_days(direction, page_stats)
 
-                        # Güncelle
-                        invoice_vals = self._prepare_invoice_vals_from_soap(invoice_data)
-                        existing_invoice.write(invoice_vals)
-                        updated_count += 1
-                    else:
-                        # Yeni oluştur
-                        self.create_from_soap_data(invoice_data)
-                        created_count += 1
-
-                except Exception as e:  # Exception handling (v1.0.8)
-                    invoice_id = invoice_data.get('ID', 'UNKNOWN')
-                    uuid = invoice_data.get('UUID', 'UNKNOWN')
-                    _logger.error("E-Fatura senkronizasyon hatası (Invoice: %s | UUID: %s): %s",
-                                 invoice_id, uuid, str(e), exc_info=True)
-                    continue  # Sonraki faturaya geç
-            
             result = {
                 'success': True,
                 'created': created_count,
                 'updated': updated_count,
                 'message': _('%s yeni fatura oluşturuldu, %s fatura güncellendi.') % (created_count, updated_count)
             }
+            result.update(upsert_totals)
             
             # Otomatik Logo senkronizasyonu kontrolü
             config_param = self.env['ir.config_parameter'].sudo()
@@ -923,79 +2527,47 @@ class e_invoice(models.Model):
                         result['message'] += '\n\nLogo Senkronizasyonu: pymssql eksik'
                     else:
                         # MSSQL config al
-                        server = config_param.get_param('logo.mssql_server')
-                        port = int(config_param.get_param('logo.mssql_port', '1433'))
-                        database = config_param.get_param('logo.mssql_database')
-                        username = config_param.get_param('logo.mssql_username')
-                        password = config_param.get_param('logo.mssql_password')
-                        table_name = config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
-
-                        if not all([server, database, username, password]):
+                        mssql_params = _get_logo_mssql_params(self.env)
+                        table_name = mssql_params['table_name']
+
+                        if _logo_mssql_missing_params(mssql_params):
                             _logger.warning("Otomatik Logo Sync: MSSQL config eksik")
                             result['message'] += '\n\nLogo Senkronizasyonu: MSSQL config eksik'
                         else:
-                            # Filtrelenmiş faturaları al
-                            domain = [
-                                ('issue_date', '>=', start_date),
-                                ('issue_date', '<=', end_date),
-                                ('direction', '=', direction),
-                                ('kaynak', '=', 'e-fatura')
-                            ]
-                            invoices = self.search(domain)
+                            # Sadece bu çalışmada oluşturulan / güncellenen faturalar (v1.0.29)
+                            invoices = touched_invoices
 
                             if invoices:
-                                # MSSQL bağlantısı
-                                conn = pymssql.connect(
-                                    server=server, port=port, user=username,
-                                    password=password, database=database,
-                                    timeout=30, login_timeout=30, charset='UTF-8'
-                                )
-                                cursor = conn.cursor()
                                 stats = {'found': 0, 'not_found': 0, 'errors': 0}
+                                if self.env['logo.invoice.key']._mirror_enabled():
+                                    # Yerel Logo anahtar kopyasından - MSSQL trafiği yok (v1.0.34)
+                                    matcher = self.env['logo.invoice.key']._load_matcher(
+                                        (invoice.invoice_id, invoice.issue_date, direction) for invoice in invoices)
+                                else:
+                                    # MSSQL bağlantısı - worker havuzundan (v1.0.33); hata olsa da iade edilir (v1.0.58)
+                                    with _get_logo_mssql_connection(self.env, 'lookup') as conn:
+                                        # Tarih aralığı tek sorguda okunur, eşleştirme bellekte (v1.0.30)
+                                        matcher = LogoInvoiceMatcher(conn.cursor(), table_name).load_for(
+                                            (direction, invoice.issue_date) for invoice in invoices)
+
+                                # Her faturayı kontrol et - sonuçlar toplu yazılır (v1.0.35)
+                                match_results = []
+                                for invoice in invoices:
+                                    if not invoice.issue_date:
+                                        _logger.warning("Logo sync fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
+                                        continue
 
-                                # TRCODE belirle
-                                if direction == 'IN':
-                                    trcode_condition = "TRCODE IN (1,3,4,13)"
-                                else:  # OUT
-                                    trcode_condition = "TRCODE IN (6,7,8,9,14)"
+                                    logo_refs = matcher.find(invoice.invoice_id, direction, invoice.issue_date)
 
-                                # Her faturayı kontrol et
-                                for invoice in invoices:
-                                    try:
-                                        # Tarih kontrolü için issue_date'i al
-                                        invoice_date = invoice.issue_date.strftime('%Y-%m-%d') if invoice.issue_date else None
-
-                                        if not invoice_date:
-                                            _logger.warning("Logo sync fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
-                                            continue
-
-                                        # Standart sorgu
-                                        query = """
-                                            SELECT LOGICALREF
-                                            FROM {}
-                                            WHERE (FICHENO = %s OR DOCODE = %s)
-                                            AND CANCELLED = 0
-                                            AND CAST(DATE_ AS DATE) = %s
-                                            AND {}
-                                        """.format(table_name, trcode_condition)
-
-                                        cursor.execute(query, (invoice.invoice_id, invoice.invoice_id, invoice_date))
-                                        logo_result = cursor.fetchone()
-
-                                        if logo_result:
-                                            invoice.write({
-                                                'exists_in_logo': True,
-                                                'logo_record_id': logo_result[0]
-                                            })
-                                            stats['found'] += 1
-                                        else:
-                                            invoice.write({'exists_in_logo': False})
-                                            stats['not_found'] += 1
-                                    except Exception as e:
-                                        stats['errors'] += 1
-                                        _logger.error("Logo sync fatura %s: %s", invoice.invoice_id, str(e))
-
-                                conn.close()
+                                    if logo_refs:
+                                        match_results.append((invoice.id, True, logo_refs[0], 'found', len(logo_refs)))
+                                        stats['found'] += 1
+                                    else:
+                                        match_results.append((invoice.id, False, False, 'not_found', 0))
+                                        stats['not_found'] += 1
+
+                                # Bulunamayanlarda son bilinen LOGICALREF korunur (v1.0.59)
+                                self._apply_logo_match_results(match_results, 'auto', keep_ref=True)
                                 result['message'] += '\n\nLogo Sync: %d bulundu, %d bulunamadı' % (stats['found'], stats['not_found'])
                             else:
                                 result['message'] += '\n\nLogo Sync: Fatura bulunamadı'
@@ -1068,217 +2640,123 @@ class e_invoice(models.Model):
         return vals
 
     @api.model
-    def sync_earsiv_from_soap(self, start_date, end_date):
+    def sync_earsiv_from_soap(self, start_date, end_date, izibiz_session=None, prefetched_pages=None):
         """
         E-Arşiv faturalarını SOAP servisinden çek ve Odoo'ya kaydet
 
         Args:
             start_date (str): Başlangıç tarihi (YYYY-MM-DD)
             end_date (str): Bitiş tarihi (YYYY-MM-DD)
+            izibiz_session (IzibizSession): Paylaşılan oturum (v1.0.23) - verilmezse
+                metod kendi oturumunu açıp kapatır
+            prefetched_pages (iterable): Cron fetch aşamasında çekilen pencere sayfaları (v1.0.24, v1.0.48)
 
         Returns:
             dict: {'success': bool, 'created': int, 'updated': int, 'message': str}
         """
+        self = self._ingest_mode()  # Toplu aktarım modu (v1.0.27)
         try:
             _logger.info("E-Arşiv senkronizasyonu başlatılıyor: %s - %s", start_date, end_date)
 
-            # 1. Ortak SOAP client ve login
-            efatura_client, session_id, transport_ws, settings_ws = self._get_soap_client_and_login()
-
-            # 2. E-Arşiv Client oluştur
+            # 1. Ortak izibiz oturumu (E-Fatura ve E-Arşiv aynı SESSION_ID'yi kullanır - v1.0.23)
             soap_config = self.env['ir.config_parameter'].sudo()
-            earsiv_ws = soap_config.get_param('efatura.earsiv_ws',
-                'https://earsivws.izibiz.com.tr/EIArchiveWS/EFaturaArchive?wsdl')
-            earsiv_client = Client(wsdl=earsiv_ws, transport=transport_ws, settings=settings_ws)
-
-            # 3. GetEArchiveInvoiceList ile liste çek
-            request_header = {'SESSION_ID': session_id}
+            own_session = izibiz_session is None and prefetched_pages is None
+            if own_session:
+                izibiz_session = self._get_izibiz_session()
 
             # Tarihleri datetime objesine çevir (SOAP servisi datetime bekliyor)
-            from datetime import datetime as dt
-            try:
-                start_dt = dt.strptime(start_date, '%Y-%m-%d')
-                end_dt = dt.strptime(end_date, '%Y-%m-%d')
-            except:
-                # Eğer parse edemezse bugünden başla
-                end_dt = dt.now()
-                start_dt = end_dt - timedelta(days=7)
+            start_dt, end_dt = _parse_soap_date_range(start_date, end_date)
 
             _logger.info("E-Arşiv fatura listesi çekiliyor: %s - %s", start_dt, end_dt)
 
-            # E-Fatura pattern: raw_response ile XML parse
-            with earsiv_client.settings(raw_response=True):
-                raw_xml_response = earsiv_client.service.GetEArchiveInvoiceList(
-                    REQUEST_HEADER=request_header,
-                    LIMIT=25000,
-                    START_DATE=start_dt,
-                    END_DATE=end_dt,
-                    HEADER_ONLY='Y',
-                    READ_INCLUDED='true'
-                )
-
-            _logger.info("E-Arşiv SOAP Response alındı, XML parse ediliyor...")
-
-            # 4. XML Parse (E-Fatura pattern with namespace fallback)
-            root = ET.fromstring(raw_xml_response.content)
-            invoices = []
-
-            # Namespace fallback - namespace varsa da yoksa da çalışır
-            for invoice_elem in root.findall('.//INVOICE') or root.findall('.//*[local-name()="INVOICE"]'):
-                invoice_data = {}
-
-                # Attribute'ler (ID, UUID, etc.)
-                for attr_name, attr_value in invoice_elem.attrib.items():
-                    invoice_data[attr_name] = attr_value
-
-                # HEADER elementi - namespace fallback ile
-                header_elem = invoice_elem.find('.//HEADER') or invoice_elem.find('.//*[local-name()="HEADER"]')
-                if header_elem is not None:
-                    header_data = {}
-                    for child in header_elem:
-                        tag_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                        header_data[tag_name] = child.text
-                    invoice_data['HEADER'] = header_data
-
-                invoices.append(invoice_data)
-
-            _logger.info("Toplam %s E-Arşiv fatura bulundu", len(invoices))
-
-            # 5. Logout
-            efatura_client.service.Logout(REQUEST_HEADER=request_header)
-            _logger.info("Logout başarılı")
+            # 2-4. GetEArchiveInvoiceList ile liste çek (raw_response); Logout yazma sonunda (v1.0.46)
+            # Pencere boyu öğrenilir, LIMIT'e ulaşan pencereler ikiye bölünür (v1.0.25)
+            if prefetched_pages is not None:
+                if isinstance(prefetched_pages, Exception):
+                    raise prefetched_pages
+                pages = prefetched_pages
+            else:
+                # Pencereler yazma döngüsü ilerledikçe çekilir (v1.0.46)
+                pages = self._fetch_soap_pages(izibiz_session, 'EARSIV', start_dt, end_dt)
 
-            # 6. Response'u parse et ve kaydet
+            # 5. Response'u akış halinde parse et ve chunk'lar halinde kaydet (v1.0.21)
             created_count = 0
             updated_count = 0
+            upsert_totals = dict.fromkeys(('unchanged', 'skipped', 'errors'), 0)
+            total_count = 0
             cancellation_list = []  # İptal kayıtları için temp liste (v1.0.7)
+            window_invoice_ids = set()  # Set bazlı iptal eşleştirme için (v1.0.28)
+            touched_invoices = self.browse()  # Logo adımı sadece bu kayıtlar için çalışır (v1.0.57)
 
-            if invoices:
-                for invoice_data in invoices:
-                    try:
-                        # Mevcut kayıt kontrolü (UUID ile - v1.0.6)
-                        invoice_id = invoice_data.get('ID') or invoice_data.get('HEADER', {}).get('INVOICE_ID')
-                        uuid = invoice_data.get('UUID') or invoice_data.get('HEADER', {}).get('UUID')
-                        header = invoice_data.get('HEADER', {})
-                        profile_id = header.get('PROFILE_ID')
-
+            page_stats = []
+            invoice_stream = itertools.chain.from_iterable(
+                _iter_soap_page_invoices(pages, page_stats))
+            try:
+                for invoice_chunk in _chunked(invoice_stream, self.SOAP_WRITE_BATCH_SIZE):
+                    total_count += len(invoice_chunk)
+                    normal_invoices = []
+                    for invoice_data in invoice_chunk:
+                        window_invoice_ids.add(invoice_data.get('ID') or invoice_data.get('HEADER', {}).get('INVOICE_ID'))
                         # İPTAL KONTROLÜ (v1.0.7) - İptal kayıtlarını temp liste'ye ekle
-                        if profile_id == 'IPTAL':
+                        if invoice_data.get('HEADER', {}).get('PROFILE_ID') == 'IPTAL':
                             cancellation_list.append(invoice_data)
-                            _logger.info(f"E-Arşiv İptal Kaydı Tespit Edildi: {invoice_id}")
-                            continue  # Normal işleme devam etme
-
-                        existing_invoice = self.search([
-                            ('uuid', '=', uuid),
-                            ('is_cancellation', '=', False)  # Sadece normal kayıtları ara (v1.0.9)
-                        ], limit=1)
-
-                        if existing_invoice:
-                            # Kilitli kayıtları güncelleme (v1.0.5)
-                            if existing_invoice.is_locked:
-                                _logger.info(f"E-Arşiv Sync: Kilitli kayıt atlandı - {invoice_id}")
-                                continue
-
-                            # Güncelle
-                            invoice_vals = self._prepare_earsiv_vals_from_soap(invoice_data)
-                            existing_invoice.write(invoice_vals)
-                            updated_count += 1
-
-                            # ORPHAN İPTAL KONTROLÜ (v1.0.8)
-                            existing_invoice._check_and_link_orphan_cancellations(invoice_id)
-
-                            _logger.info("E-Arşiv fatura güncellendi: %s", invoice_id)
-                        else:
-                            # Yeni oluştur
-                            self.create_from_earsiv_soap_data(invoice_data)
-                            created_count += 1
+                            _logger.info(f"E-Arşiv İptal Kaydı Tespit Edildi: {invoice_data.get('ID') or invoice_data.get('HEADER', {}).get('INVOICE_ID')}")
+                            continue
+                        normal_invoices.append(invoice_data)
 
-                    except Exception as e:
-                        # Detaylı error logging (v1.0.8)
-                        invoice_id = invoice_data.get('ID') or invoice_data.get('HEADER', {}).get('INVOICE_ID')
-                        uuid = invoice_data.get('UUID') or invoice_data.get('HEADER', {}).get('UUID')
-                        _logger.error("E-Arşiv fatura kaydedilirken hata (Invoice: %s | UUID: %s): %s",
-                                     invoice_id, uuid, str(e), exc_info=True)
+                    if not normal_invoices:
                         continue
+
+                    upsert_result = self._bulk_upsert_soap_invoices(
+                        normal_invoices,
+                        self._prepare_earsiv_create_vals_from_soap,
+                        self._prepare_earsiv_vals_from_soap,
+                        extra_domain=[('is_cancellation', '=', False)],  # Sadece normal kayıtları ara (v1.0.9)
+                        log_prefix='E-Arşiv senkronizasyon',
+                    )
+                    created_count += len(upsert_result['created'])
+                    updated_count += len(upsert_result['updated'])
+                    touched_invoices |= upsert_result['created'] | upsert_result['updated']
+                    for key in upsert_totals:
+                        upsert_totals[key] += upsert_result[key]
+                    # ORPHAN İPTAL KONTROLÜ (v1.0.8) pencere sonunda set bazlı yapılır (v1.0.28)
+            finally:
+                # Logout yazma bitince yapılır; pencereler akış halinde çekilir (v1.0.46)
+                if own_session:
+                    izibiz_session.logout()
+            self._learn_soap_window_days('EARSIV', page_stats)
+
+            if total_count:
+                _logger.info("Toplam %s E-Arşiv fatura işlendi", total_count)
             else:
                 _logger.info("E-Arşiv fatura bulunamadı")
 
-            # 7. İPTAL KAYITLARINI İŞLE (v1.0.7)
+            # 6. İPTAL KAYITLARINI İŞLE (v1.0.7) - toplu upsert (v1.0.28)
             if cancellation_list:
                 _logger.info(f"Toplam {len(cancellation_list)} iptal kaydı işlenecek")
 
-                for cancel_data in cancellation_list:
-                    try:
-                        header = cancel_data.get('HEADER', {})
-                        cancel_invoice_id = cancel_data.get('ID') or header.get('INVOICE_ID')
-                        cancel_uuid = cancel_data.get('UUID') or header.get('UUID')
-
-                        # İptal kaydını oluştur veya güncelle
-                        existing_cancel = self.search([
-                            ('uuid', '=', cancel_uuid),
-                            ('is_cancellation', '=', True)  # Sadece iptal kayıtlarını ara (v1.0.9)
-                        ], limit=1)
-
-                        if not existing_cancel:
-                            # Yeni iptal kaydı oluştur
-                            cancel_vals = self._prepare_earsiv_vals_from_soap(cancel_data)
-                            cancel_vals['is_cancellation'] = True
-                            cancel_vals['invoice_id'] = cancel_invoice_id  # v1.0.10: Eksik alan eklendi
-                            cancel_vals['uuid'] = cancel_uuid  # v1.0.10: Eksik alan eklendi
-
-                            # Aynı invoice_id'ye sahip asıl faturayı bul
-                            original_invoice = self.search([
-                                ('invoice_id', '=', cancel_invoice_id),
-                                ('kaynak', '=', 'e-arsiv'),
-                                ('is_cancellation', '=', False)
-                            ], limit=1, order='create_date desc')
-
-                            if original_invoice:
-                                cancel_vals['cancelled_invoice_id'] = original_invoice.id
-                                _logger.info(f"İptal kaydı - Asıl fatura bulundu: {original_invoice.invoice_id} (ID: {original_invoice.id})")
-                            else:
-                                _logger.warning(f"İptal kaydı - Asıl fatura bulunamadı: {cancel_invoice_id}")
-
-                            self.create(cancel_vals)
-                            created_count += 1
-                            _logger.info(f"İptal kaydı oluşturuldu: {cancel_invoice_id}")
-
-                            # Asıl faturayı geçersiz yap (v1.0.11)
-                            if original_invoice and not original_invoice.is_locked:
-                                original_invoice.write({'gvn_active': False})
-                                _logger.info(f"Asıl fatura geçersiz yapıldı: {original_invoice.invoice_id}")
-                        else:
-                            # Mevcut iptal kaydını güncelle
-                            if not existing_cancel.is_locked:
-                                cancel_vals = self._prepare_earsiv_vals_from_soap(cancel_data)
-                                cancel_vals['is_cancellation'] = True
-
-                                # İlişki yoksa ekle
-                                if not existing_cancel.cancelled_invoice_id:
-                                    original_invoice = self.search([
-                                        ('invoice_id', '=', cancel_invoice_id),
-                                        ('kaynak', '=', 'e-arsiv'),
-                                        ('is_cancellation', '=', False)
-                                    ], limit=1, order='create_date desc')
-
-                                    if original_invoice:
-                                        cancel_vals['cancelled_invoice_id'] = original_invoice.id
-
-                                existing_cancel.write(cancel_vals)
-                                updated_count += 1
-                                _logger.info(f"İptal kaydı güncellendi: {cancel_invoice_id}")
-
-                                # Asıl faturayı geçersiz yap (v1.0.11)
-                                if existing_cancel.cancelled_invoice_id and not existing_cancel.cancelled_invoice_id.is_locked:
-                                    existing_cancel.cancelled_invoice_id.write({'gvn_active': False})
-                                    _logger.info(f"Asıl fatura geçersiz yapıldı: {existing_cancel.cancelled_invoice_id.invoice_id}")
-
-                    except Exception as e:
-                        # Detaylı error logging (v1.0.8)
-                        cancel_uuid = cancel_data.get('UUID') or cancel_data.get('HEADER', {}).get('UUID')
-                        _logger.error("İptal kaydı işlenirken hata (Invoice: %s | UUID: %s): %s",
-                                     cancel_invoice_id, cancel_uuid, str(e), exc_info=True)
-                        continue
+                for cancel_chunk in _chunked(cancellation_list, self.SOAP_WRITE_BATCH_SIZE):
+                    upsert_result = self._bulk_upsert_soap_invoices(
+                        cancel_chunk,
+                        self._prepare_earsiv_cancel_create_vals_from_soap,
+                        self._prepare_earsiv_cancel_vals_from_soap,
+                        extra_domain=[('is_cancellation', '=', True)],  # Sadece iptal kayıtlarını ara (v1.0.9)
+                        log_prefix='E-Arşiv iptal kaydı',
+                    )
+                    created_count += len(upsert_result['created'])
+                    updated_count += len(upsert_result['updated'])
+                    touched_invoices |= upsert_result['created'] | upsert_result['updated']
+                    for key in upsert_totals:
+                        upsert_totals[key] += upsert_result[key]
+                del cancellation_list
+
+            # 7. İPTAL ↔ ASIL FATURA EŞLEŞTİRME - tek SQL ile (v1.0.28)
+            window_invoice_ids.discard(None)
+            if window_invoice_ids:
+                try:
+                    self._link_earsiv_cancellations(list(window_invoice_ids))
+                except Exception as e:
+                    _logger.error("E-Arşiv iptal eşleştirme hatası: %s", str(e), exc_info=True)
 
             result = {
                 'success': True,
@@ -1286,6 +2764,7 @@ class e_invoice(models.Model):
                 'updated': updated_count,
                 'message': _('%s yeni E-Arşiv fatura oluşturuldu, %s fatura güncellendi.') % (created_count, updated_count)
             }
+            result.update(upsert_totals)
 
             # Otomatik Logo senkronizasyonu kontrolü
             logo_auto_sync = soap_config.get_param('logo.auto_sync', False)
@@ -1297,76 +2776,51 @@ class e_invoice(models.Model):
                         result['message'] += '\n\nLogo Senkronizasyonu: pymssql eksik'
                     else:
                         # MSSQL config al
-                        server = soap_config.get_param('logo.mssql_server')
-                        port = int(soap_config.get_param('logo.mssql_port', '1433'))
-                        database = soap_config.get_param('logo.mssql_database')
-                        username = soap_config.get_param('logo.mssql_username')
-                        password = soap_config.get_param('logo.mssql_password')
-                        table_name = soap_config.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
-
-                        if not all([server, database, username, password]):
+                        mssql_params = _get_logo_mssql_params(self.env)
+                        table_name = mssql_params['table_name']
+
+                        if _logo_mssql_missing_params(mssql_params):
                             _logger.warning("Otomatik Logo Sync (E-Arşiv): MSSQL config eksik")
                             result['message'] += '\n\nLogo Senkronizasyonu: MSSQL config eksik'
                         else:
-                            # E-Arşiv faturaları al (her zaman OUT yönü)
-                            domain = [
-                                ('issue_date', '>=', start_date),
-                                ('issue_date', '<=', end_date),
+                            # Sadece bu çalışmada oluşturulan / güncellenen E-Arşiv faturaları
+                            # (her zaman OUT yönü) - pencerenin tamamı aranmaz (v1.0.57)
+                            invoices = touched_invoices.filtered_domain([
                                 ('direction', '=', 'OUT'),
-                                ('kaynak', '=', 'e-arsiv')
-                            ]
-                            invoices = self.search(domain)
+                                ('kaynak', '=', 'e-arsiv'),
+                            ])
 
                             if invoices:
-                                # MSSQL bağlantısı
-                                conn = pymssql.connect(
-                                    server=server, port=port, user=username,
-                                    password=password, database=database,
-                                    timeout=30, login_timeout=30, charset='UTF-8'
-                                )
-                                cursor = conn.cursor()
                                 stats = {'found': 0, 'not_found': 0, 'errors': 0}
+                                if self.env['logo.invoice.key']._mirror_enabled():
+                                    # Yerel Logo anahtar kopyasından - MSSQL trafiği yok (v1.0.34)
+                                    matcher = self.env['logo.invoice.key']._load_matcher(
+                                        (invoice.invoice_id, invoice.issue_date, 'OUT') for invoice in invoices)
+                                else:
+                                    # MSSQL bağlantısı - worker havuzundan (v1.0.33); hata olsa da iade edilir (v1.0.58)
+                                    with _get_logo_mssql_connection(self.env, 'lookup') as conn:
+                                        # E-Arşiv her zaman OUT (giden) - aralık tek sorguda okunur (v1.0.30)
+                                        matcher = LogoInvoiceMatcher(conn.cursor(), table_name).load_for(
+                                            ('OUT', invoice.issue_date) for invoice in invoices)
+
+                                # Her faturayı kontrol et - sonuçlar toplu yazılır (v1.0.35)
+                                match_results = []
+                                for invoice in invoices:
+                                    if not invoice.issue_date:
+                                        _logger.warning("Logo sync E-Arşiv fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
+                                        continue
 
-                                # E-Arşiv her zaman OUT (giden)
-                                trcode_condition = "TRCODE IN (6,7,8,9,14)"
+                                    logo_refs = matcher.find(invoice.invoice_id, 'OUT', invoice.issue_date)
 
-                                # Her faturayı kontrol et
-                                for invoice in invoices:
-                                    try:
-                                        # Tarih kontrolü için issue_date'i al
-                                        invoice_date = invoice.issue_date.strftime('%Y-%m-%d') if invoice.issue_date else None
-
-                                        if not invoice_date:
-                                            _logger.warning("Logo sync E-Arşiv fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
-                                            continue
-
-                                        # Standart sorgu
-                                        query = """
-                                            SELECT LOGICALREF
-                                            FROM {}
-                                            WHERE (FICHENO = %s OR DOCODE = %s)
-                                            AND CANCELLED = 0
-                                            AND CAST(DATE_ AS DATE) = %s
-                                            AND {}
-                                        """.format(table_name, trcode_condition)
-
-                                        cursor.execute(query, (invoice.invoice_id, invoice.invoice_id, invoice_date))
-                                        logo_result = cursor.fetchone()
-
-                                        if logo_result:
-                                            invoice.write({
-                                                'exists_in_logo': True,
-                                                'logo_record_id': logo_result[0]
-                                            })
-                                            stats['found'] += 1
-                                        else:
-                                            invoice.write({'exists_in_logo': False})
-                                            stats['not_found'] += 1
-                                    except Exception as e:
-                                        stats['errors'] += 1
-                                        _logger.error("Logo sync E-Arşiv fatura %s: %s", invoice.invoice_id, str(e))
-
-                                conn.close()
+                                    if logo_refs:
+                                        match_results.append((invoice.id, True, logo_refs[0], 'found', len(logo_refs)))
+                                        stats['found'] += 1
+                                    else:
+                                        match_results.append((invoice.id, False, False, 'not_found', 0))
+                                        stats['not_found'] += 1
+
+                                # Bulunamayanlarda son bilinen LOGICALREF korunur (v1.0.59)
+                                self._apply_logo_match_results(match_results, 'auto', keep_ref=True)
                                 result['message'] += '\n\nLogo Sync: %d bulundu, %d bulunamadı' % (stats['found'], stats['not_found'])
                             else:
                                 result['message'] += '\n\nLogo Sync: E-Arşiv fatura bulunamadı'
@@ -1418,36 +2872,7 @@ class e_invoice(models.Model):
         #   }
         # }
 
-        header = soap_data.get('HEADER', {})
-
-        invoice_vals = {
-            # HARD-CODED Values
-            'direction': 'OUT',  # E-Arşiv her zaman giden
-            'kaynak': 'e-arsiv',
-            'receiver': header.get('CUSTOMER_IDENTIFIER') or '4510016851',  # Müşteri VKN/TCKN
-
-            # Ana Bilgiler - Attribute'lerden ve HEADER'dan
-            'invoice_id': soap_data.get('ID') or header.get('INVOICE_ID'),
-            'uuid': soap_data.get('UUID') or header.get('UUID'),
-            'sender': header.get('SENDER_IDENTIFIER'),  # VKN/TCKN
-            'supplier': header.get('SENDER_NAME'),  # Unvan
-            'customer': header.get('CUSTOMER_NAME'),  # Müşteri adı
-            'profile_id': header.get('PROFILE_ID'),  # EARSIVFATURA
-            'invoice_type_code': header.get('INVOICE_TYPE'),  # SATIS, IADE
-            'status': header.get('STATUS'),
-            'status_code': header.get('STATUS_CODE'),
-
-            # Tarih ve Tutarlar
-            'issue_date': self._parse_date_field(header.get('ISSUE_DATE'), 'ISSUE_DATE'),
-            'payable_amount': self._parse_financial_field(header.get('PAYABLE_AMOUNT'), 'PAYABLE_AMOUNT'),
-            'tax_exclusive_total_amount': self._parse_financial_field(header.get('TAXABLE_AMOUNT'), 'TAXABLE_AMOUNT'),
-
-            # E-Arşiv Özel Alanlar (4 yeni alan)
-            'currency_code': header.get('CURRENCY_CODE'),
-            'reported': header.get('REPORTED') == 'Y',
-            'earchive_type': header.get('EARCHIVE_TYPE'),
-            'sending_type': header.get('SENDING_TYPE'),
-        }
+        invoice_vals = self._prepare_earsiv_create_vals_from_soap(soap_data)
 
         # Yeni kayıt oluştur
         new_record = self.create(invoice_vals)
@@ -1459,6 +2884,16 @@ class e_invoice(models.Model):
 
         return new_record
 
+    def _prepare_earsiv_create_vals_from_soap(self, soap_data):
+        """E-Arşiv SOAP verisini create vals formatına dönüştür"""
+        header = soap_data.get('HEADER', {})
+
+        vals = self._prepare_earsiv_vals_from_soap(soap_data)
+        # Ana Bilgiler - Attribute'lerden ve HEADER'dan
+        vals['invoice_id'] = soap_data.get('ID') or header.get('INVOICE_ID')
+        vals['uuid'] = soap_data.get('UUID') or header.get('UUID')
+        return vals
+
     def _prepare_earsiv_vals_from_soap(self, soap_data):
         """E-Arşiv SOAP verisini update vals formatına dönüştür"""
         header = soap_data.get('HEADER', {})
@@ -1492,6 +2927,89 @@ class e_invoice(models.Model):
 
         return vals
 
+    def _prepare_earsiv_cancel_vals_from_soap(self, soap_data):
+        """E-Arşiv iptal (PROFILE_ID='IPTAL') kaydı için update vals (v1.0.28)"""
+        vals = self._prepare_earsiv_vals_from_soap(soap_data)
+        vals['is_cancellation'] = True
+        return vals
+
+    def _prepare_earsiv_cancel_create_vals_from_soap(self, soap_data):
+        """E-Arşiv iptal kaydı için create vals (v1.0.28)"""
+        vals = self._prepare_earsiv_create_vals_from_soap(soap_data)
+        vals['is_cancellation'] = True
+        return vals
+
+    @api.model
+    def _link_earsiv_cancellations(self, invoice_ids):
+        """
+        E-Arşiv iptal kayıtlarını asıl faturalara set bazlı bağla (v1.0.28)
+
+        Pencere sonunda bir kez çalışır ve kayıt başına search yerine iki SQL kullanır:
+        1. İlişkisi olmayan, kilitsiz iptal kayıtları aynı invoice_id'li en yeni
+           (create_date desc) normal E-Arşiv faturasına bağlanır
+        2. Bu invoice_id'lerde iptal kaydı olan kilitsiz asıl faturalar
+           geçersiz (gvn_active=False) yapılır (v1.0.11 davranışı)
+
+        Args:
+            invoice_ids (list): Penceredeki fatura numaraları
+
+        Returns:
+            dict: {'linked': int, 'deactivated': int}
+        """
+        self.env['e.invoice'].flush_model()
+        cr = self.env.cr
+
+        cr.execute("""
+            WITH originals AS (
+                SELECT DISTINCT ON (o.invoice_id) o.invoice_id, o.id
+                  FROM e_invoice o
+                 WHERE o.kaynak = 'e-arsiv'
+                   AND o.is_cancellation IS NOT TRUE
+                   AND o.invoice_id = ANY(%(invoice_ids)s)
+              ORDER BY o.invoice_id, o.create_date DESC, o.id DESC
+            )
+            UPDATE e_invoice c
+               SET cancelled_invoice_id = originals.id,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM originals
+             WHERE c.invoice_id = originals.invoice_id
+               AND c.kaynak = 'e-arsiv'
+               AND c.is_cancellation IS TRUE
+               AND c.cancelled_invoice_id IS NULL
+               AND c.is_locked IS NOT TRUE
+         RETURNING c.id
+        """, {'invoice_ids': invoice_ids, 'uid': self.env.uid})
+        linked_count = len(cr.fetchall())
+
+        cr.execute("""
+            UPDATE e_invoice o
+               SET gvn_active = FALSE,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE o.gvn_active IS NOT FALSE
+               AND o.is_locked IS NOT TRUE
+               AND o.id IN (
+                    SELECT c.cancelled_invoice_id
+                      FROM e_invoice c
+                     WHERE c.kaynak = 'e-arsiv'
+                       AND c.is_cancellation IS TRUE
+                       AND c.cancelled_invoice_id IS NOT NULL
+                       AND c.is_locked IS NOT TRUE
+                       AND c.invoice_id = ANY(%(invoice_ids)s)
+               )
+         RETURNING o.id
+        """, {'invoice_ids': invoice_ids, 'uid': self.env.uid})
+        deactivated_count = len(cr.fetchall())
+
+        if linked_count or deactivated_count:
+            self.env['e.invoice'].invalidate_model(['cancelled_invoice_id', 'cancellation_ids',
+                                                    'gvn_active', 'write_uid', 'write_date'])
+            _logger.info("E-Arşiv iptal eşleştirme: %s iptal kaydı bağlandı, %s asıl fatura geçersiz yapıldı",
+                         linked_count, deactivated_count)
+
+        return {'linked': linked_count, 'deactivated': deactivated_count}
+
     def _check_and_link_orphan_cancellations(self, invoice_id):
         """
         Asıl fatura oluşturulduğunda orphan iptal kayıtlarını kontrol et ve ilişkilendir (v1.0.8)
@@ -1548,13 +3066,9 @@ class e_invoice(models.Model):
             if not username or not password:
                 raise ValueError("Kimlik bilgileri eksik")
             
-            session_ws = requests.Session()
-            session_ws.verify = True
-            transport_ws = Transport(session=session_ws)
-            settings_ws = Settings(strict=False, xml_huge_tree=True, forbid_dtd=False, forbid_entities=False)
-            
-            efatura_ws = "https://efaturaws.izibiz.com.tr/EInvoiceWS?wsdl"
-            efatura_client = Client(wsdl=efatura_ws, transport=transport_ws, settings=settings_ws)
+            efatura_ws = soap_config.get_param('efatura.ws_url',
+                'https://efaturaws.izibiz.com.tr/EInvoiceWS?wsdl')
+            efatura_client = _get_soap_client(efatura_ws)  # Worker registry (v1.0.22)
             
             # Test login
             request_header = {
@@ -1596,6 +3110,64 @@ class e_invoice(models.Model):
         else:  # Gece yarısını geçen durumlar (ör: 22-02)
             return current_hour >= start_hour or current_hour <= end_hour
 
+    @api.model
+    def _run_soap_sync_stages(self, izibiz_session, start_date, end_date, log_prefix):
+        """
+        Cron senkronizasyon aşamalarını çalıştır (v1.0.48)
+
+        Fetch aşaması: IN, OUT ve E-Arşiv listeleri thread'lerde eşzamanlı çekilir (v1.0.24).
+        Yazma aşaması bu cron'un kendi cursor'ında sırayla yapılır. Periyot, liste
+        başına öğrenilmiş pencere boyuna göre alt pencerelere bölünür (v1.0.25).
+        Her listenin fetch thread'i kendi yazma adımı biter bitmez kapatılır.
+
+        Returns:
+            dict: Aşama adı -> senkronizasyon sonucu (çalışma özeti için - v1.0.27)
+        """
+        list_keys = ('IN', 'OUT', 'EARSIV')
+        window_days = {key: self._get_soap_window_days(key) for key in list_keys}
+        try:
+            fetched = izibiz_session.fetch_all_lists(
+                start_date, end_date, window_days, limit=self.SOAP_LIST_LIMIT)
+        except Exception as e:
+            # Login hatası - her yazıcı aynı hatayı raporlasın
+            fetched = dict.fromkeys(list_keys, e)
+
+        date_from = start_date.strftime('%Y-%m-%d')
+        date_to = end_date.strftime('%Y-%m-%d')
+        stages = (
+            ('E-Fatura Gelen', 'IN'),
+            ('E-Fatura Giden', 'OUT'),
+            ('E-Arşiv', 'EARSIV'),
+        )
+        run_results = {}
+        try:
+            for label, list_key in stages:
+                pages = fetched.pop(list_key)
+                try:
+                    if list_key == 'EARSIV':
+                        result = self.sync_earsiv_from_soap(
+                            date_from, date_to,
+                            izibiz_session=izibiz_session, prefetched_pages=pages)
+                    else:
+                        result = self.sync_invoices_from_soap(
+                            date_from, date_to, list_key,
+                            izibiz_session=izibiz_session, prefetched_pages=pages)
+                    _logger.info("%s - %s: %s", log_prefix, label, result)
+                    run_results[label] = result
+                except Exception as e:
+                    _logger.error("%s - %s hatası: %s", log_prefix, label, str(e))
+                    run_results[label] = {'success': False, 'error': str(e)}
+                finally:
+                    if isinstance(pages, SoapPagePrefetcher):
+                        pages.close()
+                    del pages
+        finally:
+            # Bir aşama beklenmedik şekilde kesildiyse kalan thread'leri de durdur
+            for pages in fetched.values():
+                if isinstance(pages, SoapPagePrefetcher):
+                    pages.close()
+        return run_results
+
     @api.model
     def cron_progressive_sync(self):
         """Progressive Sync - 7 günlük periyotlarla e-fatura ve e-arşiv senkronizasyonu"""
@@ -1645,41 +3217,19 @@ class e_invoice(models.Model):
 
             _logger.info("Progressive Sync başlatılıyor: %s - %s", current_date, period_end)
 
-            # E-Fatura Gelen senkronizasyonu
-            try:
-                result_in = self.sync_invoices_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d'),
-                    'IN'
-                )
-                _logger.info("Progressive Sync - E-Fatura Gelen: %s", result_in)
-            except Exception as e:
-                _logger.error("Progressive Sync - E-Fatura Gelen hatası: %s", str(e))
-
-            # E-Fatura Giden senkronizasyonu
-            try:
-                result_out = self.sync_invoices_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d'),
-                    'OUT'
-                )
-                _logger.info("Progressive Sync - E-Fatura Giden: %s", result_out)
-            except Exception as e:
-                _logger.error("Progressive Sync - E-Fatura Giden hatası: %s", str(e))
-
-            # E-Arşiv senkronizasyonu
-            try:
-                result_earsiv = self.sync_earsiv_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d')
-                )
-                _logger.info("Progressive Sync - E-Arşiv: %s", result_earsiv)
-            except Exception as e:
-                _logger.error("Progressive Sync - E-Arşiv hatası: %s", str(e))
+            # Tek izibiz oturumu: üç senkronizasyon aynı SESSION_ID'yi kullanır (v1.0.23)
+            # Oturum context manager ile kapatılır; aşamalardan hata kaçsa da Logout yapılır (v1.0.47)
+            with self._get_izibiz_session() as izibiz_session:
+                # Fetch ve yazma aşamaları ortak yardımcıda (v1.0.48)
+                run_results = self._run_soap_sync_stages(
+                    izibiz_session, current_date, period_end, 'Progressive Sync')
 
             # Son senkronize tarihi güncelle (başlangıç tarihini kaydet, böylece +7 gün doğru çalışır)
             ICPSudo.set_param('cron.progressive_last_sync_date', current_date.strftime('%Y-%m-%d'))
 
+            # Çalışma özeti (v1.0.27)
+            self.env['e.invoice.sync.run']._log_run('progressive', run_results, current_date, period_end)
+
             _logger.info("Progressive Sync tamamlandı. Sync edildi: %s - %s, Sonraki başlangıç: %s",
                         current_date, period_end, (current_date + timedelta(days=7)).strftime('%Y-%m-%d'))
 
@@ -1733,41 +3283,19 @@ class e_invoice(models.Model):
 
             _logger.info("Retrospective Sync başlatılıyor: %s - %s", current_date, period_end)
 
-            # E-Fatura Gelen senkronizasyonu
-            try:
-                result_in = self.sync_invoices_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d'),
-                    'IN'
-                )
-                _logger.info("Retrospective Sync - E-Fatura Gelen: %s", result_in)
-            except Exception as e:
-                _logger.error("Retrospective Sync - E-Fatura Gelen hatası: %s", str(e))
-
-            # E-Fatura Giden senkronizasyonu
-            try:
-                result_out = self.sync_invoices_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d'),
-                    'OUT'
-                )
-                _logger.info("Retrospective Sync - E-Fatura Giden: %s", result_out)
-            except Exception as e:
-                _logger.error("Retrospective Sync - E-Fatura Giden hatası: %s", str(e))
-
-            # E-Arşiv senkronizasyonu
-            try:
-                result_earsiv = self.sync_earsiv_from_soap(
-                    current_date.strftime('%Y-%m-%d'),
-                    period_end.strftime('%Y-%m-%d')
-                )
-                _logger.info("Retrospective Sync - E-Arşiv: %s", result_earsiv)
-            except Exception as e:
-                _logger.error("Retrospective Sync - E-Arşiv hatası: %s", str(e))
+            # Tek izibiz oturumu: üç senkronizasyon aynı SESSION_ID'yi kullanır (v1.0.23)
+            # Oturum context manager ile kapatılır; aşamalardan hata kaçsa da Logout yapılır (v1.0.47)
+            with self._get_izibiz_session() as izibiz_session:
+                # Fetch ve yazma aşamaları ortak yardımcıda (v1.0.48)
+                run_results = self._run_soap_sync_stages(
+                    izibiz_session, current_date, period_end, 'Retrospective Sync')
 
             # Son senkronize tarihi güncelle (başlangıç tarihini kaydet, böylece +7 gün doğru çalışır)
             ICPSudo.set_param('cron.retrospective_last_sync_date', current_date.strftime('%Y-%m-%d'))
 
+            # Çalışma özeti (v1.0.27)
+            self.env['e.invoice.sync.run']._log_run('retrospective', run_results, current_date, period_end)
+
             _logger.info("Retrospective Sync tamamlandı. Sync edildi: %s - %s, Sonraki başlangıç: %s",
                         current_date, period_end, (current_date + timedelta(days=7)).strftime('%Y-%m-%d'))
 
@@ -1804,33 +3332,40 @@ class e_invoice(models.Model):
             end_date = fields.Date.from_string(end_date_str)
 
             # Son senkronize tarihi belirle
+            delta_mode = False
             if last_sync_date_str:
                 current_date = fields.Date.from_string(last_sync_date_str)
                 # 30 gün ekle (bir sonraki periyoda geç)
                 current_date = current_date + timedelta(days=30)
 
-                # Bitiş tarihini geçtiyse durur
+                # Tüm periyotlar bir kez tarandı - bundan sonra sadece vadesi gelen
+                # faturalar kontrol edilir (v1.0.38). Cron artık durmaz; delta modunda
+                # çalışmaya devam eder
                 if current_date > end_date:
-                    _logger.info("Logo Monthly Sync: Bitiş tarihine ulaşıldı, yapılacak iş yok.")
-                    return
+                    delta_mode = True
             else:
                 current_date = start_date
 
-            # 30 günlük periyot sonu hesapla
-            period_end = current_date + timedelta(days=29)
-            period_end = min(period_end, end_date)
-
-            _logger.info("Logo Monthly Sync başlatılıyor: %s - %s", current_date, period_end)
-
-            # Bu periyot için e_invoice kayıtlarını al (Kilitli kayıtları hariç tut - v1.0.5)
-            domain = [
-                ('issue_date', '>=', current_date),
-                ('issue_date', '<=', period_end),
-                ('kaynak', 'in', ['e-fatura', 'e-arsiv']),
-                ('is_locked', '=', False)
-            ]
-
-            invoices = self.search(domain)
+            if delta_mode:
+                # Bitiş tarihi sadece ilk tam taramayı sınırlar; delta modunda üst sınır
+                # bugündür, böylece bitiş tarihinden sonra gelen yeni faturalar da
+                # (hiç kontrol edilmemiş oldukları için ilk sırada) kontrol edilir (v1.0.60)
+                current_date = start_date
+                period_end = max(end_date, fields.Date.context_today(self))
+                limit = int(ICPSudo.get_param('logo.recheck_batch_size', '5000'))
+                _logger.info("Logo Monthly Sync (delta) başlatılıyor: %s - %s", current_date, period_end)
+            else:
+                # 30 günlük periyot sonu hesapla
+                period_end = current_date + timedelta(days=29)
+                period_end = min(period_end, end_date)
+                limit = None
+                _logger.info("Logo Monthly Sync başlatılıyor: %s - %s", current_date, period_end)
+
+            # Kontrolü vadesi gelmiş faturalar: yeni/değişenler önce, bulunmuşlar seyrek,
+            # bulunamayanlar geri çekilmeyle (v1.0.38). Kilitli kayıtlar hariç (v1.0.5)
+            invoices = self._search_logo_recheck_due(current_date, period_end, limit=limit)
+            invoices = invoices._ingest_mode()  # Toplu aktarım modu (v1.0.27)
+            run_results = {}
 
             if invoices:
                 _logger.info("Logo Monthly Sync: %d fatura bulundu", len(invoices))
@@ -1842,103 +3377,83 @@ class e_invoice(models.Model):
                         _logger.warning("Logo Monthly Sync: pymssql kütüphanesi yüklü değil, atlanıyor...")
                     else:
                         # Config parametrelerini al
-                        config_param = self.env['ir.config_parameter'].sudo()
-                        server = config_param.get_param('logo.mssql_server')
-                        port = int(config_param.get_param('logo.mssql_port', '1433'))
-                        database = config_param.get_param('logo.mssql_database')
-                        username = config_param.get_param('logo.mssql_username')
-                        password = config_param.get_param('logo.mssql_password')
-                        table_name = config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
-
-                        if not all([server, database, username, password]):
+                        mssql_params = _get_logo_mssql_params(self.env)
+
+                        if _logo_mssql_missing_params(mssql_params):
                             _logger.warning("Logo Monthly Sync: MSSQL config eksik, atlanıyor...")
                         else:
-                            # MSSQL bağlantısı aç
-                            conn = pymssql.connect(
-                                server=server,
-                                port=port,
-                                user=username,
-                                password=password,
-                                database=database,
-                                timeout=30,
-                                login_timeout=30,
-                                charset='UTF-8'
-                            )
-                            cursor = conn.cursor()
-
                             # İstatistikler
                             stats = {'found': 0, 'not_found': 0, 'updated': 0, 'errors': 0}
 
-                            # Her faturayı kontrol et
+                            # Yerel kopya açıksa MSSQL'e gidilmez (v1.0.34). Delta modunda faturalar
+                            # tüm aralığa dağılabilir; wizard'daki aralık / #temp tablo / paralel
+                            # parça seçimi kullanılır (v1.0.38)
+                            conn = None
+                            if not self.env['logo.invoice.key']._mirror_enabled():
+                                conn = _get_logo_mssql_connection(self.env, 'lookup')
+                            try:
+                                matcher = self.env['logo.sync.wizard']._get_logo_matcher(
+                                    conn.cursor() if conn else None, invoices)
+                            finally:
+                                # Eşleştirici belleğe yüklendi; bağlantı hata olsa da havuza döner (v1.0.58)
+                                if conn:
+                                    conn.close()
+
+                            # Her faturayı kontrol et - sonuçlar toplu yazılır (v1.0.35)
+                            match_results = []
                             for invoice in invoices:
-                                try:
-                                    # Direction'a göre TRCODE belirle
-                                    if invoice.direction == 'IN':
-                                        trcode_condition = "TRCODE IN (1,3,4,13)"
-                                    elif invoice.direction == 'OUT':
-                                        trcode_condition = "TRCODE IN (6,7,8,9,14)"
-                                    else:
-                                        continue
-
-                                    # Tarih kontrolü için issue_date'i al
-                                    invoice_date = invoice.issue_date.strftime('%Y-%m-%d') if invoice.issue_date else None
-
-                                    if not invoice_date:
-                                        _logger.warning("Logo Monthly Sync - Fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
-                                        continue
-
-                                    # Standart sorgu
-                                    query = """
-                                        SELECT LOGICALREF
-                                        FROM {}
-                                        WHERE (FICHENO = %s OR DOCODE = %s)
-                                        AND CANCELLED = 0
-                                        AND CAST(DATE_ AS DATE) = %s
-                                        AND {}
-                                    """.format(table_name, trcode_condition)
-
-                                    cursor.execute(query, (invoice.invoice_id, invoice.invoice_id, invoice_date))
-                                    result = cursor.fetchone()
-
-                                    if result:
-                                        # Logo'da bulundu
-                                        invoice.write({
-                                            'exists_in_logo': True,
-                                            'logo_record_id': result[0],
-                                            'notes': (invoice.notes or '') + f'\n[Logo Sync] Bulundu: LOGICALREF={result[0]}'
-                                        })
-                                        stats['found'] += 1
-                                    else:
-                                        # Logo'da bulunamadı
-                                        invoice.write({
-                                            'exists_in_logo': False,
-                                            'logo_record_id': False,
-                                            'notes': (invoice.notes or '') + f'\n[Logo Sync] Bulunamadı'
-                                        })
-                                        stats['not_found'] += 1
-
-                                    stats['updated'] += 1
-
-                                except Exception as e:
-                                    stats['errors'] += 1
-                                    _logger.error("Logo Monthly Sync - Fatura %s hatası: %s", invoice.invoice_id, str(e))
-
-                            conn.close()
+                                if invoice.direction not in LOGO_TRCODES:
+                                    continue
+
+                                if not invoice.issue_date:
+                                    _logger.warning("Logo Monthly Sync - Fatura %s: Tarih yok, atlanıyor", invoice.invoice_id)
+                                    continue
+
+                                logo_refs = matcher.find(invoice.invoice_id, invoice.direction, invoice.issue_date)
+
+                                if logo_refs:
+                                    # Logo'da bulundu
+                                    match_results.append((invoice.id, True, logo_refs[0], 'found', len(logo_refs)))
+                                    stats['found'] += 1
+                                else:
+                                    # Logo'da bulunamadı
+                                    match_results.append((invoice.id, False, False, 'not_found', 0))
+                                    stats['not_found'] += 1
+
+                            stats['updated'] = self._apply_logo_match_results(match_results, 'monthly')
+                            # Kilitli kayıtlar SQL'de atlanır
+                            stats['skipped'] = len(match_results) - stats['updated']
                             _logger.info("Logo Monthly Sync tamamlandı: %d bulundu, %d bulunamadı, %d hata",
                                         stats['found'], stats['not_found'], stats['errors'])
+                            run_results['Logo'] = {
+                                'success': True,
+                                'updated': stats['updated'],
+                                'skipped': stats['skipped'],
+                                'errors': stats['errors'],
+                                'message': '%d bulundu, %d bulunamadı' % (stats['found'], stats['not_found']),
+                            }
 
                 except Exception as e:
                     import traceback
                     error_trace = traceback.format_exc()
                     _logger.error("Logo Monthly Sync: Logo senkronizasyonu hatası: %s\n%s", str(e), error_trace)
+                    run_results['Logo'] = {'success': False, 'error': str(e)}
             else:
                 _logger.info("Logo Monthly Sync: Bu dönemde fatura bulunamadı")
 
             # Son senkronize tarihi güncelle (başlangıç tarihini kaydediyoruz, end değil)
-            ICPSudo.set_param('cron.logo_monthly_last_sync_date', current_date.strftime('%Y-%m-%d'))
+            if not delta_mode:
+                ICPSudo.set_param('cron.logo_monthly_last_sync_date', current_date.strftime('%Y-%m-%d'))
 
-            _logger.info("Logo Monthly Sync tamamlandı. Sync edildi: %s - %s, Sonraki başlangıç: %s",
-                        current_date, period_end, (current_date + timedelta(days=30)).strftime('%Y-%m-%d'))
+            # Çalışma özeti (v1.0.27)
+            if run_results:
+                self.env['e.invoice.sync.run']._log_run('logo_monthly', run_results, current_date, period_end)
+
+            if delta_mode:
+                _logger.info("Logo Monthly Sync (delta) tamamlandı: %s fatura kontrol edildi", len(invoices))
+            else:
+                _logger.info("Logo Monthly Sync tamamlandı. Sync edildi: %s - %s, Sonraki başlangıç: %s",
+                            current_date, period_end, (current_date + timedelta(days=30)).strftime('%Y-%m-%d'))
 
         except Exception as e:
             _logger.error("Logo Monthly Sync genel hatası: %s", str(e))
@@ -2112,6 +3627,658 @@ class EInvoiceReport(models.Model):
         """ % self._table)
 
 
+class EInvoiceSyncRun(models.Model):
+    """
+    Senkronizasyon / import çalışma kaydı (v1.0.27)
+
+    Toplu aktarım modunda fatura başına tracking mesajı üretilmez; bunun yerine
+    her çalışma için bu modelde tek kayıt açılır ve tek özet mesaj post edilir.
+    """
+    _name = 'e.invoice.sync.run'
+    _description = 'E-Fatura Senkronizasyon Çalışması'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Çalışma', required=True, readonly=True)
+    run_type = fields.Selection([
+        ('progressive', 'Progressive Sync'),
+        ('retrospective', 'Retrospective Sync'),
+        ('manual', 'Manuel izibiz Senkronizasyonu'),
+        ('logo', 'Logo Senkronizasyonu'),
+        ('logo_monthly', 'Logo Monthly Sync'),
+        ('excel_import', 'E-Arşiv Excel Import'),
+        ('tax_import', 'Detaylı Vergi Import'),
+        ('logo_mirror', 'Logo Anahtar Yansısı'),
+        ('logo_orphan', 'Logo Ters Mutabakat'),
+    ], string='Tür', required=True, readonly=True, index=True)
+    state = fields.Selection([
+        ('done', 'Başarılı'),
+        ('partial', 'Kısmi Hata'),
+        ('failed', 'Başarısız'),
+    ], string='Durum', readonly=True)
+    date_from = fields.Date(string='Başlangıç Tarihi', readonly=True)
+    date_to = fields.Date(string='Bitiş Tarihi', readonly=True)
+    user_id = fields.Many2one('res.users', string='Kullanıcı', readonly=True,
+                              default=lambda self: self.env.user)
+    created_count = fields.Integer(string='Oluşturulan', readonly=True)
+    updated_count = fields.Integer(string='Güncellenen', readonly=True)
+    unchanged_count = fields.Integer(string='Değişmeyen', readonly=True)
+    skipped_count = fields.Integer(string='Atlanan', readonly=True)
+    error_count = fields.Integer(string='Hata', readonly=True)
+
+    @api.model
+    def _log_run(self, run_type, results, date_from=False, date_to=False):
+        """
+        Çalışmayı kaydet ve tek özet mesaj post et
+
+        Args:
+            run_type (str): run_type seçim değeri
+            results (dict): {etiket: sonuç dict'i}. Sonuç dict'leri sync metodlarının
+                formatındadır: 'success', 'created', 'updated', 'unchanged',
+                'skipped', 'errors', 'message', 'error' (hepsi opsiyonel)
+
+        Returns:
+            e.invoice.sync.run
+        """
+        from markupsafe import Markup
+
+        totals = dict.fromkeys(('created', 'updated', 'unchanged', 'skipped', 'errors'), 0)
+        failed_count = 0
+        lines = []
+        for label, result in results.items():
+            result = result or {}
+            if result.get('success') is False:
+                failed_count += 1
+                lines.append(Markup('<li><strong>%s</strong>: ❌ %s</li>') % (label, result.get('error') or ''))
+                continue
+            for key in totals:
+                totals[key] += int(result.get(key) or 0)
+            summary = ', '.join('%s %s' % (result[key], key) for key in totals if result.get(key))
+            lines.append(Markup('<li><strong>%s</strong>: %s</li>') % (
+                label, result.get('message') or summary or '-'))
+
+        if results and failed_count == len(results):
+            state = 'failed'
+        elif failed_count or totals['errors']:
+            state = 'partial'
+        else:
+            state = 'done'
+
+        run_type_label = dict(self._fields['run_type'].selection).get(run_type, run_type)
+        name = run_type_label
+        if date_from:
+            name = '%s (%s - %s)' % (run_type_label, date_from, date_to or date_from)
+
+        run = self.sudo().with_context(mail_create_nolog=True).create({
+            'name': name,
+            'run_type': run_type,
+            'state': state,
+            'date_from': date_from,
+            'date_to': date_to,
+            'created_count': totals['created'],
+            'updated_count': totals['updated'],
+            'unchanged_count': totals['unchanged'],
+            'skipped_count': totals['skipped'],
+            'error_count': totals['errors'],
+        })
+        run.message_post(body=Markup('<ul>%s</ul>') % Markup('').join(lines))
+        return run
+
+
+class LogoInvoiceKey(models.Model):
+    """
+    Logo fatura anahtarlarının yerel PostgreSQL kopyası (v1.0.34)
+
+    exists_in_logo eşleştirmesi MSSQL'e gitmeden düz bir PostgreSQL JOIN'i ile
+    yapılabilsin diye Logo fatura tablosunun anahtar ve tutar kolonları burada
+    tutulur. Yenileme artımlıdır: LOGICALREF yüksek su işaretinden büyük yeni
+    satırlar ve CAPIBLOCK_MODIFIEDDATE ile değiştiği görülen satırlar okunur.
+    Logo'dan silinen satırlar sadece tam yenilemede temizlenir; cron bu yüzden
+    son tam yenilemeden `logo.key_mirror.full_refresh_days` gün (varsayılan 7)
+    geçtiyse artımlı yerine tam yenileme yapar.
+
+    Kopya hiç tam yenilenmediyse ya da son yenileme
+    `logo.key_mirror.max_age_hours` saatten (varsayılan 6) eskiyse ayar açık
+    olsa bile eşleştirme MSSQL'den yapılır; boş / bayat kopya gerçek
+    eşleşmeleri "bulunamadı" diye ezmesin (v1.0.45).
+
+    FICHENO / DOCODE, MSSQL'in CI karşılaştırmasına denk olsun diye sağdan
+    kırpılıp büyük harfe çevrilerek saklanır (LogoInvoiceMatcher._normalize_key).
+    """
+    _name = 'logo.invoice.key'
+    _description = 'Logo Fatura Anahtarı (Yerel Kopya)'
+    _order = 'invoice_date desc, logicalref desc'
+    _rec_name = 'ficheno'
+
+    # MSSQL'den okuma / PostgreSQL'e yazma parti boyu
+    REFRESH_BATCH_SIZE = 1000
+
+    logicalref = fields.Integer(string='LOGICALREF', required=True, readonly=True)
+    ficheno = fields.Char(string='Fiş No (FICHENO)', index=True, readonly=True)
+    docode = fields.Char(string='Belge No (DOCODE)', index=True, readonly=True)
+    invoice_date = fields.Date(string='Tarih (DATE_)', index=True, readonly=True)
+    trcode = fields.Integer(string='TRCODE', readonly=True)
+    direction = fields.Selection([
+        ('IN', 'Gelen'),
+        ('OUT', 'Giden'),
+    ], string='Yön', readonly=True)
+    cancelled = fields.Boolean(string='İptal', readonly=True)
+    gross_total = fields.Float(string='Brüt Toplam', digits=(16, 2), readonly=True)
+    net_total = fields.Float(string='Net Toplam', digits=(16, 2), readonly=True)
+    total_vat = fields.Float(string='KDV Toplamı', digits=(16, 2), readonly=True)
+    total_discounts = fields.Float(string='İndirim Toplamı', digits=(16, 2), readonly=True)
+    logo_modified_date = fields.Date(string='Logo Değişiklik Tarihi', readonly=True)
+
+    _sql_constraints = [
+        ('logicalref_unique', 'unique(logicalref)', 'LOGICALREF tekil olmalıdır!'),
+    ]
+
+    @api.model
+    def _mirror_setting(self):
+        """logo.use_key_mirror ayarı açık mı"""
+        value = self.env['ir.config_parameter'].sudo().get_param('logo.use_key_mirror', 'False')
+        return str(value).lower() in ('true', '1', 'yes', 'on')
+
+    @api.model
+    def _mirror_enabled(self):
+        """
+        Eşleştirme bu tablodan mı yapılacak?
+
+        Ayar açık, kopya en az bir kez tam yenilenmiş ve son yenileme
+        `logo.key_mirror.max_age_hours` içinde olmalıdır (v1.0.45).
+        """
+        if not self._mirror_setting():
+            return False
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        last_full_refresh = ICPSudo.get_param('logo.key_mirror.last_full_refresh')
+        last_refresh = ICPSudo.get_param('logo.key_mirror.last_refresh')
+        if not last_full_refresh or not last_refresh:
+            _logger.warning("Logo anahtar kopyası hiç tam yenilenmedi - eşleştirme MSSQL'den yapılıyor")
+            return False
+        max_age_hours = int(ICPSudo.get_param('logo.key_mirror.max_age_hours', '6') or 6)
+        if fields.Datetime.to_datetime(last_refresh) < fields.Datetime.now() - timedelta(hours=max_age_hours):
+            _logger.warning("Logo anahtar kopyası %s saatten eski (son yenileme %s) - eşleştirme MSSQL'den yapılıyor",
+                            max_age_hours, last_refresh)
+            return False
+        return True
+
+    @api.model
+    def _activate_refresh_cron(self):
+        """Yenileme cron'unu aç ve hemen çalışmasını iste (ayar açıldığında) (v1.0.45)"""
+        cron = self.env.ref('tss_guven_muhasebe.ir_cron_logo_invoice_key_refresh', raise_if_not_found=False)
+        if cron:
+            cron = cron.sudo()
+            if not cron.active:
+                cron.active = True
+            cron._trigger()
+
+    @api.model
+    def _load_matcher(self, keys):
+        """
+        Yerel kopyadan yüklenmiş LogoInvoiceMatcher
+
+        Args:
+            keys (iterable): (invoice_id, date, direction) üçlüleri
+        """
+        table_name = self.env['ir.config_parameter'].sudo().get_param('logo.invoice_table', 'LG_600_01_INVOICE')
+        return LogoInvoiceMatcher(None, table_name).load_mirror(self.env, keys)
+
+    def _upsert_rows(self, rows):
+        """
+        Logo satırlarını INSERT ... ON CONFLICT (logicalref) ile yaz
+
+        Sadece gerçekten değişen satırlar UPDATE edilir.
+
+        Returns:
+            int: Yazılan (eklenen veya değişen) satır sayısı
+        """
+        columns = ['logicalref', 'ficheno', 'docode', 'invoice_date', 'trcode', 'direction',
+                   'cancelled', 'gross_total', 'net_total', 'total_vat', 'total_discounts',
+                   'logo_modified_date']
+        insert_columns = columns + ['create_uid', 'create_date', 'write_uid', 'write_date']
+        now = fields.Datetime.now()
+        uid = self.env.uid
+
+        params = []
+        for row in rows:
+            params.extend(row)
+            params.extend([uid, now, uid, now])
+
+        update_columns = [column for column in columns if column != 'logicalref']
+        query = """
+            INSERT INTO logo_invoice_key ({columns})
+            VALUES {values}
+            ON CONFLICT (logicalref) DO UPDATE
+               SET {set_clauses}, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+             WHERE ({current}) IS DISTINCT FROM ({excluded})
+        """.format(
+            columns=', '.join(insert_columns),
+            values=', '.join(['(%s)' % ', '.join(['%s'] * len(insert_columns))] * len(rows)),
+            set_clauses=', '.join('{0} = EXCLUDED.{0}'.format(column) for column in update_columns),
+            current=', '.join('logo_invoice_key.%s' % column for column in update_columns),
+            excluded=', '.join('EXCLUDED.%s' % column for column in update_columns),
+        )
+        self.env.cr.execute(query, params)
+        return self.env.cr.rowcount
+
+    @api.model
+    def refresh_from_logo(self, full=False):
+        """
+        Yerel kopyayı Logo'dan yenile
+
+        Args:
+            full (bool): True ise tüm tablo okunur ve Logo'da artık olmayan satırlar silinir
+
+        Returns:
+            dict: {'success', 'read', 'written', 'deleted', 'message'}
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        table_name = ICPSudo.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
+        last_logicalref = int(ICPSudo.get_param('logo.key_mirror.last_logicalref', '0') or 0)
+        last_modified = ICPSudo.get_param('logo.key_mirror.last_modified_date') or False
+
+        trcodes = ','.join(str(code) for code in LOGO_TRCODES['IN'] + LOGO_TRCODES['OUT'])
+        query = """
+            SELECT LOGICALREF, FICHENO, DOCODE, DATE_, TRCODE, CANCELLED,
+                   GROSSTOTAL, NETTOTAL, TOTALVAT, TOTALDISCOUNTS, CAPIBLOCK_MODIFIEDDATE
+            FROM {}
+            WHERE TRCODE IN ({})
+        """.format(table_name, trcodes)
+        params = ()
+        if not full and (last_logicalref or last_modified):
+            # Değişiklik tarihi gün hassasiyetinde - son günü tekrar oku (upsert idempotent)
+            query += " AND (LOGICALREF > %s OR CAPIBLOCK_MODIFIEDDATE >= %s)"
+            params = (last_logicalref, last_modified or '1900-01-01')
+
+        self.flush_model()
+        stats = {'read': 0, 'written': 0, 'deleted': 0}
+        seen_refs = []
+        max_logicalref = last_logicalref
+        max_modified = fields.Date.to_date(last_modified) if last_modified else None
+
+        conn = _get_logo_mssql_connection(self.env, 'report')
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(self.REFRESH_BATCH_SIZE)
+                if not batch:
+                    break
+                rows = []
+                for (logicalref, ficheno, docode, date_value, trcode, cancelled,
+                     gross_total, net_total, total_vat, total_discounts, modified_date) in batch:
+                    modified_date = LogoInvoiceMatcher._date_of(modified_date)
+                    rows.append((
+                        logicalref,
+                        LogoInvoiceMatcher._normalize_key(ficheno),
+                        LogoInvoiceMatcher._normalize_key(docode),
+                        LogoInvoiceMatcher._date_of(date_value),
+                        trcode,
+                        LogoInvoiceMatcher._direction_of(trcode),
+                        bool(cancelled),
+                        round(float(gross_total or 0.0), 2),
+                        round(float(net_total or 0.0), 2),
+                        round(float(total_vat or 0.0), 2),
+                        round(float(total_discounts or 0.0), 2),
+                        modified_date,
+                    ))
+                    max_logicalref = max(max_logicalref, logicalref)
+                    if modified_date and (not max_modified or modified_date > max_modified):
+                        max_modified = modified_date
+                    if full:
+                        seen_refs.append(logicalref)
+                stats['read'] += len(rows)
+                stats['written'] += self._upsert_rows(rows)
+        finally:
+            conn.close()
+
+        # Logo boş döndüyse (yanlış tablo vb.) yerel kopyayı silme
+        if full and seen_refs:
+            self.env.cr.execute("""
+                DELETE FROM logo_invoice_key k
+                 WHERE NOT EXISTS (SELECT 1 FROM unnest(%s::int[]) AS s(ref) WHERE s.ref = k.logicalref)
+            """, (seen_refs,))
+            stats['deleted'] = self.env.cr.rowcount
+
+        ICPSudo.set_param('logo.key_mirror.last_logicalref', str(max_logicalref))
+        if max_modified:
+            ICPSudo.set_param('logo.key_mirror.last_modified_date', max_modified.strftime('%Y-%m-%d'))
+        # Tazelik kontrolü (_mirror_enabled) için yenileme zamanları (v1.0.45)
+        refreshed_at = fields.Datetime.to_string(fields.Datetime.now())
+        ICPSudo.set_param('logo.key_mirror.last_refresh', refreshed_at)
+        if full:
+            ICPSudo.set_param('logo.key_mirror.last_full_refresh', refreshed_at)
+        self.invalidate_model()
+
+        stats['success'] = True
+        stats['message'] = _('%s satır okundu, %s yazıldı, %s silindi') % (
+            stats['read'], stats['written'], stats['deleted'])
+        _logger.info("Logo anahtar yansısı (%s): %s", 'tam' if full else 'artımlı', stats['message'])
+        return stats
+
+    @api.model
+    def _full_refresh_due(self):
+        """Hiç tam yenileme yapılmadıysa veya sonuncusu eskidiyse True (v1.0.45)"""
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        last_full_refresh = ICPSudo.get_param('logo.key_mirror.last_full_refresh')
+        if not last_full_refresh:
+            return True
+        full_refresh_days = int(ICPSudo.get_param('logo.key_mirror.full_refresh_days', '7') or 7)
+        return fields.Datetime.to_datetime(last_full_refresh) < fields.Datetime.now() - timedelta(days=full_refresh_days)
+
+    @api.model
+    def cron_refresh_logo_invoice_keys(self):
+        """
+        Cron: yerel Logo anahtar kopyasını yenile
+
+        Normalde artımlıdır; ilk çalıştırmada ve son tam yenilemeden
+        `logo.key_mirror.full_refresh_days` gün geçtiğinde Logo'da silinen
+        satırları da temizlemek için tam yenileme yapar (v1.0.45).
+        """
+        try:
+            result = self.refresh_from_logo(full=self._full_refresh_due())
+        except Exception as e:
+            _logger.error("Logo anahtar yansısı yenilenemedi: %s", str(e))
+            result = {'success': False, 'error': str(e)}
+        if not result.get('success') or result.get('written') or result.get('deleted'):
+            self.env['e.invoice.sync.run']._log_run('logo_mirror', {
+                'Logo': dict(result, updated=result.get('written', 0)),
+            })
+        return result
+
+    def action_refresh_full(self):
+        """Tam yenileme (Logo'da silinen satırları da temizler)"""
+        result = self.refresh_from_logo(full=True)
+        self.env['e.invoice.sync.run']._log_run('logo_mirror', {
+            'Logo': dict(result, updated=result.get('written', 0)),
+        })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Logo Anahtar Yansısı'),
+                'message': result['message'],
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+
+class EInvoiceLogoCheck(models.Model):
+    """
+    Faturanın Logo kontrol geçmişi (v1.0.36)
+
+    Her Logo kontrolü (wizard, aylık cron, SOAP sonrası otomatik kontrol) burada
+    tek satır olarak tutulur ve e.invoice._apply_logo_match_results ile toplu
+    yazılır. Son sonuç e.invoice.last_logo_check_* alanlarına da yazılır;
+    notes alanı sadece kullanıcı notları içindir. Eski satırlar günlük
+    autovacuum ile silinir (v1.0.55).
+    """
+    _name = 'e.invoice.logo.check'
+    _description = 'E-Fatura Logo Kontrol Geçmişi'
+    _order = 'check_date desc, id desc'
+    _rec_name = 'invoice_id'
+
+    invoice_id = fields.Many2one('e.invoice', string='Fatura', required=True,
+                                 ondelete='cascade', index=True, readonly=True)
+    check_date = fields.Datetime(string='Kontrol Tarihi', required=True, readonly=True,
+                                 default=fields.Datetime.now)
+    result = fields.Selection(LOGO_CHECK_RESULTS, string='Sonuç', required=True, readonly=True)
+    logicalref = fields.Integer(string='LOGICALREF', readonly=True)
+    match_count = fields.Integer(string='Eş Sayısı', readonly=True)
+    source = fields.Selection([
+        ('wizard', 'Logo Senkronizasyonu'),
+        ('monthly', 'Logo Monthly Sync'),
+        ('auto', 'Otomatik (izibiz sonrası)'),
+    ], string='Kaynak', readonly=True)
+
+    @api.autovacuum
+    def _gc_old_checks(self):
+        """
+        Eski kontrol geçmişini sil (v1.0.55)
+
+        Her faturanın son `logo.check_history_keep` (varsayılan 5) kontrolü her
+        zaman tutulur; bunlardan eski olup `logo.check_history_days` günden
+        (varsayılan 90) eski satırlar tek DELETE ile silinir.
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        keep_last = int(ICPSudo.get_param('logo.check_history_keep', '5') or 5)
+        keep_days = int(ICPSudo.get_param('logo.check_history_days', '90') or 90)
+        self.flush_model()
+        self.env.cr.execute("""
+            DELETE FROM e_invoice_logo_check
+             WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, check_date,
+                           ROW_NUMBER() OVER (PARTITION BY invoice_id ORDER BY check_date DESC, id DESC) AS position
+                      FROM e_invoice_logo_check
+                ) ranked
+                 WHERE ranked.position > %s AND ranked.check_date < %s
+             )
+        """, (keep_last, fields.Datetime.now() - timedelta(days=keep_days)))
+        if self.env.cr.rowcount:
+            _logger.info("Logo kontrol geçmişi: %s eski satır silindi", self.env.cr.rowcount)
+        self.invalidate_model()
+
+
+class LogoOrphanInvoice(models.Model):
+    """
+    Logo'da olup e.invoice karşılığı olmayan faturalar (v1.0.39)
+
+    logo.orphan.wizard tarafından doldurulur. Satırlar çalışma kimliğiyle
+    işaretlenir; bir çalışma sadece aynı kullanıcının önceki sonuçlarını siler (v1.0.51).
+    Eski satırlar günlük autovacuum ile silinir (v1.0.61).
+    """
+    _name = 'logo.orphan.invoice'
+    _description = 'Logo\'da Olup E-Faturası Olmayan Faturalar'
+    _order = 'invoice_date desc, logicalref desc'
+    _rec_name = 'ficheno'
+
+    logicalref = fields.Integer(string='LOGICALREF', readonly=True, index=True)
+    ficheno = fields.Char(string='Fiş No (FICHENO)', readonly=True)
+    docode = fields.Char(string='Belge No (DOCODE)', readonly=True)
+    invoice_date = fields.Date(string='Tarih', readonly=True, index=True)
+    trcode = fields.Integer(string='TRCODE', readonly=True)
+    direction = fields.Selection([
+        ('IN', 'Gelen'),
+        ('OUT', 'Giden'),
+    ], string='Yön', readonly=True)
+    gross_total = fields.Float(string='Brüt Toplam', digits=(16, 2), readonly=True)
+    net_total = fields.Float(string='Net Toplam', digits=(16, 2), readonly=True)
+    total_vat = fields.Float(string='KDV Toplamı', digits=(16, 2), readonly=True)
+    run_date = fields.Datetime(string='Rapor Tarihi', readonly=True)
+    # Satırları üreten çalışma - liste yalnızca kendi çalışmasını gösterir (v1.0.51)
+    run_id = fields.Char(string='Çalışma', index=True, readonly=True)
+
+    @api.autovacuum
+    def _gc_old_runs(self):
+        """
+        Eski ters mutabakat sonuçlarını sil (v1.0.61)
+
+        Wizard sadece aynı kullanıcının önceki sonuçlarını siler; tekrar
+        çalıştırmayan kullanıcıların satırları birikmesin diye
+        `logo.orphan_retention_days` günden (varsayılan 7) eski satırlar
+        tek DELETE ile silinir.
+        """
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'logo.orphan_retention_days', '7') or 7)
+        self.env.cr.execute("DELETE FROM logo_orphan_invoice WHERE run_date < %s",
+                            (fields.Datetime.now() - timedelta(days=retention_days),))
+        if self.env.cr.rowcount:
+            _logger.info("Logo ters mutabakat: %s eski sonuç satırı silindi", self.env.cr.rowcount)
+        self.invalidate_model()
+
+
+class LogoOrphanWizard(models.TransientModel):
+    """
+    Ters mutabakat: Logo faturalarından e.invoice karşılığı olmayanları bul (v1.0.39)
+
+    Dönemin Logo anahtarları tek sorguda okunur (yerel kopya açıksa MSSQL'e hiç
+    gidilmez), aynı dönemin e.invoice anahtarları bellekte hash set'e konur ve
+    anti-join Python'da yapılır. Sonuçlar logo.orphan.invoice'a toplu yazılır.
+    """
+    _name = 'logo.orphan.wizard'
+    _description = 'Logo Ters Mutabakat Sihirbazı'
+
+    # Sonuç satırları bu boyutta parçalarla INSERT edilir
+    INSERT_BATCH_SIZE = 1000
+
+    date_from = fields.Date(string='Başlangıç Tarihi', required=True,
+                            default=lambda self: fields.Date.today().replace(month=1, day=1))
+    date_to = fields.Date(string='Bitiş Tarihi', required=True, default=fields.Date.today)
+    direction_filter = fields.Selection([
+        ('all', 'Tümü'),
+        ('IN', 'Gelen'),
+        ('OUT', 'Giden'),
+    ], string='Yön', default='all', required=True)
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for wizard in self:
+            if wizard.date_from > wizard.date_to:
+                raise ValidationError(_("Başlangıç tarihi bitiş tarihinden sonra olamaz."))
+
+    def _get_directions(self):
+        return ('IN', 'OUT') if self.direction_filter == 'all' else (self.direction_filter,)
+
+    def _iter_logo_rows(self):
+        """
+        Dönemdeki iptal edilmemiş Logo faturaları
+
+        Yields:
+            tuple: (logicalref, ficheno, docode, tarih, trcode, gross, net, vat)
+        """
+        directions = self._get_directions()
+        trcodes = [code for direction in directions for code in LOGO_TRCODES[direction]]
+
+        if self.env['logo.invoice.key']._mirror_enabled():
+            self.env['logo.invoice.key'].flush_model()
+            self.env.cr.execute("""
+                SELECT logicalref, ficheno, docode, invoice_date, trcode, gross_total, net_total, total_vat
+                  FROM logo_invoice_key
+                 WHERE invoice_date >= %s AND invoice_date <= %s
+                   AND cancelled IS NOT TRUE
+                   AND trcode = ANY(%s)
+            """, (self.date_from, self.date_to, trcodes))
+            for row in self.env.cr.fetchall():
+                yield row
+            return
+
+        conn = _get_logo_mssql_connection(self.env, 'report')
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT LOGICALREF, FICHENO, DOCODE, DATE_, TRCODE, GROSSTOTAL, NETTOTAL, TOTALVAT
+                FROM {}
+                WHERE DATE_ >= %s AND DATE_ < %s
+                AND CANCELLED = 0
+                AND TRCODE IN ({})
+            """.format(_get_logo_mssql_params(self.env)['table_name'], ','.join(str(code) for code in trcodes)),
+                (self.date_from, self.date_to + timedelta(days=1)))
+            while True:
+                batch = cursor.fetchmany(self.INSERT_BATCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            conn.close()
+
+    def _get_e_invoice_keys(self):
+        """
+        Dönemin e.invoice anahtarları
+
+        Returns:
+            tuple: ({(yön, tarih, normalize numara)}, {logo_record_id})
+        """
+        self.env['e.invoice'].flush_model(['invoice_id', 'issue_date', 'direction', 'kaynak', 'logo_record_id'])
+        # Arşivlenmiş / iptal kayıtlar da karşılık sayılır
+        self.env.cr.execute("""
+            SELECT invoice_id, issue_date, direction, logo_record_id
+              FROM e_invoice
+             WHERE issue_date >= %s AND issue_date < %s
+               AND kaynak IN ('e-fatura', 'e-arsiv')
+               AND direction = ANY(%s)
+        """, (self.date_from, self.date_to + timedelta(days=1), list(self._get_directions())))
+        keys = set()
+        logo_refs = set()
+        for invoice_id, issue_date, direction, logo_record_id in self.env.cr.fetchall():
+            key = LogoInvoiceMatcher._normalize_key(invoice_id)
+            if key and issue_date:
+                keys.add((direction, LogoInvoiceMatcher._date_of(issue_date), key))
+            if logo_record_id:
+                logo_refs.add(logo_record_id)
+        return keys, logo_refs
+
+    def action_find_orphans(self):
+        """Logo'da olup e.invoice'ta olmayan faturaları bul ve kaydet"""
+        self.ensure_one()
+        e_invoice_keys, matched_refs = self._get_e_invoice_keys()
+
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        run_id = uuid.uuid4().hex
+        Orphan = self.env['logo.orphan.invoice']
+        # Sadece bu kullanıcının önceki sonuçları silinir; diğer kullanıcılarınkine dokunulmaz (v1.0.51)
+        self.env.cr.execute("DELETE FROM logo_orphan_invoice WHERE create_uid = %s", (uid,))
+
+        stats = {'logo': 0, 'orphan': 0}
+        pending = []
+
+        def flush_pending():
+            columns = ['logicalref', 'ficheno', 'docode', 'invoice_date', 'trcode', 'direction',
+                       'gross_total', 'net_total', 'total_vat', 'run_date', 'run_id',
+                       'create_uid', 'create_date', 'write_uid', 'write_date']
+            self.env.cr.execute(
+                "INSERT INTO logo_orphan_invoice ({}) VALUES {}".format(
+                    ', '.join(columns),
+                    ', '.join(['(%s)' % ', '.join(['%s'] * len(columns))] * len(pending))),
+                [value for row in pending for value in row])
+            pending.clear()
+
+        for logicalref, ficheno, docode, date_value, trcode, gross_total, net_total, total_vat in self._iter_logo_rows():
+            stats['logo'] += 1
+            direction = LogoInvoiceMatcher._direction_of(trcode)
+            row_date = LogoInvoiceMatcher._date_of(date_value)
+            if logicalref in matched_refs:
+                continue
+            if any((direction, row_date, key) in e_invoice_keys
+                   for key in (LogoInvoiceMatcher._normalize_key(ficheno),
+                               LogoInvoiceMatcher._normalize_key(docode)) if key):
+                continue
+            stats['orphan'] += 1
+            pending.append((
+                logicalref, ficheno, docode, row_date, trcode, direction,
+                round(float(gross_total or 0.0), 2), round(float(net_total or 0.0), 2),
+                round(float(total_vat or 0.0), 2), now, run_id, uid, now, uid, now,
+            ))
+            if len(pending) >= self.INSERT_BATCH_SIZE:
+                flush_pending()
+        if pending:
+            flush_pending()
+        Orphan.invalidate_model()
+
+        _logger.info("Logo ters mutabakat %s - %s: %s Logo faturası, %s karşılıksız",
+                     self.date_from, self.date_to, stats['logo'], stats['orphan'])
+        self.env['e.invoice.sync.run']._log_run('logo_orphan', {
+            'Logo': {
+                'success': True,
+                'created': stats['orphan'],
+                'message': _('%s Logo faturasından %s tanesinin e-fatura/e-arşiv karşılığı yok') % (
+                    stats['logo'], stats['orphan']),
+            },
+        }, self.date_from, self.date_to)
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Logo\'da Olup E-Faturası Olmayanlar (%s - %s)') % (self.date_from, self.date_to),
+            'res_model': 'logo.orphan.invoice',
+            'view_mode': 'list',
+            'domain': [('run_id', '=', run_id)],
+            'target': 'current',
+        }
+
+
 class e_invoice_sync_wizard(models.TransientModel):
     _name = 'e.invoice.sync.wizard'
     _description = 'E-Fatura/E-Arşiv Senkronizasyon Sihirbazı'
@@ -2183,6 +4350,11 @@ class e_invoice_sync_wizard(models.TransientModel):
                 }
             }
 
+        # Çalışma özeti (v1.0.27)
+        run_label = 'E-Arşiv' if self.invoice_source == 'e-arsiv' else (
+            'E-Fatura Gelen' if self.direction == 'IN' else 'E-Fatura Giden')
+        self.env['e.invoice.sync.run']._log_run('manual', {run_label: result}, self.start_date, self.end_date)
+
         if result.get('success'):
             return {
                 'type': 'ir.actions.client',
@@ -2209,6 +4381,9 @@ class LogoSyncWizard(models.TransientModel):
     _name = 'logo.sync.wizard'
     _description = 'Logo MSSQL Senkronizasyon Sihirbazı'
 
+    # Paralel parça okuması için en az fatura sayısı (v1.0.37)
+    PARALLEL_MIN_INVOICES = 1000
+
     # Filtre Seçenekleri
     sync_mode = fields.Selection([
         ('all', 'Tüm Kayıtlar'),
@@ -2257,60 +4432,23 @@ class LogoSyncWizard(models.TransientModel):
             self.date_to = fields.Date.today()
 
     def _get_mssql_connection(self):
-        """MSSQL bağlantısı oluştur - Config parametrelerinden"""
-        if not pymssql:
-            raise UserError(_("pymssql kütüphanesi yüklü değil. 'pip install pymssql' komutunu çalıştırın."))
-        
-        # Config parametrelerinden bağlantı bilgilerini al
-        config_param = self.env['ir.config_parameter'].sudo()
-        server = config_param.get_param('logo.mssql_server')
-        port = int(config_param.get_param('logo.mssql_port', '1433'))
-        database = config_param.get_param('logo.mssql_database')
-        username = config_param.get_param('logo.mssql_username')
-        password = config_param.get_param('logo.mssql_password')
-        
-        # Zorunlu parametreleri kontrol et
-        if not all([server, database, username, password]):
-            missing_params = []
-            if not server: missing_params.append('Server')
-            if not database: missing_params.append('Database')
-            if not username: missing_params.append('Username')
-            if not password: missing_params.append('Password')
-            
-            raise UserError(_("Logo MSSQL bağlantı parametreleri eksik: %s\n\nLütfen E-Fatura → Yapılandırma menüsünden ayarları tamamlayın.") % ', '.join(missing_params))
-        
-        try:
-            connection = pymssql.connect(
-                server=server,
-                port=port,
-                user=username,
-                password=password,
-                database=database,
-                timeout=30,
-                login_timeout=30,
-                charset='UTF-8'
-            )
-            return connection
-        except Exception as e:
-            raise UserError(_("MSSQL bağlantı hatası: %s\n\nBağlantı ayarlarını kontrol edin: %s:%s@%s/%s") % (str(e), username, port, server, database))
+        """MSSQL bağlantısı - worker başına bağlantı havuzundan (v1.0.33)"""
+        return _get_logo_mssql_connection(self.env, 'lookup')
 
     def action_test_connection(self):
         """MSSQL bağlantısını test et"""
         try:
-            conn = self._get_mssql_connection()
-            cursor = conn.cursor()
-            
             # Config'den tablo adını al
             config_param = self.env['ir.config_parameter'].sudo()
             table_name = config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
             
-            # Test sorgusu çalıştır
-            cursor.execute("SELECT COUNT(*) FROM {}".format(table_name))
-            result = cursor.fetchone()
+            # Test sorgusu çalıştır - bağlantı hata olsa da havuza döner (v1.0.58)
+            with self._get_mssql_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM {}".format(table_name))
+                result = cursor.fetchone()
             invoice_count = result[0] if result else 0
             
-            conn.close()
-            
             message = _("✅ Bağlantı başarılı!\n\nLogo veritabanında %s fatura kaydı bulundu.") % "{:,}".format(invoice_count)
             
             return {
@@ -2360,10 +4498,54 @@ class LogoSyncWizard(models.TransientModel):
             else:
                 raise UserError(_("Seçili kayıt bulunamadı!"))
         
-        return self.env['e.invoice'].search(domain)
+        return self.env['e.invoice']._ingest_mode().search(domain)  # Toplu aktarım modu (v1.0.27)
+
+    def _get_logo_matcher(self, cursor, e_invoices):
+        """
+        Faturalar için Logo eşleştiricisini yükle (v1.0.30)
+
+        Tarihler dar bir aralıktaysa aralık tek sorguda okunur. Çok sayıda tarihe
+        dağılmış seçimlerde ('all' / 'selected' modları) aralık gereksiz geniş
+        olacağından fatura anahtarları #temp tabloya yüklenip JOIN edilir (v1.0.31).
+        Yerel Logo anahtar kopyası açıksa MSSQL'e hiç gidilmez (v1.0.34).
+        Çok sayıda fatura birden fazla parçaya yayılıyorsa parçalar
+        logo.max_parallel_workers kadar thread'de paralel okunur (v1.0.37);
+        seyrek parçalar yine #temp tablo ile eşleştirilir (v1.0.49).
+        """
+        config_param = self.env['ir.config_parameter'].sudo()
+        table_name = config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
+        matcher = LogoInvoiceMatcher(cursor, table_name)
+
+        invoices = e_invoices.filtered(lambda inv: not inv.is_locked and inv.issue_date)
+        if not invoices:
+            return matcher
+
+        if cursor is None:
+            return matcher.load_mirror(self.env, (
+                (invoice.invoice_id, invoice.issue_date, invoice.direction) for invoice in invoices))
+
+        dates = [invoice.issue_date.date() for invoice in invoices]
+        span_days = (max(dates) - min(dates)).days + 1
+
+        # Büyük ve geniş seçimler tarih parçalarına bölünüp paralel okunur (v1.0.37)
+        max_workers = int(config_param.get_param('logo.max_parallel_workers', '4') or 1)
+        chunk_days = int(config_param.get_param('logo.parallel_chunk_days', '31') or 31)
+        if (max_workers > 1 and span_days > chunk_days
+                and len(invoices) >= self.PARALLEL_MIN_INVOICES):
+            return _load_logo_matcher_parallel(
+                _get_logo_mssql_params(self.env), cursor,
+                ((invoice.invoice_id, invoice.issue_date, invoice.direction) for invoice in invoices),
+                chunk_days, max_workers)
+
+        if span_days > matcher.RANGE_PREFETCH_MAX_DAYS:
+            _logger.info("Logo Sync: %s fatura %s güne yayılmış, #temp tablo ile eşleştiriliyor",
+                         len(invoices), span_days)
+            return matcher.load_keys(
+                (invoice.invoice_id, invoice.issue_date, invoice.direction) for invoice in invoices)
+        return matcher.load_for((invoice.direction, invoice.issue_date) for invoice in invoices)
 
     def _check_invoice_in_logo(self, cursor, invoice_id, direction, invoice_date):
-        """Tek bir faturanın Logo'daki durumunu kontrol et"""
+        """Tek bir faturanın Logo'daki durumunu kontrol et (test modu için tekil sorgu)"""
         try:
             # Config'den tablo adını al
             config_param = self.env['ir.config_parameter'].sudo()
@@ -2396,17 +4578,10 @@ class LogoSyncWizard(models.TransientModel):
                     'note': _('Fatura tarihi bulunamadı')
                 }
 
-            # SQL sorgusu - CAST ile datetime'ı date'e çeviriyoruz
-            query = """
-                SELECT LOGICALREF
-                FROM {}
-                WHERE (FICHENO = %s OR DOCODE = %s)
-                AND CANCELLED = 0
-                AND CAST(DATE_ AS DATE) = %s
-                AND {}
-            """.format(table_name, trcode_condition)
-
-            cursor.execute(query, (invoice_id, invoice_id, date_only))
+            # Yarı açık tarih aralığı + UNION - index seek yapabilir (v1.0.32)
+            query = LOGO_LOOKUP_SQL.format(table=table_name, trcode_condition=trcode_condition)
+            next_day = date_only + timedelta(days=1)
+            cursor.execute(query, (invoice_id, date_only, next_day, invoice_id, date_only, next_day))
             results = cursor.fetchall()
             
             if len(results) == 0:
@@ -2435,6 +4610,205 @@ class LogoSyncWizard(models.TransientModel):
                 'note': _('Logo sorgu hatası: %s') % str(e)
             }
 
+    def _get_logo_indexes(self, cursor, table_name):
+        """
+        Logo tablosundaki indexleri oku (v1.0.32)
+
+        Returns:
+            dict: {index_adı: {'keys': [sütunlar], 'includes': [sütunlar], 'type': str}}
+        """
+        cursor.execute("""
+            SELECT I.name, I.type_desc, C.name, IC.key_ordinal, IC.is_included_column
+            FROM sys.indexes I
+            INNER JOIN sys.index_columns IC
+                ON IC.object_id = I.object_id AND IC.index_id = I.index_id
+            INNER JOIN sys.columns C
+                ON C.object_id = IC.object_id AND C.column_id = IC.column_id
+            WHERE I.object_id = OBJECT_ID(%s)
+            ORDER BY I.name, IC.is_included_column, IC.key_ordinal, IC.index_column_id
+        """, (table_name,))
+        indexes = {}
+        for index_name, type_desc, column_name, key_ordinal, is_included in cursor.fetchall():
+            index = indexes.setdefault(index_name, {'keys': [], 'includes': [], 'type': type_desc})
+            if is_included:
+                index['includes'].append(column_name.upper())
+            elif key_ordinal:
+                index['keys'].append(column_name.upper())
+        return indexes
+
+    @staticmethod
+    def _logo_index_covers(index, keys, includes):
+        """
+        Index önerilen sütunları kapsıyor mu? Anahtar sütunlar aynı sırayla
+        başta olmalı; kalan sütunlar anahtarda veya include'da bulunmalı.
+        Clustered index tüm sütunları taşıdığından include şartı aranmaz.
+        """
+        if index['keys'][:len(keys)] != list(keys):
+            return False
+        if index['type'] == 'CLUSTERED':
+            return True
+        available = set(index['keys']) | set(index['includes'])
+        return set(includes) <= available
+
+    def _time_logo_queries(self, cursor, table_name, samples):
+        """
+        Eski ve yeni sorgu şekillerini aynı örneklerle ölç (v1.0.32)
+
+        Önce ölçülmeyen bir ısınma turu çalıştırılır; sonra her örnekte hangi
+        şeklin önce çalışacağı dönüşümlü değişir, böylece ilk sorgunun ısıttığı
+        sayfalardan iki şekil de eşit yararlanır (v1.0.53). Her iki tarafta da
+        aynı iş (execute + fetchall) ölçülür; sonuçlar karşılaştırılıp
+        farklılıklar sayılır.
+
+        Returns:
+            dict: {'legacy_single': sn, 'sargable_single': sn, 'legacy_range': sn,
+                   'sargable_range': sn, 'mismatches': int}
+        """
+        def timed(query, params):
+            started = monotonic()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return rows, monotonic() - started
+
+        def single_queries(invoice_id, direction, date_only):
+            trcode_condition = "TRCODE IN ({})".format(','.join(str(code) for code in LOGO_TRCODES[direction]))
+            next_day = date_only + timedelta(days=1)
+            return (
+                ('legacy_single',
+                 LOGO_LOOKUP_SQL_LEGACY.format(table=table_name, trcode_condition=trcode_condition),
+                 (invoice_id, invoice_id, date_only)),
+                ('sargable_single',
+                 LOGO_LOOKUP_SQL.format(table=table_name, trcode_condition=trcode_condition),
+                 (invoice_id, date_only, next_day, invoice_id, date_only, next_day)),
+            )
+
+        timings = dict.fromkeys(('legacy_single', 'sargable_single', 'legacy_range', 'sargable_range'), 0.0)
+        mismatches = 0
+        if not samples:
+            timings['mismatches'] = mismatches
+            return timings
+
+        # Isınma turu - ölçülmez
+        for _key, query, params in single_queries(*samples[0]):
+            timed(query, params)
+
+        for position, sample in enumerate(samples):
+            queries = single_queries(*sample)
+            if position % 2:
+                queries = queries[::-1]
+            refs = {}
+            for key, query, params in queries:
+                rows, seconds = timed(query, params)
+                refs[key] = sorted(row[0] for row in rows)
+                timings[key] += seconds
+            if refs['legacy_single'] != refs['sargable_single']:
+                mismatches += 1
+
+        range_to = max(sample[2] for sample in samples)
+        range_from = range_to - timedelta(days=29)
+        trcodes = ','.join(str(code) for code in LOGO_TRCODES['IN'] + LOGO_TRCODES['OUT'])
+        range_queries = (
+            ('legacy_range', """
+                SELECT LOGICALREF, FICHENO, DOCODE, DATE_, TRCODE FROM {}
+                WHERE CANCELLED = 0 AND CAST(DATE_ AS DATE) BETWEEN %s AND %s AND TRCODE IN ({})
+            """.format(table_name, trcodes), (range_from, range_to)),
+            # LogoInvoiceMatcher.load_range ile aynı sorgu; index kurulumu ölçüme girmez
+            ('sargable_range', """
+                SELECT LOGICALREF, FICHENO, DOCODE, DATE_, TRCODE FROM {}
+                WHERE DATE_ >= %s AND DATE_ < %s AND CANCELLED = 0 AND TRCODE IN ({})
+            """.format(table_name, trcodes), (range_from, range_to + timedelta(days=1))),
+        )
+        # Isınma turu, ardından iki sıralamada birer ölçüm (ABBA) - ortalama alınır
+        for _key, query, params in range_queries:
+            timed(query, params)
+        for queries in (range_queries, range_queries[::-1]):
+            for key, query, params in queries:
+                timings[key] += timed(query, params)[1] / 2
+
+        timings['mismatches'] = mismatches
+        return timings
+
+    def action_logo_index_advisor(self):
+        """
+        Logo fatura tablosunun indexlerini incele, kapsayan index öner ve
+        eski / yeni sorgu şekillerinin sürelerini ölç (v1.0.32)
+
+        Index oluşturmaz; önerilen CREATE INDEX komutlarını rapora yazar.
+        """
+        self.ensure_one()
+        if not self.env.user.has_group('base.group_system'):
+            raise UserError(_("Index danışmanı yalnızca sistem yöneticileri içindir."))
+
+        config_param = self.env['ir.config_parameter'].sudo()
+        table_name = config_param.get_param('logo.invoice_table', 'LG_600_01_INVOICE')
+
+        # Ölçüm örnekleri: tarihi olan son 50 e-fatura
+        sample_invoices = self.env['e.invoice'].search(
+            [('issue_date', '!=', False), ('direction', 'in', ('IN', 'OUT'))],
+            order='issue_date desc', limit=50)
+        samples = [(invoice.invoice_id, invoice.direction, invoice.issue_date.date())
+                   for invoice in sample_invoices]
+
+        try:
+            with self._get_mssql_connection() as conn:
+                cursor = conn.cursor()
+                indexes = self._get_logo_indexes(cursor, table_name)
+                timings = self._time_logo_queries(cursor, table_name, samples)
+        except Exception as e:
+            raise UserError(_("Index danışmanı çalıştırılamadı: %s") % str(e))
+
+        lines = [_("📊 Logo Index Danışmanı - %s") % table_name, ""]
+        lines.append(_("Mevcut indexler (%s):") % len(indexes))
+        for index_name, index in sorted(indexes.items()):
+            include_text = (" INCLUDE (%s)" % ', '.join(index['includes'])) if index['includes'] else ""
+            lines.append("  • %s [%s]: (%s)%s" % (index_name, index['type'],
+                                                  ', '.join(index['keys']), include_text))
+
+        lines.append("")
+        lines.append(_("Önerilen kapsayan indexler:"))
+        missing = []
+        for index_name, keys, includes in LOGO_RECOMMENDED_INDEXES:
+            covering = [name for name, index in indexes.items()
+                        if self._logo_index_covers(index, keys, includes)]
+            if covering:
+                lines.append(_("  ✅ (%s) INCLUDE (%s) → mevcut: %s") % (
+                    ', '.join(keys), ', '.join(includes), ', '.join(sorted(covering))))
+            else:
+                lines.append(_("  ❌ (%s) INCLUDE (%s) → eksik") % (', '.join(keys), ', '.join(includes)))
+                missing.append("CREATE NONCLUSTERED INDEX %s ON %s (%s) INCLUDE (%s);" % (
+                    index_name, table_name, ', '.join(keys), ', '.join(includes)))
+        if missing:
+            lines.append("")
+            lines.append(_("Önerilen komutlar (Logo DBA onayıyla çalıştırılmalıdır):"))
+            lines.extend("  " + statement for statement in missing)
+
+        lines.append("")
+        if samples:
+            lines.append(_("Süre ölçümü (%s fatura, tekil sorgu toplamı):") % len(samples))
+            lines.append(_("  Eski (OR + CAST):     %.3f sn") % timings['legacy_single'])
+            lines.append(_("  Yeni (UNION + aralık): %.3f sn") % timings['sargable_single'])
+            lines.append(_("Süre ölçümü (30 günlük aralık okuması):"))
+            lines.append(_("  Eski (CAST BETWEEN):  %.3f sn") % timings['legacy_range'])
+            lines.append(_("  Yeni (yarı açık):     %.3f sn") % timings['sargable_range'])
+            if timings['mismatches']:
+                lines.append(_("⚠️ %s örnekte eski ve yeni sorgu farklı sonuç döndürdü!") % timings['mismatches'])
+            else:
+                lines.append(_("Eski ve yeni sorgu tüm örneklerde aynı sonucu döndürdü."))
+        else:
+            lines.append(_("Süre ölçümü için tarihli e-fatura kaydı bulunamadı."))
+
+        self.result_message = '\n'.join(lines)
+        _logger.info("Logo index danışmanı: %s index, %s eksik öneri", len(indexes), len(missing))
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Logo Index Danışmanı'),
+            'res_model': 'logo.sync.wizard',
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
     def action_sync_logo(self):
         """Ana senkronizasyon işlemi"""
         
@@ -2458,9 +4832,8 @@ class LogoSyncWizard(models.TransientModel):
             if self.test_mode:
                 return self._run_test_mode(e_invoices)
             
-            # MSSQL bağlantısı
-            conn = self._get_mssql_connection()
-            cursor = conn.cursor()
+            # MSSQL bağlantısı - yerel Logo anahtar kopyası kullanılıyorsa gerekmez (v1.0.34)
+            conn = None if self.env['logo.invoice.key']._mirror_enabled() else self._get_mssql_connection()
             
             # Senkronizasyon istatistikleri
             stats = {
@@ -2473,8 +4846,17 @@ class LogoSyncWizard(models.TransientModel):
             }
             
             error_details = []
-            
+
+            # Seçili faturaların tarih aralığı tek sorguda okunur (v1.0.30)
+            try:
+                matcher = self._get_logo_matcher(conn.cursor() if conn else None, e_invoices)
+            finally:
+                # Eşleştirici belleğe yüklendi; bağlantı hata olsa da havuza döner (v1.0.58)
+                if conn:
+                    conn.close()
+
             # Her faturayı işle
+            match_results = []
             for invoice in e_invoices:
                 try:
                     # Kilitli kayıtları atlama (v1.0.5)
@@ -2482,39 +4864,23 @@ class LogoSyncWizard(models.TransientModel):
                         _logger.info(f"Logo Sync: Kilitli kayıt atlandı - {invoice.invoice_id}")
                         continue
 
-                    # Logo'da kontrol et
-                    logo_result = self._check_invoice_in_logo(
-                        cursor,
+                    # Logo'da kontrol et (bellekteki index üzerinden)
+                    logo_result = matcher.check(
                         invoice.invoice_id,
                         invoice.direction,
                         invoice.issue_date
                     )
 
-                    # Mevcut notları koru
-                    existing_notes = invoice.notes or ''
-                    new_note = logo_result['note']
-
-                    if existing_notes:
-                        updated_notes = "{}\n{}".format(existing_notes, new_note)
-                    else:
-                        updated_notes = new_note
-
-                    # E-fatura kaydını güncelle
-                    update_vals = {
-                        'exists_in_logo': logo_result['exists'],
-                        'logo_record_id': logo_result['logo_record_id'],
-                        'notes': updated_notes
-                    }
-
-                    invoice.write(update_vals)
-                    stats['updated'] += 1
+                    # Sonuç toplanır, döngü sonunda toplu yazılır (v1.0.35)
+                    match_results.append((invoice.id, logo_result['exists'], logo_result['logo_record_id'],
+                                          logo_result['code'], logo_result['match_count']))
                     
                     # İstatistikleri güncelle
                     if logo_result['exists']:
                         stats['found'] += 1
-                    elif 'bulunamadı' in logo_result['note']:
+                    elif logo_result['code'] in ('not_found', 'no_date'):
                         stats['not_found'] += 1
-                    elif 'birden fazla' in logo_result['note']:
+                    elif logo_result['code'] == 'multiple':
                         stats['multiple'] += 1
                     
                 except Exception as e:
@@ -2522,14 +4888,26 @@ class LogoSyncWizard(models.TransientModel):
                     error_msg = _("Fatura %s: %s") % (invoice.invoice_id, str(e))
                     error_details.append(error_msg)
                     _logger.error("Logo senkronizasyon hatası - %s", error_msg)
-            
-            conn.close()
+
+            # Tek UPDATE ... FROM (VALUES ...) ile parça parça yaz (v1.0.35)
+            stats['updated'] = self.env['e.invoice']._apply_logo_match_results(match_results, 'wizard')
             
             # Sonuç mesajı oluştur
             result_message = self._create_result_message(stats, error_details)
             
             # Wizard'ı güncelle
             self.write({'result_message': result_message})
+
+            # Çalışma özeti (v1.0.27)
+            self.env['e.invoice.sync.run']._log_run('logo', {
+                'Logo': {
+                    'success': True,
+                    'updated': stats['updated'],
+                    'errors': stats['errors'],
+                    'message': _('%s bulundu, %s bulunamadı, %s birden fazla') % (
+                        stats['found'], stats['not_found'], stats['multiple']),
+                },
+            }, self.date_from if self.date_filter else False, self.date_to if self.date_filter else False)
             
             # Bildirim göster
             notification_type = 'success' if stats['errors'] == 0 else 'warning'
@@ -2564,31 +4942,30 @@ class LogoSyncWizard(models.TransientModel):
     def _run_test_mode(self, e_invoices):
         """Test modu çalıştır"""
         try:
-            conn = self._get_mssql_connection()
-            cursor = conn.cursor()
-            
-            # İlk 5 kaydı test et
-            test_invoices = e_invoices[:5]
-            test_results = []
-            
-            for invoice in test_invoices:
-                logo_result = self._check_invoice_in_logo(
-                    cursor,
-                    invoice.invoice_id,
-                    invoice.direction,
-                    invoice.issue_date
-                )
+            # Bağlantı hata olsa da havuza döner (v1.0.58)
+            with self._get_mssql_connection() as conn:
+                cursor = conn.cursor()
 
-                test_results.append({
-                    'invoice_id': invoice.invoice_id,
-                    'direction': invoice.direction,
-                    'issue_date': invoice.issue_date,
-                    'exists': logo_result['exists'],
-                    'logo_id': logo_result['logo_record_id'],
-                    'note': logo_result['note']
-                })
-            
-            conn.close()
+                # İlk 5 kaydı test et
+                test_invoices = e_invoices[:5]
+                test_results = []
+
+                for invoice in test_invoices:
+                    logo_result = self._check_invoice_in_logo(
+                        cursor,
+                        invoice.invoice_id,
+                        invoice.direction,
+                        invoice.issue_date
+                    )
+
+                    test_results.append({
+                        'invoice_id': invoice.invoice_id,
+                        'direction': invoice.direction,
+                        'issue_date': invoice.issue_date,
+                        'exists': logo_result['exists'],
+                        'logo_id': logo_result['logo_record_id'],
+                        'note': logo_result['note']
+                    })
             
             # Test sonuçları mesajı
             test_message = _("🔍 TEST MODU SONUÇLARI\n\n")
@@ -2705,6 +5082,31 @@ class EInvoiceConfigSettings(models.TransientModel):
         config_parameter='logo.auto_sync',
         help="E-fatura senkronizasyonu sonrası otomatik olarak Logo senkronizasyonu çalıştır"
     )
+    logo_max_parallel_workers = fields.Integer(
+        string='Paralel Logo Bağlantısı',
+        config_parameter='logo.max_parallel_workers',
+        default=4,
+        help="Geniş Logo eşleştirmelerinde aynı anda açılacak en fazla MSSQL bağlantısı (1 = paralel okuma kapalı)"
+    )
+    logo_use_key_mirror = fields.Boolean(
+        string='Yerel Logo Anahtar Kopyası',
+        config_parameter='logo.use_key_mirror',
+        help="Logo eşleştirmesini MSSQL yerine periyodik yenilenen yerel kopyadan yap (v1.0.34). "
+             "Açıldığında yenileme cron'u etkinleşir ve ilk tam yenileme başlar; kopya tam yenilenene "
+             "kadar ya da 6 saatten eskiyse eşleştirme MSSQL'den yapılır. Logo'da silinen faturalar "
+             "yalnızca haftalık tam yenilemede kopyadan çıkar."
+    )
+    logo_report_snapshot_closed_days = fields.Integer(
+        string='Rapor Kopyası Kapanış Süresi (Gün)',
+        config_parameter='logo.report_snapshot_closed_days',
+        default=60,
+        help="Bu kadar gün önce biten KDV-2 / Muhtasar dönemleri kapanmış sayılır ve kopyadan sunulur (v1.0.42)"
+    )
+    logo_report_snapshot_auto_invalidate = fields.Boolean(
+        string='Rapor Kopyası Otomatik Geçersizleştirme',
+        config_parameter='logo.report_snapshot_auto_invalidate',
+        help="Kopya kullanılmadan önce dönemdeki Logo fişleri kontrol edilir; değişiklik varsa rapor yeniden oluşturulur (v1.0.42)"
+    )
 
     # Cron 1: Progressive Sync (7 Günlük Periyot)
     cron1_enabled = fields.Boolean(
@@ -2779,7 +5181,9 @@ class EInvoiceConfigSettings(models.TransientModel):
     cron3_end_date = fields.Char(
         string='Bitiş Tarihi',
         config_parameter='cron.logo_monthly_end_date',
-        help="YYYY-MM-DD formatında tarih girin"
+        help="YYYY-MM-DD formatında tarih girin. Sadece ilk tam taramanın (30 günlük "
+             "periyotlar) sonudur; tarama bitince cron durmaz, başlangıç tarihinden bugüne "
+             "kadar vadesi gelen faturaları (önce yeni / değişenler) kontrol etmeye devam eder."
     )
     cron3_last_sync_date = fields.Char(
         string='Son Senkronize Tarih',
@@ -2817,119 +5221,997 @@ class EInvoiceConfigSettings(models.TransientModel):
             efatura_earsiv_ws=ICPSudo.get_param('efatura.earsiv_ws',
                 'https://earsivws.izibiz.com.tr/EIArchiveWS/EFaturaArchive?wsdl'),
 
-            # Logo MSSQL ayarları
-            logo_mssql_server=ICPSudo.get_param('logo.mssql_server', ''),
-            logo_mssql_port=int(ICPSudo.get_param('logo.mssql_port', '1433')),
-            logo_mssql_database=ICPSudo.get_param('logo.mssql_database', ''),
-            logo_mssql_username=ICPSudo.get_param('logo.mssql_username', ''),
-            logo_mssql_password=ICPSudo.get_param('logo.mssql_password', ''),
-            logo_invoice_table=ICPSudo.get_param('logo.invoice_table', 'LG_600_01_INVOICE'),
-            logo_auto_sync=str_to_bool(ICPSudo.get_param('logo.auto_sync', 'False')),  # ✅ Düzeltildi
-        )
-        return res
+            # Logo MSSQL ayarları
+            logo_mssql_server=ICPSudo.get_param('logo.mssql_server', ''),
+            logo_mssql_port=int(ICPSudo.get_param('logo.mssql_port', '1433')),
+            logo_mssql_database=ICPSudo.get_param('logo.mssql_database', ''),
+            logo_mssql_username=ICPSudo.get_param('logo.mssql_username', ''),
+            logo_mssql_password=ICPSudo.get_param('logo.mssql_password', ''),
+            logo_invoice_table=ICPSudo.get_param('logo.invoice_table', 'LG_600_01_INVOICE'),
+            logo_auto_sync=str_to_bool(ICPSudo.get_param('logo.auto_sync', 'False')),  # ✅ Düzeltildi
+        )
+        return res
+
+    def set_values(self):
+        mirror_was_enabled = self.env['logo.invoice.key']._mirror_setting()
+        super(EInvoiceConfigSettings, self).set_values()
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+
+        # Yerel kopya yeni açıldıysa ilk tam yenilemeyi başlat (v1.0.45)
+        if self.logo_use_key_mirror and not mirror_was_enabled:
+            self.env['logo.invoice.key']._activate_refresh_cron()
+        
+        # E-Fatura ayarları
+        ICPSudo.set_param('efatura.username', self.efatura_username or '')
+        ICPSudo.set_param('efatura.password', self.efatura_password or '')
+        ICPSudo.set_param('efatura.earsiv_ws', self.efatura_earsiv_ws or
+            'https://earsivws.izibiz.com.tr/EIArchiveWS/EFaturaArchive?wsdl')
+        
+        # Logo MSSQL ayarları
+        ICPSudo.set_param('logo.mssql_server', self.logo_mssql_server or '')
+        ICPSudo.set_param('logo.mssql_port', str(self.logo_mssql_port or 1433))  # ✅ String'e çevir
+        ICPSudo.set_param('logo.mssql_database', self.logo_mssql_database or '')
+        ICPSudo.set_param('logo.mssql_username', self.logo_mssql_username or '')
+        ICPSudo.set_param('logo.mssql_password', self.logo_mssql_password or '')
+        ICPSudo.set_param('logo.invoice_table', self.logo_invoice_table or 'LG_600_01_INVOICE')  # ✅ Eksik satır eklendi
+        ICPSudo.set_param('logo.auto_sync', str(self.logo_auto_sync))  # ✅ String'e çevir
+
+    def action_test_efatura_connection(self):
+        """E-Fatura SOAP servisi bağlantısını test et"""
+        try:
+            session_id = self.env['e.invoice']._test_soap_connection()
+            if session_id:
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': _('E-Fatura Bağlantı Testi'),
+                        'message': _('SOAP servisi bağlantısı başarılı!'),
+                        'type': 'success',
+                        'sticky': False,
+                    }
+                }
+        except Exception as e:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('E-Fatura Bağlantı Hatası'),
+                    'message': _('Bağlantı hatası: %s') % str(e),
+                    'type': 'danger',
+                    'sticky': True,
+                }
+            }
+    
+    def action_test_logo_connection(self):
+        """Logo MSSQL bağlantısını test et"""
+        try:
+            # Geçici wizard oluştur ve bağlantı test et
+            wizard = self.env['logo.sync.wizard'].create({})
+            return wizard.action_test_connection()
+
+        except Exception as e:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Logo Bağlantı Hatası'),
+                    'message': _('Bağlantı hatası: %s') % str(e),
+                    'type': 'danger',
+                    'sticky': True,
+                }
+            }
+
+    def action_reset_progressive_sync(self):
+        """Progressive sync last_sync_date'i sıfırla"""
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        ICPSudo.set_param('cron.progressive_last_sync_date', False)
+
+        # Form alanını da güncelle
+        self.cron1_last_sync_date = False
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Progressive Sync Sıfırlandı'),
+                'message': _('Son senkronize tarih sıfırlandı. Bir sonraki çalışmada başlangıç tarihinden başlayacak.'),
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    def action_reset_logo_monthly_sync(self):
+        """Logo monthly sync last_sync_date'i sıfırla"""
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        ICPSudo.set_param('cron.logo_monthly_last_sync_date', False)
+
+        # Form alanını da güncelle
+        self.cron3_last_sync_date = False
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Logo Monthly Sync Sıfırlandı'),
+                'message': _('Son senkronize tarih sıfırlandı. Bir sonraki çalışmada başlangıç tarihinden başlayacak.'),
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+
+def _logo_report_period(year, month):
+    """
+    Rapor döneminin yarı açık tarih aralığı (v1.0.41)
+
+    Returns:
+        tuple: (ay başı, sonraki ay başı) - date
+    """
+    period_start = date(int(year), int(month), 1)
+    period_end = (period_start + timedelta(days=32)).replace(day=1)
+    return period_start, period_end
+
+
+# Rapor sorgularındaki Logo firma numarası (tablo adları LG_600_... sabit) (v1.0.42)
+LOGO_REPORT_FIRM_NR = '600'
+
+# Dönem parmak izi: fiş sayısı ve son oluşturma / değişiklik günü (v1.0.42)
+# Parametreler: (başlangıç, bitiş)
+LOGO_REPORT_PERIOD_FINGERPRINT_SQL = """
+SELECT COUNT(*), MAX(CAPIBLOCK_MODIFIEDDATE), MAX(CAPIBLOCK_CREADEDDATE)
+FROM LG_600_01_EMFICHE WITH(NOLOCK)
+WHERE DATE_ >= %s AND DATE_ < %s
+"""
+
+# v1.0.40 ve öncesindeki rapor sorguları - yalnızca sorgu karşılaştırması için (v1.0.62)
+# Parametreler: KDV-2 (ay, yıl), Muhtasar (ay, yıl) x 8
+# Orijinal sorgulardaki `NOT IN (SELECT DISTINCT PREVLINEREF ...)` alt sorgularına
+# `PREVLINEREF IS NOT NULL` eklendi: ACCDISTDETLN'de tek bir NULL PREVLINEREF
+# olsa NOT IN her satır için UNKNOWN döner ve ilk CASE dalı hiç çalışmaz. Yeni
+# sorgudaki `A1.PREVLINEREF IS NULL` bu korumalı şekle denktir; NULL satır
+# sayısı karşılaştırma sonucunda ayrıca gösterilir.
+LOGO_KDV2_REPORT_SQL_LEGACY = """
+SELECT  
+ AA.LOGICALREF as logoID,
+ MONTH(A.DATE_) as ay,
+ YEAR(A.DATE_) as yil,
+ AA.FICHENO as fisNo,
+ E.CODE+' '+E.NAME as proje,
+ F1.CODE as kebirHesapKodu,
+ F1.DEFINITION_ as kebirHesapAdi,
+ F.CODE as hesapKodu,
+ F.DEFINITION_ as hesapAdi,
+ G.CODE+' '+G.DEFINITION_ as masrafMerkezi,
+ CASE WHEN AA.MODULENR=1 THEN '1 Malzeme'
+  WHEN AA.MODULENR=2 THEN '2 Satınalma'
+  WHEN AA.MODULENR=3 THEN '3 Satış'
+  WHEN AA.MODULENR=4 THEN '4 Cari Hesap'
+  WHEN AA.MODULENR=5 THEN '5 Çek Senet'
+  WHEN AA.MODULENR=6 THEN '6 Banka'
+  WHEN AA.MODULENR=7 THEN '7 Kasa'
+  ELSE '' END as kaynakModul,
+ A.LINEEXP as aciklama,
+ AA.GENEXP1 as fisAciklama,
+ A.CLDEF as cari, 
+ A.TAXNR as cariVergiNo,
+ CL.DEFINITION_ as cariUnvan, 
+ CL.NAME as adi, 
+ CL.SURNAME as soyAdi, 
+ CL.TCKNO as tckn,
+ CASE WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN END as tutarYerel,
+ SEML.VATAMOUNT as kdvTutar,
+ SEML.DEDUCTION as tevkifatOran,
+ CASE WHEN ISNULL(SSTL.DEDUCTIONPART1,0) != 0 
+                                    AND ISNULL(SSTL.DEDUCTIONPART2,0) != 0 
+                                    AND ISNULL(SSTL.VAT,0) != 0
+                                            THEN  ROUND((SSTL.GROSSTOTAL*SSTL.VAT/100) *  CAST(SSTL.DEDUCTIONPART1  AS FLOAT)  / CAST(SSTL.DEDUCTIONPART2 AS FLOAT),2)  ELSE 0 END as tevkifEdilenKdvTutari
+FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
+ LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=A.ACCFICHEREF
+ LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=A.LOGICALREF
+ LEFT JOIN L_CAPIDIV C WITH(NOLOCK) ON C.NR=A.BRANCH AND C.FIRMNR=600
+ LEFT JOIN L_CAPIDEPT D WITH(NOLOCK) ON D.NR=A.DEPARTMENT AND D.FIRMNR=600
+ LEFT JOIN LG_600_PROJECT E WITH(NOLOCK) ON E.LOGICALREF=A1.PROJECTREF
+ LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=A.ACCOUNTREF
+ LEFT JOIN LG_600_EMUHACC F1 WITH(NOLOCK) ON F1.CODE=left(F.CODE,3)
+ LEFT JOIN LG_600_EMCENTER G WITH(NOLOCK) ON G.LOGICALREF=A.CENTERREF
+ LEFT JOIN L_CURRENCYLIST H WITH(NOLOCK) ON H.CURTYPE=A.TRCURR AND H.FIRMNR=600
+ LEFT JOIN LG_EXCHANGE_600 I WITH(NOLOCK) ON I.EDATE=A.DATE_ AND I.CRTYPE=20
+ LEFT JOIN LG_600_01_INVOICE N1 WITH(NOLOCK) ON N1.LOGICALREF = A.SOURCEFREF
+ LEFT JOIN LG_600_01_INVOICE N2 WITH(NOLOCK) ON N2.ACCFICHEREF = AA.LOGICALREF
+ LEFT JOIN LG_600_CLCARD CL WITH(NOLOCK)  ON CL.LOGICALREF = N2.CLIENTREF
+ LEFT JOIN (SELECT STL.INVOICEREF, SC.CANDEDUCT, STL.DEDUCTIONPART1,STL.DEDUCTIONPART2, STL.VAT,
+            CASE
+            WHEN (STL.IOCODE=1 OR STL.IOCODE=2 OR STL.TRCODE=4) OR (STL.IOCODE=0 AND STL.TRCODE IN (1,3)) THEN ROUND(STL.VATAMNT,2)
+            WHEN (STL.IOCODE=3 OR STL.IOCODE=4 OR STL.TRCODE=9) OR (STL.IOCODE=0 AND STL.TRCODE IN (6,8)) THEN (-1)*ROUND(STL.VATAMNT,2)
+            ELSE 0
+            END AS VATAMOUNT,
+            CASE
+              WHEN (STL.IOCODE=1 OR STL.IOCODE=2 OR STL.TRCODE=4) OR (STL.IOCODE=0 AND STL.TRCODE IN (1,3)) THEN ROUND((STL.LINENET-(STL.DISTEXP-STL.DISTDISC)),2)
+              WHEN (STL.IOCODE=3 OR STL.IOCODE=4 OR STL.TRCODE=9) OR (STL.IOCODE=0 AND STL.TRCODE IN (6,8)) THEN (-1)*ROUND((STL.LINENET-(STL.DISTEXP-STL.DISTDISC)),2)
+              ELSE 0
+              END AS GROSSTOTAL
+            FROM LG_600_01_STLINE STL 
+            JOIN LG_600_SRVCARD SC WITH(NOLOCK) ON SC.LOGICALREF=STL.STOCKREF
+            WHERE STL.LINETYPE = 4
+            AND SC.CANDEDUCT=1
+            AND (STL.DEDUCTIONPART1 != 0 AND STL.DEDUCTIONPART2 !=0 )
+            ) SSTL ON SSTL.INVOICEREF = N1.LOGICALREF 
+INNER JOIN (
+            SELECT EML.ACCFICHEREF, CREDIT AS VATAMOUNT, F.CODE AS VATCODE,
+                    CASE 
+                        WHEN F.CODE = '360.10.04.020' THEN '2/10'
+                        WHEN F.CODE = '360.10.04.030' THEN '3/10'
+                        WHEN F.CODE = '360.10.04.040' THEN '4/10'
+                        WHEN F.CODE = '360.10.04.050' THEN '5/10'
+                        WHEN F.CODE = '360.10.04.070' THEN '7/10'
+                        WHEN F.CODE = '360.10.04.080' THEN '8/10'
+                        WHEN F.CODE = '360.10.04.090' THEN '9/10'
+                        WHEN F.CODE = '360.10.04.100' THEN '10/10'
+                    END AS DEDUCTION            
+            FROM  LG_600_01_EMFLINE EML WITH(NOLOCK)
+             LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=EML.ACCFICHEREF
+             LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=EML.LOGICALREF
+             LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=EML.ACCOUNTREF
+            WHERE AA.CANCELLED = 0 
+            AND F.CODE LIKE '360.10.04%'
+            AND AA.MODULENR=2
+            ) SEML ON SEML.ACCFICHEREF = A.ACCFICHEREF
+WHERE ISNULL(AA.CANCELLED,0) = 0 
+AND ISNULL(A.CANCELLED,0)=0
+AND (F.CODE LIKE '7%' OR F.CODE LIKE '253%' OR F.CODE LIKE '255%' OR F.CODE LIKE '260%')
+AND MONTH(A.DATE_)= %s
+AND YEAR(A.DATE_)= %s
+AND AA.MODULENR=2
+"""
+
+LOGO_MUHTASAR_REPORT_SQL_LEGACY = """
+SELECT 
+CASE
+    WHEN F.CODE = '360.10.01.001' THEN 'ÜCRET GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.002' THEN 'S.M MAKBUZU'
+    WHEN F.CODE = '360.10.01.003' THEN 'KİRA GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.004' THEN 'GİDER PUSULASI GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.005' THEN 'YURT DIŞI HİZMERT ALIMI GELİR VERGİSİ'
+    WHEN F.CODE LIKE '7%' THEN 'VERGİ' 
+END as odenecekGelirVergileri,
+CASE
+    WHEN F.CODE = '360.10.01.001' THEN 'ÜCRET GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.002' THEN '022'
+    WHEN F.CODE = '360.10.01.003' THEN '041'
+    WHEN F.CODE = '360.10.01.004' THEN '156'
+    WHEN F.CODE = '360.10.01.005' THEN '279'
+    WHEN F.CODE LIKE '7%' THEN ''
+END as vergiTuru,
+A.DATE_ as tarih,
+MONTH(A.DATE_) as ay,
+YEAR(A.DATE_) as yil,
+AA.FICHENO as fisNo,
+CASE 
+    WHEN A.TRCODE=1 THEN '1 Açılış'
+    WHEN A.TRCODE=2 THEN '2 Tahsil'
+    WHEN A.TRCODE=3 THEN '3 Tediye'
+    WHEN A.TRCODE=4 THEN '4 Mahsup'
+    WHEN A.TRCODE=5 THEN '5 Özel'
+    WHEN A.TRCODE=6 THEN '6 Kur Farkı'
+    WHEN A.TRCODE=7 THEN '7 Kapanış'
+    ELSE '' 
+END as islem,
+CAST(C.NR AS CHAR(3))+' '+C.NAME as isYeri,
+CAST(D.NR AS CHAR(3))+' '+D.NAME as bolum,
+E.CODE+' '+E.NAME as proje,
+F1.CODE as kebirHesabiKodu,
+F1.DEFINITION_ as kebirHesabiAdi,
+F.CODE as hesapKodu,
+F.DEFINITION_ as hesapAdi,
+G.CODE+' '+G.DEFINITION_ as masrafMerkezi,
+CASE 
+    WHEN AA.MODULENR=1 THEN '1 Malzeme'
+    WHEN AA.MODULENR=2 THEN '2 Satınalma'
+    WHEN AA.MODULENR=3 THEN '3 Satış'
+    WHEN AA.MODULENR=4 THEN '4 Cari Hesap'
+    WHEN AA.MODULENR=5 THEN '5 Çek Senet'
+    WHEN AA.MODULENR=6 THEN '6 Banka'
+    WHEN AA.MODULENR=7 THEN '7 Kasa'
+    ELSE '' 
+END as kaynakModul,
+-CASE 
+    WHEN A.TRCURR=0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
+    WHEN A.TRCURR<>0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
+    WHEN A.TRCURR=0 AND A1.DISTRATE<>100 THEN A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN
+    WHEN A.TRCURR<>0 AND A1.DISTRATE<>100 THEN A1.TRNET-A1.TRNET*2*A.SIGN
+    ELSE 0 
+END  as tutar,
+CASE 
+    WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
+    ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN 
+END as tutarYerel,
+A.LINEEXP as aciklama,
+AA.GENEXP1 as fisAciklama,
+CASE 
+    WHEN A.SIGN=0 THEN '0 Borç' WHEN A.SIGN=1 THEN '1 Alacak' 
+    ELSE '' 
+END as hareketYonu,
+CASE 
+    WHEN A.CANCELLED=0 THEN 'Hayır' 
+    ELSE 'Evet' 
+END as iptal,
+CASE AA.DOCTYPE 
+    WHEN 0 THEN 'Normal' 
+    WHEN 1 THEN 'Cost Of Sales' 
+    WHEN 2 THEN 'Differences Of Cost Of Sales' 
+    ELSE '' 
+END as belgeTuru,
+A.CLDEF as cari,
+A.TAXNR as cariVergiNo,
+CL.DEFINITION_ as cariUnvan1, 
+CL.DEFINITION2 as cariUnvan2,
+CL.NAME as adi, 
+CL.SURNAME as soyadi,
+N2.DOCODE as faturaBelgeNo, 
+N2.FICHENO as faturaNo,
+CL.ADDR1 as adres1,
+CL.COUNTRY as ulke,
+-1 * SEML.TOTAL as vergi
+FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
+    LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=A.ACCFICHEREF
+    LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=A.LOGICALREF
+    LEFT JOIN L_CAPIDIV C WITH(NOLOCK) ON C.NR=A.BRANCH AND C.FIRMNR=600
+    LEFT JOIN L_CAPIDEPT D WITH(NOLOCK) ON D.NR=A.DEPARTMENT AND D.FIRMNR=600
+    LEFT JOIN LG_600_PROJECT E WITH(NOLOCK) ON E.LOGICALREF=A1.PROJECTREF
+    LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=A.ACCOUNTREF
+    LEFT JOIN LG_600_EMUHACC F1 WITH(NOLOCK) ON F1.CODE=left(F.CODE,3)
+    LEFT JOIN LG_600_EMCENTER G WITH(NOLOCK) ON G.LOGICALREF=A.CENTERREF
+    LEFT JOIN L_CURRENCYLIST H WITH(NOLOCK) ON H.CURTYPE=A.TRCURR AND H.FIRMNR=600
+    LEFT JOIN LG_EXCHANGE_600 I WITH(NOLOCK) ON I.EDATE=A.DATE_ AND I.CRTYPE=20
+    LEFT JOIN LG_600_01_INVOICE N1 WITH(NOLOCK) ON N1.LOGICALREF = A.SOURCEFREF
+    LEFT JOIN LG_600_01_INVOICE N2 WITH(NOLOCK) ON N2.ACCFICHEREF = AA.LOGICALREF
+    LEFT JOIN LG_600_CLCARD CL WITH(NOLOCK)  ON CL.LOGICALREF = N2.CLIENTREF
+    INNER JOIN (
+                SELECT
+                EML.ACCFICHEREF, 
+                CASE 
+                    WHEN EML.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
+                    ELSE A1.CREDEBNET-A1.CREDEBNET*2*EML.SIGN 
+                END AS TOTAL
+                FROM  LG_600_01_EMFLINE EML WITH(NOLOCK)
+                    LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=EML.ACCFICHEREF
+                    LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=EML.LOGICALREF
+                    LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=EML.ACCOUNTREF
+                WHERE AA.CANCELLED = 0
+                    AND (F.CODE LIKE '360.10.01%')
+                    AND MONTH(EML.DATE_)= %s                                      
+                    AND YEAR(EML.DATE_)= %s                     
+                    and AA.MODULENR=2
+                ) SEML ON  SEML.ACCFICHEREF = A.ACCFICHEREF
+WHERE AA.CANCELLED = 0
+    AND (F.CODE LIKE '7%')
+    AND MONTH(A.DATE_)= %s                 
+    AND YEAR(A.DATE_)= %s                   
+    and AA.MODULENR=2
+UNION ALL
+SELECT 
+CASE
+    WHEN F.CODE = '360.10.01.001' THEN 'ÜCRET GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.002' THEN 'S.M MAKBUZU'
+    WHEN F.CODE = '360.10.01.003' THEN 'KİRA GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.004' THEN 'GİDER PUSULASI GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.005' THEN 'YURT DIŞI HİZMERT ALIMI GELİR VERGİSİ'
+    WHEN F.CODE LIKE '7%' THEN 'VERGİ'
+END as odenecekGelirVergileri,
+CASE
+    WHEN F.CODE = '360.10.01.001' THEN 'ÜCRET GELİR VERGİSİ'
+    WHEN F.CODE = '360.10.01.002' THEN '022'
+    WHEN F.CODE = '360.10.01.003' THEN '041'
+    WHEN F.CODE = '360.10.01.004' THEN '156'
+    WHEN F.CODE = '360.10.01.005' THEN '279'
+    WHEN F.CODE LIKE '7%' THEN ''
+END as vergiTuru,
+A.DATE_ as tarih,
+MONTH(A.DATE_) as ay,
+YEAR(A.DATE_) as yil,
+AA.FICHENO as fisNo,
+CASE 
+    WHEN A.TRCODE=1 THEN '1 Açılış'
+    WHEN A.TRCODE=2 THEN '2 Tahsil'
+    WHEN A.TRCODE=3 THEN '3 Tediye'
+    WHEN A.TRCODE=4 THEN '4 Mahsup'
+    WHEN A.TRCODE=5 THEN '5 Özel'
+    WHEN A.TRCODE=6 THEN '6 Kur Farkı'
+    WHEN A.TRCODE=7 THEN '7 Kapanış'
+    ELSE '' 
+END as islem,
+CAST(C.NR AS CHAR(3))+' '+C.NAME as isYeri,
+CAST(D.NR AS CHAR(3))+' '+D.NAME as bolum,
+E.CODE+' '+E.NAME as proje,
+F1.CODE as kebirHesabiKodu,
+F1.DEFINITION_ as kebirHesabiAdi,
+F.CODE as hesapKodu,
+F.DEFINITION_ as hesapAdi,
+G.CODE+' '+G.DEFINITION_ as masrafMerkezi,
+CASE 
+WHEN AA.MODULENR=1 THEN '1 Malzeme'
+    WHEN AA.MODULENR=2 THEN '2 Satınalma'
+    WHEN AA.MODULENR=3 THEN '3 Satış'
+    WHEN AA.MODULENR=4 THEN '4 Cari Hesap'
+    WHEN AA.MODULENR=5 THEN '5 Çek Senet'
+    WHEN AA.MODULENR=6 THEN '6 Banka'
+    WHEN AA.MODULENR=7 THEN '7 Kasa'
+    ELSE '' 
+END as kaynakModul,
+-CASE 
+    WHEN A.TRCURR=0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
+    WHEN A.TRCURR<>0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
+    WHEN A.TRCURR=0 AND A1.DISTRATE<>100 THEN A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN
+    WHEN A.TRCURR<>0 AND A1.DISTRATE<>100 THEN A1.TRNET-A1.TRNET*2*A.SIGN
+    ELSE 0 
+END as tutar,
+CASE 
+    WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
+    ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN 
+END as tutarYerel,
+A.LINEEXP as aciklama,
+AA.GENEXP1 as fisAciklama,
+CASE 
+    WHEN A.SIGN=0 THEN '0 Borç' 
+    WHEN A.SIGN=1 THEN '1 Alacak' 
+    ELSE '' 
+END as hareketYonu,
+CASE 
+    WHEN A.CANCELLED=0 THEN 'Hayır' 
+    ELSE 'Evet' 
+END  as iptal,
+CASE AA.DOCTYPE 
+    WHEN 0 THEN 'Normal' 
+    WHEN 1 THEN 'Cost Of Sales' 
+    WHEN 2 THEN 'Differences Of Cost Of Sales' 
+    ELSE '' 
+END as belgeTuru,
+A.CLDEF as cari, 
+A.TAXNR as cariVergiNo,
+CL.DEFINITION_ as cariUnvan1, 
+CL.DEFINITION2 as cariUnvan2,
+CL.NAME as adi, 
+CL.SURNAME as soyadi,
+N2.DOCODE as faturaBelgeNo, 
+N2.FICHENO as faturaNo,
+CL.ADDR1 as adres1,
+CL.COUNTRY as ulke,
+-1 * SEML.TOTAL as vergi
+FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
+    LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=A.ACCFICHEREF
+    LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=A.LOGICALREF
+    LEFT JOIN L_CAPIDIV C WITH(NOLOCK) ON C.NR=A.BRANCH AND C.FIRMNR=600
+    LEFT JOIN L_CAPIDEPT D WITH(NOLOCK) ON D.NR=A.DEPARTMENT AND D.FIRMNR=600
+    LEFT JOIN LG_600_PROJECT E WITH(NOLOCK) ON E.LOGICALREF=A1.PROJECTREF
+    LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=A.ACCOUNTREF
+    LEFT JOIN LG_600_EMUHACC F1 WITH(NOLOCK) ON F1.CODE=left(F.CODE,3)
+    LEFT JOIN LG_600_EMCENTER G WITH(NOLOCK) ON G.LOGICALREF=A.CENTERREF
+    LEFT JOIN L_CURRENCYLIST H WITH(NOLOCK) ON H.CURTYPE=A.TRCURR AND H.FIRMNR=600
+    LEFT JOIN LG_EXCHANGE_600 I WITH(NOLOCK) ON I.EDATE=A.DATE_ AND I.CRTYPE=20
+    LEFT JOIN LG_600_01_INVOICE N1 WITH(NOLOCK) ON N1.LOGICALREF = A.SOURCEFREF
+    LEFT JOIN LG_600_01_INVOICE N2 WITH(NOLOCK) ON N2.ACCFICHEREF = AA.LOGICALREF
+    INNER JOIN LG_600_CLCARD CL WITH(NOLOCK)  ON CL.LOGICALREF = N2.CLIENTREF
+    INNER JOIN (
+                SELECT
+                EML.ACCFICHEREF, 
+                CASE
+                    WHEN EML.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN WHERE PREVLINEREF IS NOT NULL) OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
+                    ELSE A1.CREDEBNET-A1.CREDEBNET*2*EML.SIGN 
+                END AS TOTAL
+                FROM  LG_600_01_EMFLINE EML WITH(NOLOCK)
+                    LEFT JOIN LG_600_01_EMFICHE AA WITH(NOLOCK) ON AA.LOGICALREF=EML.ACCFICHEREF
+                    LEFT JOIN LG_600_01_ACCDISTDETLN A1 WITH(NOLOCK) ON A1.PREVLINEREF=EML.LOGICALREF
+                    LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=EML.ACCOUNTREF
+                WHERE AA.CANCELLED = 0
+                    AND (F.CODE LIKE '360.10.01%')
+                    AND MONTH(EML.DATE_)= %s   
+                    AND YEAR(EML.DATE_)= %s          
+                    AND AA.MODULENR=6
+                ) SEML ON  SEML.ACCFICHEREF = A.ACCFICHEREF
+WHERE AA.CANCELLED = 0
+    AND (F.CODE LIKE '740.YÜ[PM]%' OR F.CODE LIKE '770.10.08.001')
+    AND MONTH(A.DATE_)= %s              
+    AND YEAR(A.DATE_)= %s                  
+    AND AA.MODULENR=6
+"""
+
+# ACCDISTDETLN'deki NULL PREVLINEREF sayısı - sıfır değilse korumasız eski sorgu
+# yenisinden farklı sonuç verirdi (v1.0.62)
+LOGO_REPORT_NULL_PREVLINEREF_SQL = """
+SELECT COUNT(*) FROM LG_600_01_ACCDISTDETLN WITH(NOLOCK) WHERE PREVLINEREF IS NULL
+"""
+
+
+def _benchmark_logo_report_queries(cursor, legacy, current):
+    """
+    Eski ve yeni rapor sorgusunu aynı dönem için ölç ve sonuçları karşılaştır (v1.0.62)
+
+    LogoSyncWizard._time_logo_queries ile aynı düzen: önce ölçülmeyen bir
+    ısınma turu, sonra iki sıralamada birer ölçüm (ABBA) ve ortalama. Her iki
+    tarafta da execute + fetchall ölçülür. Satırlar sıradan bağımsız çoklu
+    küme olarak karşılaştırılır; aynı satırın tekrar sayısı da eşleşmelidir.
+
+    Args:
+        legacy, current: (sorgu, parametreler)
 
-    def set_values(self):
-        super(EInvoiceConfigSettings, self).set_values()
-        ICPSudo = self.env['ir.config_parameter'].sudo()
-        
-        # E-Fatura ayarları
-        ICPSudo.set_param('efatura.username', self.efatura_username or '')
-        ICPSudo.set_param('efatura.password', self.efatura_password or '')
-        ICPSudo.set_param('efatura.earsiv_ws', self.efatura_earsiv_ws or
-            'https://earsivws.izibiz.com.tr/EIArchiveWS/EFaturaArchive?wsdl')
-        
-        # Logo MSSQL ayarları
-        ICPSudo.set_param('logo.mssql_server', self.logo_mssql_server or '')
-        ICPSudo.set_param('logo.mssql_port', str(self.logo_mssql_port or 1433))  # ✅ String'e çevir
-        ICPSudo.set_param('logo.mssql_database', self.logo_mssql_database or '')
-        ICPSudo.set_param('logo.mssql_username', self.logo_mssql_username or '')
-        ICPSudo.set_param('logo.mssql_password', self.logo_mssql_password or '')
-        ICPSudo.set_param('logo.invoice_table', self.logo_invoice_table or 'LG_600_01_INVOICE')  # ✅ Eksik satır eklendi
-        ICPSudo.set_param('logo.auto_sync', str(self.logo_auto_sync))  # ✅ String'e çevir
+    Returns:
+        dict: {'legacy_seconds', 'seconds', 'legacy_rows', 'rows', 'mismatches',
+               'null_prevlinerefs'}
+    """
+    def timed(query, params):
+        started = monotonic()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return rows, monotonic() - started
+
+    queries = (('legacy', legacy), ('current', current))
+    # Isınma turu - ölçülmez
+    for _key, (query, params) in queries:
+        timed(query, params)
+
+    timings = dict.fromkeys(('legacy', 'current'), 0.0)
+    counters = {}
+    for order in (queries, queries[::-1]):
+        for key, (query, params) in order:
+            rows, seconds = timed(query, params)
+            timings[key] += seconds
+            counters[key] = Counter(tuple(row) for row in rows)
+
+    cursor.execute(LOGO_REPORT_NULL_PREVLINEREF_SQL)
+    null_prevlinerefs = cursor.fetchone()[0]
+
+    legacy_rows, rows = counters['legacy'], counters['current']
+    return {
+        'legacy_seconds': timings['legacy'] / 2,
+        'seconds': timings['current'] / 2,
+        'legacy_rows': sum(legacy_rows.values()),
+        'rows': sum(rows.values()),
+        'mismatches': sum(((legacy_rows - rows) + (rows - legacy_rows)).values()),
+        'null_prevlinerefs': null_prevlinerefs,
+    }
+
+
+def _logo_report_benchmark_action(wizard, label):
+    """
+    Sihirbazın dönemi için sorgu karşılaştırmasını çalıştırıp sonucu bildirim
+    olarak döndür (v1.0.62)
 
-    def action_test_efatura_connection(self):
-        """E-Fatura SOAP servisi bağlantısını test et"""
-        try:
-            session_id = self.env['e.invoice']._test_soap_connection()
-            if session_id:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': _('E-Fatura Bağlantı Testi'),
-                        'message': _('SOAP servisi bağlantısı başarılı!'),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-        except Exception as e:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('E-Fatura Bağlantı Hatası'),
-                    'message': _('Bağlantı hatası: %s') % str(e),
-                    'type': 'danger',
-                    'sticky': True,
-                }
-            }
-    
-    def action_test_logo_connection(self):
-        """Logo MSSQL bağlantısını test et"""
+    Yalnızca sistem yöneticileri içindir; Odoo tarafında kayıt oluşturmaz.
+    """
+    if not wizard.env.user.has_group('base.group_system'):
+        raise UserError(_("Sorgu karşılaştırması yalnızca sistem yöneticileri içindir."))
+
+    try:
+        with wizard._get_mssql_connection() as conn:
+            result = _benchmark_logo_report_queries(
+                conn.cursor(), wizard._get_legacy_report_query(), wizard._get_report_query())
+    except Exception as e:
+        raise UserError(_("Sorgu karşılaştırması çalıştırılamadı: %s") % str(e))
+
+    lines = [
+        _("Eski (MONTH/YEAR + NOT IN): %.3f sn, %s satır") % (result['legacy_seconds'], result['legacy_rows']),
+        _("Yeni (tarih aralığı + tek JOIN): %.3f sn, %s satır") % (result['seconds'], result['rows']),
+    ]
+    if result['mismatches']:
+        lines.append(_("⚠️ %s satır eski ve yeni sorguda farklı!") % result['mismatches'])
+    else:
+        lines.append(_("Eski ve yeni sorgu satır satır aynı sonucu döndürdü."))
+    if result['null_prevlinerefs']:
+        lines.append(_("⚠️ ACCDISTDETLN'de %s NULL PREVLINEREF var; korumasız eski sorgu "
+                       "bu durumda farklı sonuç verirdi.") % result['null_prevlinerefs'])
+    _logger.info("%s sorgu karşılaştırması %s/%s: eski %.3f sn, yeni %.3f sn, %s fark, %s NULL PREVLINEREF",
+                 label, wizard.month, wizard.year, result['legacy_seconds'], result['seconds'],
+                 result['mismatches'], result['null_prevlinerefs'])
+
+    return {
+        'type': 'ir.actions.client',
+        'tag': 'display_notification',
+        'params': {
+            'title': _('%s Sorgu Karşılaştırması') % label,
+            'message': '\n'.join(lines),
+            'type': 'warning' if result['mismatches'] or result['null_prevlinerefs'] else 'success',
+            'sticky': True,
+        }
+    }
+
+
+class LogoReportExportWriter(object):
+    """
+    KDV-2 / Muhtasar satırlarını parça parça xlsx / csv dosyasına yazar (v1.0.44)
+
+    xlsx için openpyxl write_only çalışma kitabı kullanılır; satırlar bellekte
+    değil openpyxl'in geçici dosyasında birikir. csv geçici dosyaya yazılır.
+    Değerler rapor modelinin alan tiplerine göre çevrilir; böylece kopyadan
+    gelen (JSON'da ISO metin olarak saklanan) tarihler de Excel'de tarih olur.
+    """
+
+    MIMETYPES = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv',
+    }
+
+    def __init__(self, report_model, columns, file_format='xlsx', sheet_title='Rapor'):
+        self.file_format = file_format
+        self.columns = columns
+        self.fields = [report_model._fields[name] for name in columns]
+        headers = [field.string for field in self.fields]
+        if file_format == 'xlsx':
+            try:
+                import openpyxl
+            except ImportError:
+                raise UserError(_("openpyxl kütüphanesi yüklü değil. Sistem yöneticisine başvurun."))
+            self.workbook = openpyxl.Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet(title=sheet_title)
+            self.sheet.append(headers)
+        else:
+            import csv
+            self.text_stream = io.TextIOWrapper(tempfile.TemporaryFile(), encoding='utf-8-sig', newline='')
+            self.csv_writer = csv.writer(self.text_stream, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            self.csv_writer.writerow(headers)
+
+    @staticmethod
+    def _convert(field, value):
+        """Değeri alan tipine çevir"""
+        if value is None or value is False:
+            return None
+        if field.type == 'float':
+            return float(value)
+        if field.type == 'integer':
+            return int(value)
+        if field.type == 'date':
+            return fields.Date.to_date(value)
+        return value
+
+    def write(self, vals_list):
+        """Bir parça create değerini dosyaya ekle"""
+        for vals in vals_list:
+            row = [self._convert(field, vals.get(name)) for name, field in zip(self.columns, self.fields)]
+            if self.file_format == 'xlsx':
+                self.sheet.append(row)
+            else:
+                self.csv_writer.writerow(['' if value is None else value for value in row])
+
+    def close(self):
+        """Dosyayı tamamlayıp içeriğini döndür"""
+        if self.file_format == 'xlsx':
+            with tempfile.TemporaryFile() as stream:
+                self.workbook.save(stream)
+                stream.seek(0)
+                return stream.read()
+        self.text_stream.flush()
+        stream = self.text_stream.detach()
         try:
-            # Geçici wizard oluştur ve bağlantı test et
-            wizard = self.env['logo.sync.wizard'].create({})
-            return wizard.action_test_connection()
+            stream.seek(0)
+            return stream.read()
+        finally:
+            stream.close()
 
-        except Exception as e:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Logo Bağlantı Hatası'),
-                    'message': _('Bağlantı hatası: %s') % str(e),
-                    'type': 'danger',
-                    'sticky': True,
-                }
-            }
 
-    def action_reset_progressive_sync(self):
-        """Progressive sync last_sync_date'i sıfırla"""
-        ICPSudo = self.env['ir.config_parameter'].sudo()
-        ICPSudo.set_param('cron.progressive_last_sync_date', False)
+def _export_logo_report(wizard, report_model_name, sheet_title):
+    """
+    Sihirbazın dönemini rapor tablosuna yazmadan dosyaya aktar (v1.0.44)
 
-        # Form alanını da güncelle
-        self.cron1_last_sync_date = False
+    Satırlar kopyadan veya MSSQL imlecinden parça parça okunup doğrudan
+    LogoReportExportWriter'a verilir; PostgreSQL'e yalnızca dosyanın kendisi
+    ek olarak yazılır, kapanmış dönem için de kopya oluşturulmaz.
 
+    Returns:
+        dict: İndirme (act_url) veya kayıt yok bildirimi
+    """
+    wizard.ensure_one()
+    writer = LogoReportExportWriter(
+        wizard.env[report_model_name], wizard.REPORT_COLUMNS, wizard.export_format, sheet_title)
+    try:
+        # Kopya varsa okunur ama yenisi yazılmaz - dışa aktarma PostgreSQL'e rapor verisi yazmaz (v1.0.56)
+        total = wizard.env['logo.report.snapshot']._load_report(
+            wizard, None, sink=writer.write, store_snapshot=False)
+        content = writer.close()
+    except UserError:
+        raise
+    except Exception as e:
+        _logger.error("%s dışa aktarma hatası: %s", sheet_title, str(e))
+        raise UserError(_("Dışa aktarma hatası: %s") % str(e))
+
+    if not total:
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': _('Progressive Sync Sıfırlandı'),
-                'message': _('Son senkronize tarih sıfırlandı. Bir sonraki çalışmada başlangıç tarihinden başlayacak.'),
-                'type': 'success',
+                'title': _('Bilgi'),
+                'message': _('Seçilen dönem için kayıt bulunamadı.'),
+                'type': 'warning',
                 'sticky': False,
-                'next': {'type': 'ir.actions.act_window_close'},
             }
         }
 
-    def action_reset_logo_monthly_sync(self):
-        """Logo monthly sync last_sync_date'i sıfırla"""
-        ICPSudo = self.env['ir.config_parameter'].sudo()
-        ICPSudo.set_param('cron.logo_monthly_last_sync_date', False)
+    file_name = '%s_%s_%02d.%s' % (wizard.REPORT_TYPE, wizard.year, int(wizard.month), wizard.export_format)
+    attachment = wizard.env['ir.attachment'].create({
+        'name': file_name,
+        'raw': content,
+        'mimetype': LogoReportExportWriter.MIMETYPES[wizard.export_format],
+        'res_model': wizard._name,
+        'res_id': wizard.id,
+    })
+    _logger.info("%s %s/%s: %s satır %s dosyasına aktarıldı", sheet_title, wizard.month, wizard.year, total, file_name)
+    return {
+        'type': 'ir.actions.act_url',
+        'url': '/web/content/%s?download=true' % attachment.id,
+        'target': 'self',
+    }
+
+
+class LogoReportSnapshot(models.Model):
+    """
+    Kapanmış dönemlerin KDV-2 / Muhtasar rapor satırlarının kalıcı kopyası (v1.0.42)
+
+    (rapor türü, yıl, ay, firma) başına tek kayıt tutulur. Satırlar
+    _prepare_report_vals çıktısı olarak satır başına bir JSON olacak şekilde
+    gzip'lenip saklanır; aynı dönem tekrar istendiğinde ağır Logo sorgusu
+    çalıştırılmadan bu kopyadan yüklenir.
+
+    Yalnızca kapanmış dönemler saklanır: şirketin KDV kilit tarihi dönem
+    sonunu kapsıyorsa ya da dönem `logo.report_snapshot_closed_days` günden
+    (varsayılan 60) daha önce bittiyse.
+
+    `logo.report_snapshot_auto_invalidate` açıksa kopya kullanılmadan önce
+    dönemin EMFICHE parmak izi (fiş sayısı, son oluşturma / değişiklik günü)
+    Logo'dan okunur; fiş sayısı değiştiyse ya da kopya gününde veya sonrasında
+    değişen fiş varsa kopya yenilenir. Logo değişiklik tarihini gün
+    hassasiyetinde tuttuğundan kopyanın alındığı gün de değişiklik sayılır.
+    """
+    _name = 'logo.report.snapshot'
+    _description = 'Logo Rapor Kopyası'
+    _order = 'year desc, month desc, report_type'
+    _rec_name = 'report_type'
+
+    # Rapor türü -> (sihirbaz modeli, rapor modeli)
+    REPORT_MODELS = {
+        'kdv2': ('logo.kdv2.wizard', 'logo.kdv2.report'),
+        'muhtasar': ('logo.muhtasar.wizard', 'logo.muhtasar.report'),
+    }
+
+    report_type = fields.Selection([
+        ('kdv2', 'KDV-2'),
+        ('muhtasar', 'Muhtasar'),
+    ], string='Rapor', required=True, readonly=True)
+    year = fields.Integer(string='Yıl', required=True, readonly=True)
+    month = fields.Integer(string='Ay', required=True, readonly=True)
+    firm = fields.Char(string='Firma', required=True, readonly=True,
+                       help="Logo veritabanı / firma numarası")
+    snapshot_date = fields.Datetime(string='Kopya Zamanı', readonly=True)
+    row_count = fields.Integer(string='Satır Sayısı', readonly=True)
+    fiche_count = fields.Integer(string='Fiş Sayısı', readonly=True,
+                                 help="Kopya alınırken dönemdeki EMFICHE sayısı")
+    logo_changed_date = fields.Date(string='Logo Son Değişiklik', readonly=True,
+                                    help="Kopya alınırken dönemdeki son fiş oluşturma / değişiklik günü")
+    data = fields.Binary(string='Veri', attachment=False, readonly=True)
 
-        # Form alanını da güncelle
-        self.cron3_last_sync_date = False
+    _sql_constraints = [
+        ('period_unique', 'unique(report_type, year, month, firm)',
+         'Aynı rapor ve dönem için tek kopya olabilir!'),
+    ]
+
+    @api.model
+    def _current_firm(self):
+        """Bağlı Logo veritabanı ve firma numarası"""
+        return '%s/%s' % (_get_logo_mssql_params(self.env)['database'] or '', LOGO_REPORT_FIRM_NR)
+
+    @api.model
+    def _is_closed_period(self, year, month):
+        """Dönem kopyalanabilecek kadar kapanmış mı"""
+        period_start, period_end = _logo_report_period(year, month)
+        last_day = period_end - timedelta(days=1)
+        tax_lock_date = getattr(self.env.company, 'tax_lock_date', False)
+        if tax_lock_date and tax_lock_date >= last_day:
+            return True
+        closed_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'logo.report_snapshot_closed_days', '60') or 60)
+        return period_end + timedelta(days=closed_days) <= fields.Date.context_today(self)
+
+    @api.model
+    def _get_period_fingerprint(self, conn, year, month):
+        """
+        Dönemin EMFICHE parmak izi
+
+        Returns:
+            tuple: (fiş sayısı, son oluşturma / değişiklik günü veya None)
+        """
+        cursor = conn.cursor()
+        cursor.execute(LOGO_REPORT_PERIOD_FINGERPRINT_SQL, _logo_report_period(year, month))
+        fiche_count, modified_date, created_date = cursor.fetchone()
+        changed_dates = [LogoInvoiceMatcher._date_of(value) for value in (modified_date, created_date) if value]
+        return fiche_count or 0, max(changed_dates) if changed_dates else None
+
+    def _is_stale(self, conn):
+        """
+        Kopya alındıktan sonra dönemde Logo fişi eklendi / değişti / silindi mi
+
+        Logo CAPIBLOCK_* günleri yerel gündür; kopya zamanı (UTC) da kullanıcı
+        saat dilimine çevrilerek karşılaştırılır (v1.0.54).
+        """
+        self.ensure_one()
+        fiche_count, changed_date = self._get_period_fingerprint(conn, self.year, self.month)
+        if fiche_count != self.fiche_count:
+            return True
+        snapshot_day = fields.Datetime.context_timestamp(self, self.snapshot_date).date()
+        return bool(changed_date and changed_date >= snapshot_day)
+
+    @api.model
+    def _to_json_vals(self, report_fields, vals):
+        """
+        Rapor satırını alan türüne göre açıkça JSON değerlerine çevir (v1.0.54)
+
+        Tutarlar float, tarihler ISO gün olarak yazılır; yeniden yüklemede
+        ORM'in metin dönüşümüne güvenilmez.
+        """
+        json_vals = {}
+        for name, value in vals.items():
+            field_type = report_fields[name].type
+            if value is None or value is False:
+                json_vals[name] = value
+            elif field_type == 'float':
+                json_vals[name] = float(value)
+            elif field_type == 'integer':
+                json_vals[name] = int(value)
+            elif field_type == 'date':
+                json_vals[name] = LogoInvoiceMatcher._date_of(value).isoformat()
+            elif field_type == 'datetime':
+                json_vals[name] = fields.Datetime.to_string(value)
+            else:
+                json_vals[name] = value if isinstance(value, str) else str(value)
+        return json_vals
+
+    def _iter_row_batches(self, batch_size=LOGO_REPORT_BATCH_SIZE):
+        """Saklanan satırları create değerleri olarak parça parça döndür"""
+        self.ensure_one()
+        with gzip.GzipFile(fileobj=io.BytesIO(base64.b64decode(self.data or b''))) as stream:
+            batch = []
+            for line in stream:
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    @api.model
+    def _load_report(self, wizard, report_model, force_refresh=False, sink=None, store_snapshot=True):
+        """
+        Sihirbazın dönemine ait rapor satırlarını kopyadan veya Logo'dan yükle
+
+        Args:
+            wizard: KDV-2 / Muhtasar sihirbazı (REPORT_TYPE, year, month,
+                _execute_report_query, _prepare_report_vals)
+            report_model: Satırların yazılacağı rapor modeli; None ise yalnızca kopya yenilenir
+            force_refresh (bool): Kopyayı yok sayıp Logo'dan yeniden oku
+            sink (callable): Her parçanın create değerleri listesiyle çağrılır (v1.0.44 - dosyaya aktarım)
+            store_snapshot (bool): False ise kapanmış dönem için de kopya yazılmaz (v1.0.56)
+
+        Returns:
+            int: Yüklenen satır sayısı
+        """
+        Snapshot = self.sudo()
+        year, month = wizard.year, int(wizard.month)
+        firm = Snapshot._current_firm()
+        snapshot = Snapshot.search([
+            ('report_type', '=', wizard.REPORT_TYPE), ('year', '=', year),
+            ('month', '=', month), ('firm', '=', firm),
+        ], limit=1)
+        auto_invalidate = self.env['ir.config_parameter'].sudo().get_param(
+            'logo.report_snapshot_auto_invalidate', 'False') == 'True'
+
+        def consume(vals_list):
+            if report_model is not None:
+                report_model.create(vals_list)
+                report_model.invalidate_model()
+            if sink is not None:
+                sink(vals_list)
+
+        conn = None
+        try:
+            if snapshot and not force_refresh:
+                if auto_invalidate:
+                    conn = _get_logo_mssql_connection(self.env, 'report')
+                    use_snapshot = not snapshot._is_stale(conn)
+                else:
+                    use_snapshot = True
+                if use_snapshot:
+                    total = 0
+                    for vals_list in snapshot._iter_row_batches():
+                        consume(vals_list)
+                        total += len(vals_list)
+                    _logger.info("%s %s/%s: %s satır kopyadan yüklendi", wizard.REPORT_TYPE, month, year, total)
+                    return total
+
+            store = store_snapshot and Snapshot._is_closed_period(year, month)
+            report_fields = self.env[self.REPORT_MODELS[wizard.REPORT_TYPE][1]]._fields
+            if conn is None:
+                conn = _get_logo_mssql_connection(self.env, 'report')
+            # Parmak izi ağır sorgudan önce alınır; sorgu sırasında olan değişiklik sonraki kontrolde görülür
+            fingerprint = Snapshot._get_period_fingerprint(conn, year, month) if store else None
+            snapshot_date = fields.Datetime.now()
+
+            cursor = conn.cursor(as_dict=True)
+            wizard._execute_report_query(cursor)
+            buffer = io.BytesIO()
+            total = 0
+            with gzip.GzipFile(fileobj=buffer, mode='wb') as stream:
+                while True:
+                    rows = cursor.fetchmany(LOGO_REPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    vals_list = [wizard._prepare_report_vals(row) for row in rows]
+                    if store:
+                        for vals in vals_list:
+                            stream.write(json.dumps(Snapshot._to_json_vals(report_fields, vals)).encode('utf-8') + b'\n')
+                    consume(vals_list)
+                    total += len(rows)
+            cursor.close()
+        finally:
+            if conn:
+                conn.close()
+
+        if store:
+            vals = {
+                'snapshot_date': snapshot_date,
+                'row_count': total,
+                'fiche_count': fingerprint[0],
+                'logo_changed_date': fingerprint[1],
+                'data': base64.b64encode(buffer.getvalue()),
+            }
+            if snapshot:
+                snapshot.write(vals)
+            else:
+                vals.update(report_type=wizard.REPORT_TYPE, year=year, month=month, firm=firm)
+                Snapshot.create(vals)
+            _logger.info("%s %s/%s: %s satırlık kopya kaydedildi", wizard.REPORT_TYPE, month, year, total)
+        return total
+
+    @api.model
+    def cron_cleanup_report_sessions(self):
+        """
+        Süresi dolan KDV-2 / Muhtasar rapor oturumlarını toplu sil (v1.0.43)
 
+        Rapor satırları oturum başına üretildiğinden tablolar birikir;
+        `logo.report_session_hours` saatten (varsayılan 12) eski satırlar her
+        rapor tablosu için tek DELETE ile silinir. Aynı süreden eski doğrudan
+        dışa aktarma ekleri de silinir.
+        """
+        hours = int(self.env['ir.config_parameter'].sudo().get_param('logo.report_session_hours', '12') or 12)
+        limit_date = fields.Datetime.now() - timedelta(hours=hours)
+        for _wizard_model, report_model in self.REPORT_MODELS.values():
+            Report = self.env[report_model]
+            self.env.cr.execute(
+                'DELETE FROM "{}" WHERE create_date < %s'.format(Report._table), (limit_date,))
+            if self.env.cr.rowcount:
+                _logger.info("%s: %s süresi dolmuş rapor satırı silindi", report_model, self.env.cr.rowcount)
+            Report.invalidate_model()
+
+        # Doğrudan dışa aktarma dosyaları da aynı süre sonunda silinir (v1.0.44)
+        wizard_models = [wizard_model for wizard_model, _report_model in self.REPORT_MODELS.values()]
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', 'in', wizard_models),
+            ('create_date', '<', limit_date),
+        ]).unlink()
+
+    def action_refresh(self):
+        """Seçili kopyaları Logo'dan yeniden oluştur"""
+        for snapshot in self:
+            wizard_model = self.REPORT_MODELS[snapshot.report_type][0]
+            wizard = self.env[wizard_model].new({'year': snapshot.year, 'month': str(snapshot.month)})
+            self._load_report(wizard, None, force_refresh=True)
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': _('Logo Monthly Sync Sıfırlandı'),
-                'message': _('Son senkronize tarih sıfırlandı. Bir sonraki çalışmada başlangıç tarihinden başlayacak.'),
+                'title': _('Rapor Kopyaları'),
+                'message': _('%s kopya Logo\'dan yenilendi.') % len(self),
                 'type': 'success',
                 'sticky': False,
-                'next': {'type': 'ir.actions.act_window_close'},
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
             }
         }
 
@@ -2937,7 +6219,12 @@ class EInvoiceConfigSettings(models.TransientModel):
 class LogoKdv2Report(models.TransientModel):
     _name = 'logo.kdv2.report'
     _description = 'Logo KDV-2 Raporu'
+    # Süresi dolan oturumlar ORM vacuum yerine toplu DELETE ile silinir (v1.0.43)
+    _transient_max_hours = 0
     
+    # Satırları üreten rapor oturumu - liste yalnızca kendi oturumunu gösterir (v1.0.43)
+    session_id = fields.Char(string='Oturum', index=True, readonly=True)
+
     # Rapor sonuçları için alanlar
     logo_id = fields.Integer(string='Logo ID', readonly=True)
     ay = fields.Integer(string='Ay', readonly=True)
@@ -2967,6 +6254,16 @@ class LogoKdv2Report(models.TransientModel):
 class LogoKdv2Wizard(models.TransientModel):
     _name = 'logo.kdv2.wizard'
     _description = 'Logo KDV-2 Rapor Sihirbazı'
+
+    # logo.report.snapshot anahtarı (v1.0.42)
+    REPORT_TYPE = 'kdv2'
+    # Dışa aktarma sütunları ve sırası - _prepare_report_vals anahtarları (v1.0.56)
+    REPORT_COLUMNS = (
+        'logo_id', 'ay', 'yil', 'fis_no', 'proje', 'kebir_hesap_kodu', 'kebir_hesap_adi',
+        'hesap_kodu', 'hesap_adi', 'masraf_merkezi', 'kaynak_modul', 'aciklama', 'fis_aciklama',
+        'cari', 'cari_vergi_no', 'cari_unvan', 'adi', 'soy_adi', 'tckn', 'tutar_yerel', 'kdv_tutar',
+        'tevkifat_oran', 'tevkif_edilen_kdv_tutari',
+    )
     
     month = fields.Selection([
         ('1', 'Ocak'),
@@ -2984,52 +6281,63 @@ class LogoKdv2Wizard(models.TransientModel):
     ], string='Ay', required=True, default=str(fields.Date.today().month))
     
     year = fields.Integer(string='Yıl', required=True, default=fields.Date.today().year)
+
+    # Doğrudan dışa aktarma dosya biçimi (v1.0.44)
+    export_format = fields.Selection([
+        ('xlsx', 'Excel (.xlsx)'),
+        ('csv', 'CSV'),
+    ], string='Dosya Biçimi', required=True, default='xlsx')
     
     def _get_mssql_connection(self):
-        """MSSQL bağlantısı oluştur"""
-        if not pymssql:
-            raise UserError(_("pymssql kütüphanesi yüklü değil. 'pip install pymssql' komutunu çalıştırın."))
-        
-        config_param = self.env['ir.config_parameter'].sudo()
-        server = config_param.get_param('logo.mssql_server')
-        port = int(config_param.get_param('logo.mssql_port', '1433'))
-        database = config_param.get_param('logo.mssql_database')
-        username = config_param.get_param('logo.mssql_username')
-        password = config_param.get_param('logo.mssql_password')
-        
-        if not all([server, database, username, password]):
-            raise UserError(_("Logo MSSQL bağlantı parametreleri eksik. Lütfen E-Fatura → Yapılandırma menüsünden ayarları tamamlayın."))
-        
-        try:
-            connection = pymssql.connect(
-                server=server,
-                port=str(port),
-                user=username,
-                password=password,
-                database=database,
-                timeout=120,
-                login_timeout=60,
-                charset='UTF-8',
-                appname='Odoo E-Fatura'
-            )
-            return connection
-        except Exception as e:
-            raise UserError(_("MSSQL bağlantı hatası: %s") % str(e))
-    
-    def action_generate_report(self):
-        """KDV-2 raporunu oluştur"""
-        conn = None
-        cursor = None
-        try:
-            # Mevcut kayıtları temizle
-            self.env['logo.kdv2.report'].search([]).unlink()
+        """MSSQL bağlantısı - uzun rapor sorguları için 'report' profili (v1.0.33)"""
+        return _get_logo_mssql_connection(self.env, 'report')
 
-            # MSSQL bağlantısı
-            conn = self._get_mssql_connection()
-            cursor = conn.cursor(as_dict=True)
-            
-            # SQL sorgusunu çalıştır
-            query = """
+    def _prepare_report_vals(self, row):
+        """MSSQL satırını rapor kaydı değerlerine çevir (v1.0.40)"""
+        return {
+            'logo_id': row.get('logoID'),
+            'ay': row.get('ay'),
+            'yil': row.get('yil'),
+            'fis_no': row.get('fisNo'),
+            'proje': row.get('proje'),
+            'kebir_hesap_kodu': row.get('kebirHesapKodu'),
+            'kebir_hesap_adi': row.get('kebirHesapAdi'),
+            'hesap_kodu': row.get('hesapKodu'),
+            'hesap_adi': row.get('hesapAdi'),
+            'masraf_merkezi': row.get('masrafMerkezi'),
+            'kaynak_modul': row.get('kaynakModul'),
+            'aciklama': row.get('aciklama'),
+            'fis_aciklama': row.get('fisAciklama'),
+            'cari': row.get('cari'),
+            'cari_vergi_no': row.get('cariVergiNo'),
+            'cari_unvan': row.get('cariUnvan'),
+            'adi': row.get('adi'),
+            'soy_adi': row.get('soyAdi'),
+            'tckn': row.get('tckn'),
+            'tutar_yerel': row.get('tutarYerel') or 0.0,
+            'kdv_tutar': row.get('kdvTutar') or 0.0,
+            'tevkifat_oran': row.get('tevkifatOran'),
+            'tevkif_edilen_kdv_tutari': row.get('tevkifEdilenKdvTutari') or 0.0,
+        }
+
+    def _get_report_query(self):
+        """
+        Dönemin rapor sorgusu ve parametreleri (v1.0.41)
+
+        Dönem filtresi MONTH()/YEAR() yerine yarı açık `DATE_ >= ay başı AND
+        DATE_ < sonraki ay başı` aralığıdır ve EMFLINE DATE_ indexinde seek yapabilir.
+        Dağıtım satırı olup olmadığı her CASE dalında `NOT IN (SELECT DISTINCT
+        PREVLINEREF FROM LG_600_01_ACCDISTDETLN)` ile tüm tablo taranarak değil,
+        zaten var olan `LEFT JOIN LG_600_01_ACCDISTDETLN A1` üzerinden
+        `A1.PREVLINEREF IS NULL` (NOT EXISTS karşılığı) ile okunur. Tarih
+        filtresiz 360.10.04 alt sorgusu da yalnızca dönemde satırı olan fişlerle
+        sınırlandırılır; bu fişler dışındaki satırlar zaten dış sorguyla
+        eşleşemediğinden sonuç değişmez. IS NULL, eski NOT IN ile ancak
+        ACCDISTDETLN'de NULL PREVLINEREF yoksa aynıdır; eşdeğerlik ve süre
+        action_compare_queries ile dönem bazında ölçülür (v1.0.62).
+        """
+        period_start, period_end = _logo_report_period(self.year, self.month)
+        query = """
 SELECT  
  AA.LOGICALREF as logoID,
  MONTH(A.DATE_) as ay,
@@ -3057,7 +6365,7 @@ SELECT
  CL.NAME as adi, 
  CL.SURNAME as soyAdi, 
  CL.TCKNO as tckn,
- CASE WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN END as tutarYerel,
+ CASE WHEN A1.PREVLINEREF IS NULL OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN END as tutarYerel,
  SEML.VATAMOUNT as kdvTutar,
  SEML.DEDUCTION as tevkifatOran,
  CASE WHEN ISNULL(SSTL.DEDUCTIONPART1,0) != 0 
@@ -3114,55 +6422,62 @@ INNER JOIN (
             WHERE AA.CANCELLED = 0 
             AND F.CODE LIKE '360.10.04%'
             AND AA.MODULENR=2
+            AND EXISTS (SELECT 1 FROM LG_600_01_EMFLINE P WITH(NOLOCK)
+                        WHERE P.ACCFICHEREF = EML.ACCFICHEREF
+                        AND P.DATE_ >= %s AND P.DATE_ < %s)
             ) SEML ON SEML.ACCFICHEREF = A.ACCFICHEREF
 WHERE ISNULL(AA.CANCELLED,0) = 0 
 AND ISNULL(A.CANCELLED,0)=0
 AND (F.CODE LIKE '7%' OR F.CODE LIKE '253%' OR F.CODE LIKE '255%' OR F.CODE LIKE '260%')
-AND MONTH(A.DATE_)= %s
-AND YEAR(A.DATE_)= %s
+AND A.DATE_ >= %s
+AND A.DATE_ < %s
 AND AA.MODULENR=2
 """
+        return query, (period_start, period_end, period_start, period_end)
+
+    def _get_legacy_report_query(self):
+        """v1.0.40 öncesi sorgu ve parametreleri - yalnızca karşılaştırma için (v1.0.62)"""
+        return LOGO_KDV2_REPORT_SQL_LEGACY, (int(self.month), self.year)
+
+    def _execute_report_query(self, cursor):
+        """Dönemin rapor sorgusunu çalıştır (v1.0.41)"""
+        cursor.execute(*self._get_report_query())
+
+    def action_compare_queries(self):
+        """Seçili dönem için eski ve yeni KDV-2 sorgusunu ölç ve karşılaştır (v1.0.62)"""
+        self.ensure_one()
+        return _logo_report_benchmark_action(self, 'KDV-2')
+
+    def action_generate_report(self):
+        """KDV-2 raporunu oluştur - kapanmış dönemler kopyadan gelir (v1.0.42)"""
+        return self._generate_report()
+
+    def action_refresh_report(self):
+        """Kopyayı yok sayıp raporu Logo'dan yeniden oluştur (v1.0.42)"""
+        return self._generate_report(force_refresh=True)
+
+    def action_export_direct(self):
+        """Raporu Odoo'ya yazmadan doğrudan xlsx / csv dosyasına aktar (v1.0.44)"""
+        return _export_logo_report(self, 'logo.kdv2.report', 'KDV-2')
+
+    def _generate_report(self, force_refresh=False):
+        """KDV-2 rapor satırlarını kopyadan veya Logo'dan yükleyip listeyi aç"""
+        try:
+            # Satırlar bu üretime ait oturumla işaretlenir; diğer kullanıcıların
+            # satırlarına dokunulmaz (v1.0.43)
+            session_id = uuid.uuid4().hex
+            report_model = self.env['logo.kdv2.report'].with_context(default_session_id=session_id)
+            total = self.env['logo.report.snapshot']._load_report(
+                self, report_model, force_refresh=force_refresh)
             
-            cursor.execute(query, (int(self.month), self.year))
-            
-            # Sonuçları Odoo'ya kaydet
-            records = []
-            for row in cursor:
-                vals = {
-                    'logo_id': row.get('logoID'),
-                    'ay': row.get('ay'),
-                    'yil': row.get('yil'),
-                    'fis_no': row.get('fisNo'),
-                    'proje': row.get('proje'),
-                    'kebir_hesap_kodu': row.get('kebirHesapKodu'),
-                    'kebir_hesap_adi': row.get('kebirHesapAdi'),
-                    'hesap_kodu': row.get('hesapKodu'),
-                    'hesap_adi': row.get('hesapAdi'),
-                    'masraf_merkezi': row.get('masrafMerkezi'),
-                    'kaynak_modul': row.get('kaynakModul'),
-                    'aciklama': row.get('aciklama'),
-                    'fis_aciklama': row.get('fisAciklama'),
-                    'cari': row.get('cari'),
-                    'cari_vergi_no': row.get('cariVergiNo'),
-                    'cari_unvan': row.get('cariUnvan'),
-                    'adi': row.get('adi'),
-                    'soy_adi': row.get('soyAdi'),
-                    'tckn': row.get('tckn'),
-                    'tutar_yerel': row.get('tutarYerel') or 0.0,
-                    'kdv_tutar': row.get('kdvTutar') or 0.0,
-                    'tevkifat_oran': row.get('tevkifatOran'),
-                    'tevkif_edilen_kdv_tutari': row.get('tevkifEdilenKdvTutari') or 0.0,
-                }
-                records.append(self.env['logo.kdv2.report'].create(vals))
-            
-            if records:
+            if total:
                 # Rapor görünümünü aç
                 return {
                     'name': _('KDV-2 Listesi - %s/%s') % (self.month, self.year),
                     'type': 'ir.actions.act_window',
                     'res_model': 'logo.kdv2.report',
                     'view_mode': 'list',
-                    'domain': [],
+                    'domain': [('session_id', '=', session_id)],
                 }
             else:
                 return {
@@ -3179,18 +6494,17 @@ AND AA.MODULENR=2
         except Exception as e:
             _logger.error("KDV-2 rapor hatası: %s", str(e))
             raise UserError(_("Rapor oluşturma hatası: %s") % str(e))
-        finally:
-            # Bağlantıyı kapat
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
 
 class LogoMuhtasarReport(models.TransientModel):
     _name = 'logo.muhtasar.report'
     _description = 'Logo Muhtasar Raporu'
+    # Süresi dolan oturumlar ORM vacuum yerine toplu DELETE ile silinir (v1.0.43)
+    _transient_max_hours = 0
     
+    # Satırları üreten rapor oturumu - liste yalnızca kendi oturumunu gösterir (v1.0.43)
+    session_id = fields.Char(string='Oturum', index=True, readonly=True)
+
     # Rapor sonuçları için alanlar
     odenecek_gelir_vergileri = fields.Char(string='Ödenecek Gelir Vergileri', readonly=True)
     vergi_turu = fields.Char(string='Vergi Türü', readonly=True)
@@ -3231,6 +6545,18 @@ class LogoMuhtasarReport(models.TransientModel):
 class LogoMuhtasarWizard(models.TransientModel):
     _name = 'logo.muhtasar.wizard'
     _description = 'Logo Muhtasar Rapor Sihirbazı'
+
+    # logo.report.snapshot anahtarı (v1.0.42)
+    REPORT_TYPE = 'muhtasar'
+    # Dışa aktarma sütunları ve sırası - _prepare_report_vals anahtarları (v1.0.56)
+    REPORT_COLUMNS = (
+        'odenecek_gelir_vergileri', 'vergi_turu', 'tarih', 'ay', 'yil', 'fis_no', 'islem',
+        'is_yeri', 'bolum', 'proje', 'kebir_hesabi_kodu', 'kebir_hesabi_adi', 'hesap_kodu',
+        'hesap_adi', 'masraf_merkezi', 'kaynak_modul', 'tutar', 'tutar_yerel', 'aciklama',
+        'fis_aciklama', 'hareket_yonu', 'iptal', 'belge_turu', 'cari', 'cari_vergi_no',
+        'cari_unvan1', 'cari_unvan2', 'adi', 'soyadi', 'fatura_belge_no', 'fatura_no', 'adres1',
+        'ulke',
+    )
     
     month = fields.Selection([
         ('1', 'Ocak'),
@@ -3248,52 +6574,65 @@ class LogoMuhtasarWizard(models.TransientModel):
     ], string='Ay', required=True, default=str(fields.Date.today().month))
     
     year = fields.Integer(string='Yıl', required=True, default=fields.Date.today().year)
+
+    # Doğrudan dışa aktarma dosya biçimi (v1.0.44)
+    export_format = fields.Selection([
+        ('xlsx', 'Excel (.xlsx)'),
+        ('csv', 'CSV'),
+    ], string='Dosya Biçimi', required=True, default='xlsx')
     
     def _get_mssql_connection(self):
-        """MSSQL bağlantısı oluştur"""
-        if not pymssql:
-            raise UserError(_("pymssql kütüphanesi yüklü değil. 'pip install pymssql' komutunu çalıştırın."))
-        
-        config_param = self.env['ir.config_parameter'].sudo()
-        server = config_param.get_param('logo.mssql_server')
-        port = int(config_param.get_param('logo.mssql_port', '1433'))
-        database = config_param.get_param('logo.mssql_database')
-        username = config_param.get_param('logo.mssql_username')
-        password = config_param.get_param('logo.mssql_password')
-        
-        if not all([server, database, username, password]):
-            raise UserError(_("Logo MSSQL bağlantı parametreleri eksik. Lütfen E-Fatura → Yapılandırma menüsünden ayarları tamamlayın."))
-        
-        try:
-            connection = pymssql.connect(
-                server=server,
-                port=port,
-                user=username,
-                password=password,
-                database=database,
-                timeout=120,
-                login_timeout=60,
-                charset='UTF-8',
-                appname='Odoo E-Fatura'
-            )
-            return connection
-        except Exception as e:
-            raise UserError(_("MSSQL bağlantı hatası: %s") % str(e))
+        """MSSQL bağlantısı - uzun rapor sorguları için 'report' profili (v1.0.33)"""
+        return _get_logo_mssql_connection(self.env, 'report')
 
-    def action_generate_report(self):
-        """Muhtasar raporunu oluştur"""
-        conn = None
-        cursor = None
-        try:
-            # Mevcut kayıtları temizle
-            self.env['logo.muhtasar.report'].search([]).unlink()
+    def _prepare_report_vals(self, row):
+        """MSSQL satırını rapor kaydı değerlerine çevir (v1.0.40)"""
+        return {
+            'odenecek_gelir_vergileri': row.get('odenecekGelirVergileri'),
+            'vergi_turu': row.get('vergiTuru'),
+            'tarih': row.get('tarih'),
+            'ay': row.get('ay'),
+            'yil': row.get('yil'),
+            'fis_no': row.get('fisNo'),
+            'islem': row.get('islem'),
+            'is_yeri': row.get('isYeri'),
+            'bolum': row.get('bolum'),
+            'proje': row.get('proje'),
+            'kebir_hesabi_kodu': row.get('kebirHesabiKodu'),
+            'kebir_hesabi_adi': row.get('kebirHesabiAdi'),
+            'hesap_kodu': row.get('hesapKodu'),
+            'hesap_adi': row.get('hesapAdi'),
+            'masraf_merkezi': row.get('masrafMerkezi'),
+            'kaynak_modul': row.get('kaynakModul'),
+            'tutar': row.get('tutar') or 0.0,
+            'tutar_yerel': row.get('tutarYerel') or 0.0,
+            'aciklama': row.get('aciklama'),
+            'fis_aciklama': row.get('fisAciklama'),
+            'hareket_yonu': row.get('hareketYonu'),
+            'iptal': row.get('iptal'),
+            'belge_turu': row.get('belgeTuru'),
+            'cari': row.get('cari'),
+            'cari_vergi_no': row.get('cariVergiNo'),
+            'cari_unvan1': row.get('cariUnvan1'),
+            'cari_unvan2': row.get('cariUnvan2'),
+            'adi': row.get('adi'),
+            'soyadi': row.get('soyadi'),
+            'fatura_belge_no': row.get('faturaBelgeNo'),
+            'fatura_no': row.get('faturaNo'),
+            'adres1': row.get('adres1'),
+            'ulke': row.get('ulke'),
+        }
 
-            # MSSQL bağlantısı
-            conn = self._get_mssql_connection()
-            cursor = conn.cursor(as_dict=True)
-            
-            # SQL sorgusunu çalıştır
-            query = """
+    def _get_report_query(self):
+        """
+        Dönemin rapor sorgusu ve parametreleri (v1.0.41)
+
+        KDV-2 ile aynı şekilde: dönem yarı açık tarih aralığıdır ve dağıtım
+        satırı kontrolü NOT IN alt sorguları yerine mevcut ACCDISTDETLN
+        LEFT JOIN'i üzerinden yapılır.
+        """
+        period_start, period_end = _logo_report_period(self.year, self.month)
+        query = """
 SELECT 
 CASE
     WHEN F.CODE = '360.10.01.001' THEN 'ÜCRET GELİR VERGİSİ'
@@ -3344,14 +6683,14 @@ CASE
     ELSE '' 
 END as kaynakModul,
 -CASE 
-    WHEN A.TRCURR=0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
-    WHEN A.TRCURR<>0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
+    WHEN A.TRCURR=0 AND (A1.PREVLINEREF IS NULL OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
+    WHEN A.TRCURR<>0 AND (A1.PREVLINEREF IS NULL OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
     WHEN A.TRCURR=0 AND A1.DISTRATE<>100 THEN A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN
     WHEN A.TRCURR<>0 AND A1.DISTRATE<>100 THEN A1.TRNET-A1.TRNET*2*A.SIGN
     ELSE 0 
 END  as tutar,
 CASE 
-    WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
+    WHEN A1.PREVLINEREF IS NULL OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
     ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN 
 END as tutarYerel,
 A.LINEEXP as aciklama,
@@ -3399,7 +6738,7 @@ FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
                 SELECT
                 EML.ACCFICHEREF, 
                 CASE 
-                    WHEN EML.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
+                    WHEN A1.PREVLINEREF IS NULL OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
                     ELSE A1.CREDEBNET-A1.CREDEBNET*2*EML.SIGN 
                 END AS TOTAL
                 FROM  LG_600_01_EMFLINE EML WITH(NOLOCK)
@@ -3408,14 +6747,14 @@ FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
                     LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=EML.ACCOUNTREF
                 WHERE AA.CANCELLED = 0
                     AND (F.CODE LIKE '360.10.01%')
-                    AND MONTH(EML.DATE_)= %s                                      
-                    AND YEAR(EML.DATE_)= %s                     
+                    AND EML.DATE_ >= %s
+                    AND EML.DATE_ < %s
                     and AA.MODULENR=2
                 ) SEML ON  SEML.ACCFICHEREF = A.ACCFICHEREF
 WHERE AA.CANCELLED = 0
     AND (F.CODE LIKE '7%')
-    AND MONTH(A.DATE_)= %s                 
-    AND YEAR(A.DATE_)= %s                   
+    AND A.DATE_ >= %s
+    AND A.DATE_ < %s
     and AA.MODULENR=2
 UNION ALL
 SELECT 
@@ -3468,14 +6807,14 @@ WHEN AA.MODULENR=1 THEN '1 Malzeme'
     ELSE '' 
 END as kaynakModul,
 -CASE 
-    WHEN A.TRCURR=0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
-    WHEN A.TRCURR<>0 AND (A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
+    WHEN A.TRCURR=0 AND (A1.PREVLINEREF IS NULL OR A1.DISTRATE=1) THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN
+    WHEN A.TRCURR<>0 AND (A1.PREVLINEREF IS NULL OR A1.DISTRATE=1) THEN A.TRNET-A.TRNET*2*A.SIGN
     WHEN A.TRCURR=0 AND A1.DISTRATE<>100 THEN A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN
     WHEN A.TRCURR<>0 AND A1.DISTRATE<>100 THEN A1.TRNET-A1.TRNET*2*A.SIGN
     ELSE 0 
 END as tutar,
 CASE 
-    WHEN A.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
+    WHEN A1.PREVLINEREF IS NULL OR A1.DISTRATE=1 THEN ABS(A.DEBIT-A.CREDIT)-ABS(A.DEBIT-A.CREDIT)*2*A.SIGN 
     ELSE A1.CREDEBNET-A1.CREDEBNET*2*A.SIGN 
 END as tutarYerel,
 A.LINEEXP as aciklama,
@@ -3524,7 +6863,7 @@ FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
                 SELECT
                 EML.ACCFICHEREF, 
                 CASE
-                    WHEN EML.LOGICALREF NOT IN (SELECT DISTINCT PREVLINEREF FROM LG_600_01_ACCDISTDETLN) OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
+                    WHEN A1.PREVLINEREF IS NULL OR A1.DISTRATE=1 THEN ABS(EML.DEBIT-EML.CREDIT)-ABS(EML.DEBIT-EML.CREDIT)*2*EML.SIGN 
                     ELSE A1.CREDEBNET-A1.CREDEBNET*2*EML.SIGN 
                 END AS TOTAL
                 FROM  LG_600_01_EMFLINE EML WITH(NOLOCK)
@@ -3533,67 +6872,61 @@ FROM  LG_600_01_EMFLINE A WITH(NOLOCK)
                     LEFT JOIN LG_600_EMUHACC F WITH(NOLOCK) ON F.LOGICALREF=EML.ACCOUNTREF
                 WHERE AA.CANCELLED = 0
                     AND (F.CODE LIKE '360.10.01%')
-                    AND MONTH(EML.DATE_)= %s   
-                    AND YEAR(EML.DATE_)= %s          
+                    AND EML.DATE_ >= %s
+                    AND EML.DATE_ < %s
                     AND AA.MODULENR=6
                 ) SEML ON  SEML.ACCFICHEREF = A.ACCFICHEREF
 WHERE AA.CANCELLED = 0
     AND (F.CODE LIKE '740.YÜ[PM]%' OR F.CODE LIKE '770.10.08.001')
-    AND MONTH(A.DATE_)= %s              
-    AND YEAR(A.DATE_)= %s                  
+    AND A.DATE_ >= %s
+    AND A.DATE_ < %s
     AND AA.MODULENR=6
 """
-            
-            cursor.execute(query, (int(self.month), self.year, int(self.month), self.year, int(self.month), self.year, int(self.month), self.year, int(self.month), self.year, int(self.month), self.year, int(self.month), self.year, int(self.month), self.year))
-            
-            # Sonuçları Odoo'ya kaydet
-            records = []
-            for row in cursor:
-                vals = {
-                    'odenecek_gelir_vergileri': row.get('odenecekGelirVergileri'),
-                    'vergi_turu': row.get('vergiTuru'),
-                    'tarih': row.get('tarih'),
-                    'ay': row.get('ay'),
-                    'yil': row.get('yil'),
-                    'fis_no': row.get('fisNo'),
-                    'islem': row.get('islem'),
-                    'is_yeri': row.get('isYeri'),
-                    'bolum': row.get('bolum'),
-                    'proje': row.get('proje'),
-                    'kebir_hesabi_kodu': row.get('kebirHesabiKodu'),
-                    'kebir_hesabi_adi': row.get('kebirHesabiAdi'),
-                    'hesap_kodu': row.get('hesapKodu'),
-                    'hesap_adi': row.get('hesapAdi'),
-                    'masraf_merkezi': row.get('masrafMerkezi'),
-                    'kaynak_modul': row.get('kaynakModul'),
-                    'tutar': row.get('tutar') or 0.0,
-                    'tutar_yerel': row.get('tutarYerel') or 0.0,
-                    'aciklama': row.get('aciklama'),
-                    'fis_aciklama': row.get('fisAciklama'),
-                    'hareket_yonu': row.get('hareketYonu'),
-                    'iptal': row.get('iptal'),
-                    'belge_turu': row.get('belgeTuru'),
-                    'cari': row.get('cari'),
-                    'cari_vergi_no': row.get('cariVergiNo'),
-                    'cari_unvan1': row.get('cariUnvan1'),
-                    'cari_unvan2': row.get('cariUnvan2'),
-                    'adi': row.get('adi'),
-                    'soyadi': row.get('soyadi'),
-                    'fatura_belge_no': row.get('faturaBelgeNo'),
-                    'fatura_no': row.get('faturaNo'),
-                    'adres1': row.get('adres1'),
-                    'ulke': row.get('ulke'),
-                }
-                records.append(self.env['logo.muhtasar.report'].create(vals))
+        return query, (period_start, period_end) * 4
+
+    def _get_legacy_report_query(self):
+        """v1.0.40 öncesi sorgu ve parametreleri - yalnızca karşılaştırma için (v1.0.62)"""
+        return LOGO_MUHTASAR_REPORT_SQL_LEGACY, (int(self.month), self.year) * 8
+
+    def _execute_report_query(self, cursor):
+        """Dönemin rapor sorgusunu çalıştır (v1.0.41)"""
+        cursor.execute(*self._get_report_query())
 
-            if records:
+    def action_compare_queries(self):
+        """Seçili dönem için eski ve yeni Muhtasar sorgusunu ölç ve karşılaştır (v1.0.62)"""
+        self.ensure_one()
+        return _logo_report_benchmark_action(self, 'Muhtasar')
+
+    def action_generate_report(self):
+        """Muhtasar raporunu oluştur - kapanmış dönemler kopyadan gelir (v1.0.42)"""
+        return self._generate_report()
+
+    def action_refresh_report(self):
+        """Kopyayı yok sayıp raporu Logo'dan yeniden oluştur (v1.0.42)"""
+        return self._generate_report(force_refresh=True)
+
+    def action_export_direct(self):
+        """Raporu Odoo'ya yazmadan doğrudan xlsx / csv dosyasına aktar (v1.0.44)"""
+        return _export_logo_report(self, 'logo.muhtasar.report', 'Muhtasar')
+
+    def _generate_report(self, force_refresh=False):
+        """Muhtasar rapor satırlarını kopyadan veya Logo'dan yükleyip listeyi aç"""
+        try:
+            # Satırlar bu üretime ait oturumla işaretlenir; diğer kullanıcıların
+            # satırlarına dokunulmaz (v1.0.43)
+            session_id = uuid.uuid4().hex
+            report_model = self.env['logo.muhtasar.report'].with_context(default_session_id=session_id)
+            total = self.env['logo.report.snapshot']._load_report(
+                self, report_model, force_refresh=force_refresh)
+
+            if total:
                 # Rapor görünümünü aç
                 return {
                     'name': _('Muhtasar Listesi - %s/%s') % (self.month, self.year),
                     'type': 'ir.actions.act_window',
                     'res_model': 'logo.muhtasar.report',
                     'view_mode': 'list',
-                    'domain': [],
+                    'domain': [('session_id', '=', session_id)],
                 }
             else:
                 return {
@@ -3610,12 +6943,6 @@ WHERE AA.CANCELLED = 0
         except Exception as e:
             _logger.error("Muhtasar rapor hatası: %s", str(e))
             raise UserError(_("Rapor oluşturma hatası: %s") % str(e))
-        finally:
-            # Bağlantıyı kapat
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
 
 class EarsivExcelImportWizard(models.TransientModel):
@@ -3718,7 +7045,7 @@ class EarsivExcelImportWizard(models.TransientModel):
 
     def _create_or_update_invoice(self, row_data):
         """e.invoice kaydı oluştur veya güncelle"""
-        Invoice = self.env['e.invoice']
+        Invoice = self.env['e.invoice']._ingest_mode()  # Toplu aktarım modu (v1.0.27)
 
         # Mevcut kaydı kontrol et
         existing = Invoice.search([
@@ -3882,6 +7209,14 @@ class EarsivExcelImportWizard(models.TransientModel):
 
             # Özet mesajı
             self.import_summary = self._prepare_summary(created_count, updated_count, error_count)
+            self.env['e.invoice.sync.run']._log_run('excel_import', {
+                self.file_name or 'Excel': {
+                    'success': True,
+                    'created': created_count,
+                    'updated': updated_count,
+                    'errors': error_count,
+                },
+            })
 
             # Aynı wizard'ı göster (özet ile birlikte)
             return {
@@ -3999,6 +7334,9 @@ class EInvoiceTaxDetailImportWizard(models.TransientModel):
 
         start_time = datetime.now()
 
+        # Toplu aktarım modu (v1.0.27) - satır başına tracking mesajı üretilmez
+        Invoice = self.env['e.invoice']._ingest_mode()
+
         # Process each row (skip header)
         for row_idx in range(1, sheet.nrows):
             try:
@@ -4032,14 +7370,14 @@ class EInvoiceTaxDetailImportWizard(models.TransientModel):
 
                 # Find matching e.invoice by UUID (2-step search)
                 # Step 1: Search for valid invoices (gvn_active=True)
-                invoice = self.env['e.invoice'].search([
+                invoice = Invoice.search([
                     ('uuid', '=', ettn),
                     ('gvn_active', '=', True),
                 ], limit=1)
 
                 # Step 2: If not found, search for invalid invoices (gvn_active=False)
                 if not invoice:
-                    invoice = self.env['e.invoice'].search([
+                    invoice = Invoice.search([
                         ('uuid', '=', ettn),
                         ('gvn_active', '=', False),
                     ], limit=1)
@@ -4206,6 +7544,16 @@ class EInvoiceTaxDetailImportWizard(models.TransientModel):
                     'durum': f'Veri Hatası: {str(e)[:50]}'
                 })
 
+        # Çalışma özeti (v1.0.27)
+        self.env['e.invoice.sync.run']._log_run('tax_import', {
+            self.file_name or 'Excel': {
+                'success': True,
+                'updated': updated_count,
+                'skipped': skipped_not_found + skipped_locked,
+                'errors': skipped_error,
+            },
+        })
+
         # Final commit for remaining records
         self.env.cr.commit()
 